@@ -0,0 +1,354 @@
+# analytics.py
+"""
+Optional columnar mirror of the database for reporting queries.
+
+Reports that scan months of history (growth curves, publish-month cohorts, top posts by
+engagement velocity) run on a DuckDB copy of scraped_posts and post_metrics_history instead of
+the live SQLite file. DuckDB scans columns with vectorized execution. The scraper's database
+only serves the short snapshot reads that copy new changes across.
+
+The mirror sits next to the database (instagram_analytics.duckdb) and is synced incrementally:
+posts through database.changes_since(), history rows by their increasing (never reused) id.
+Each batch is bulk-loaded through a staging CSV file. Reports sync first, which is one cheap
+query when nothing changed:
+
+  columns, rows = top_engagement_velocity(days=7, limit=20)
+  columns, rows = query("SELECT owner, sum(views) FROM posts GROUP BY owner")
+  export_report("velocity.csv", "velocity", days=30)
+  python analytics.py report cohorts [cohorts.parquet]
+
+Needs the optional 'duckdb' package (pip install duckdb); analytics_available() says whether it is installed.
+"""
+
+import os
+import csv
+import time
+import atexit
+import logging
+import threading
+
+import database
+import exporter
+
+try:
+    import duckdb
+except ImportError: # Optional: only needed for the analytics mirror
+    duckdb = None
+
+# --- Configuration ---
+ANALYTICS_DB_FILE = None # None: next to database.DB_FILE, with a .duckdb extension
+ANALYTICS_SYNC_BATCH_ROWS = 100000 # Rows per staging file during a sync
+
+# Mirror column types; names and order follow database.LOADED_POST_COLUMNS and HISTORY_SYNC_COLUMNS
+_COLUMN_TYPES = {
+    "id": "BIGINT",
+    "post_shortcode": "VARCHAR",
+    "link": "VARCHAR",
+    "post_date": "BIGINT", # Epoch seconds, as in SQLite
+    "last_record": "BIGINT",
+    "recorded_at": "BIGINT",
+    "owner": "VARCHAR",
+    "likes": "BIGINT",
+    "comments": "BIGINT",
+    "views": "BIGINT",
+    "engagement_rate": "DOUBLE",
+    "error": "VARCHAR",
+    "status": "VARCHAR",
+    "row_version": "BIGINT",
+    "source": "VARCHAR",
+}
+POST_MIRROR_COLUMNS = database.LOADED_POST_COLUMNS
+HISTORY_MIRROR_COLUMNS = database.HISTORY_SYNC_COLUMNS
+
+_conn = None
+_conn_path = None
+_lock = threading.Lock() # One sync or query at a time on the shared DuckDB connection
+
+
+def analytics_available():
+    return duckdb is not None
+
+
+def mirror_path():
+    return ANALYTICS_DB_FILE or os.path.splitext(database.DB_FILE)[0] + ".duckdb"
+
+
+def _table_sql(table, columns):
+    return f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(f'{col} {_COLUMN_TYPES[col]}' for col in columns)})"
+
+
+def _connection():
+    """The shared DuckDB connection for mirror_path(), opened (and its schema created) on first use. Call with _lock held."""
+    global _conn, _conn_path
+    if duckdb is None:
+        raise RuntimeError("The analytics mirror needs the optional 'duckdb' package (pip install duckdb).")
+    path = mirror_path()
+    if _conn is None or _conn_path != path:
+        if _conn is not None:
+            _conn.close()
+        _conn = duckdb.connect(path)
+        _conn_path = path
+        _conn.execute(_table_sql("posts", POST_MIRROR_COLUMNS))
+        _conn.execute(_table_sql("history", HISTORY_MIRROR_COLUMNS))
+        _conn.execute("CREATE TABLE IF NOT EXISTS sync_state (source_db VARCHAR, posts_version BIGINT, synced_at BIGINT)")
+    return _conn
+
+
+def _bulk_insert(conn, table, columns, rows):
+    """
+    Inserts rows into table through a staging CSV file per ANALYTICS_SYNC_BATCH_ROWS rows
+    (DuckDB loads a CSV file orders of magnitude faster than row-by-row inserts). Returns the row count.
+    """
+    staging_path = f"{mirror_path()}.staging.csv"
+    column_types = ", ".join(f"'{col}': '{_COLUMN_TYPES[col]}'" for col in columns)
+    load_sql = (
+        f"INSERT INTO {table} SELECT * FROM read_csv(?, auto_detect = false, header = false, delim = ',', "
+        f"quote = '\"', escape = '\"', new_line = '\\n', columns = {{{column_types}}})"
+    )
+    inserted = 0
+    rows = iter(rows)
+    try:
+        while True:
+            batch_rows = 0
+            with open(staging_path, "w", newline="", encoding="utf-8") as staging_file:
+                writer = csv.writer(staging_file, lineterminator="\n") # None is written as an empty field and read back as NULL
+                for row in rows:
+                    writer.writerow(row)
+                    batch_rows += 1
+                    if batch_rows >= ANALYTICS_SYNC_BATCH_ROWS:
+                        break
+            if not batch_rows:
+                break
+            conn.execute(load_sql, [staging_path])
+            inserted += batch_rows
+    finally:
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
+    return inserted
+
+
+def _upsert_posts(conn, rows):
+    conn.execute("CREATE OR REPLACE TEMP TABLE staged_posts AS SELECT * FROM posts LIMIT 0")
+    _bulk_insert(conn, "staged_posts", POST_MIRROR_COLUMNS, rows)
+    conn.execute("DELETE FROM posts WHERE post_shortcode IN (SELECT post_shortcode FROM staged_posts)")
+    conn.execute("INSERT INTO posts SELECT * FROM staged_posts")
+    conn.execute("DROP TABLE staged_posts")
+
+
+def _sync(conn, rebuild):
+    started = time.perf_counter()
+    result = {"rebuilt": False, "posts": 0, "deleted": 0, "history": 0}
+    source_db = os.path.abspath(database.DB_FILE)
+    state = conn.execute("SELECT source_db, posts_version FROM sync_state").fetchone()
+    current_version = database.current_change_version()
+    # Read before any deletes below: history ids are never reused, so everything above it is new
+    after_id = conn.execute("SELECT coalesce(max(id), 0) FROM history").fetchone()[0]
+    # A different or recreated database (its change counter went backwards) cannot be synced incrementally
+    if rebuild or state is None or state[0] != source_db or current_version < state[1]:
+        result["rebuilt"] = True
+        conn.execute("DELETE FROM posts")
+        conn.execute("DELETE FROM history")
+        after_id = 0
+        # Taken before the copy: anything changed while it runs is picked up by the next sync
+        version = current_version
+        result["posts"] = _bulk_insert(conn, "posts", POST_MIRROR_COLUMNS, database.iter_posts())
+    else:
+        changes = database.changes_since(state[1])
+        if changes is None:
+            raise RuntimeError("Could not read database changes.")
+        changed_rows, deleted_shortcodes, version = changes
+        # Includes posts deleted and re-added since the last sync: their old history goes, and the
+        # re-added post's rows (all with new ids) are copied below
+        if deleted_shortcodes:
+            conn.execute("DELETE FROM posts WHERE post_shortcode IN (SELECT UNNEST(?))", [deleted_shortcodes])
+            conn.execute("DELETE FROM history WHERE post_shortcode IN (SELECT UNNEST(?))", [deleted_shortcodes])
+            result["deleted"] = len(deleted_shortcodes)
+        if changed_rows:
+            _upsert_posts(conn, changed_rows)
+            result["posts"] = len(changed_rows)
+
+    result["history"] = _bulk_insert(conn, "history", HISTORY_MIRROR_COLUMNS, database.iter_post_history_after(after_id))
+
+    conn.execute("DELETE FROM sync_state")
+    conn.execute("INSERT INTO sync_state VALUES (?, ?, ?)", [source_db, version, int(time.time())])
+    result["version"] = version
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def sync_analytics(rebuild=False):
+    """
+    Brings the mirror up to date with the database in one DuckDB transaction and returns
+    {"rebuilt", "posts", "deleted", "history", "version", "seconds"}, or None if duckdb is
+    missing or the sync failed. The first sync (or rebuild=True) copies everything.
+    """
+    if duckdb is None:
+        logging.warning("Analytics mirror unavailable: the optional 'duckdb' package is not installed.")
+        return None
+    with _lock:
+        try:
+            conn = _connection()
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                result = _sync(conn, rebuild)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except Exception as e:
+            logging.error(f"Error syncing the analytics mirror: {e}", exc_info=True)
+            return None
+    if result["rebuilt"] or result["posts"] or result["deleted"] or result["history"]:
+        logging.info(f"Analytics mirror synced: {result}")
+    return result
+
+
+def query(sql, params=None, sync=True):
+    """
+    Runs a query on the mirror (tables posts, history; dates are epoch seconds) after syncing it
+    unless sync=False. Returns (column_names, rows). Raises if duckdb is missing or the query fails.
+    """
+    if sync:
+        sync_analytics()
+    with _lock:
+        cursor = _connection().execute(sql, params or [])
+        columns = tuple(description[0] for description in cursor.description)
+        return columns, cursor.fetchall()
+
+
+def _owner_filter(owner, column="p.owner"):
+    return (f" AND {column} = ?", [owner]) if owner else ("", [])
+
+
+def growth_curve(post_shortcode=None, owner=None, since=None, until=None):
+    """
+    Daily growth series: the last recorded views, likes and comments of each post per UTC day,
+    for one post, one owner's posts or all posts, optionally within [since, until) (epoch seconds).
+    """
+    conditions = " WHERE 1 = 1"
+    params = []
+    if post_shortcode:
+        conditions += " AND h.post_shortcode = ?"
+        params.append(post_shortcode)
+    owner_clause, owner_params = _owner_filter(owner)
+    conditions += owner_clause
+    params += owner_params
+    if since is not None:
+        conditions += " AND h.recorded_at >= ?"
+        params.append(int(since))
+    if until is not None:
+        conditions += " AND h.recorded_at < ?"
+        params.append(int(until))
+    return query(
+        f"""
+        SELECT h.post_shortcode, p.owner,
+            strftime(CAST(epoch_ms(h.recorded_at * 1000) AS DATE), '%Y-%m-%d') AS day,
+            arg_max(h.views, h.recorded_at) AS views,
+            arg_max(h.likes, h.recorded_at) AS likes,
+            arg_max(h.comments, h.recorded_at) AS comments
+        FROM history h LEFT JOIN posts p ON p.post_shortcode = h.post_shortcode{conditions}
+        GROUP BY h.post_shortcode, p.owner, day
+        ORDER BY h.post_shortcode, day
+        """,
+        params
+    )
+
+
+def cohort_summary(owner=None, by_owner=False):
+    """Posts grouped by the UTC month they were published (and by owner with by_owner): counts, views and engagement."""
+    owner_clause, params = _owner_filter(owner, "owner")
+    group_columns = "owner, cohort" if by_owner else "cohort"
+    return query(
+        f"""
+        SELECT {group_columns},
+            count(*) AS post_count,
+            sum(views) AS total_views,
+            median(views) AS median_views,
+            round(avg(engagement_rate), 2) AS avg_engagement_rate
+        FROM (
+            SELECT *, strftime(CAST(epoch_ms(post_date * 1000) AS DATE), '%Y-%m') AS cohort
+            FROM posts WHERE post_date > 0{owner_clause}
+        )
+        GROUP BY {group_columns}
+        ORDER BY {group_columns}
+        """,
+        params
+    )
+
+
+def top_engagement_velocity(days=7, limit=20, owner=None):
+    """
+    Posts with the most likes + comments gained per day over the last `days` days (needs at
+    least two data points in that window), with views gained for comparison.
+    """
+    owner_clause, owner_params = _owner_filter(owner)
+    return query(
+        f"""
+        WITH windowed AS (
+            SELECT post_shortcode,
+                max(recorded_at) - min(recorded_at) AS span_seconds,
+                arg_max(views, recorded_at) - arg_min(views, recorded_at) AS views_gained,
+                arg_max(coalesce(likes, 0) + coalesce(comments, 0), recorded_at)
+                    - arg_min(coalesce(likes, 0) + coalesce(comments, 0), recorded_at) AS engagements_gained
+            FROM history
+            WHERE recorded_at >= ?
+            GROUP BY post_shortcode
+            HAVING count(*) >= 2 AND max(recorded_at) > min(recorded_at)
+        )
+        SELECT w.post_shortcode, p.owner, p.link, p.views, p.engagement_rate,
+            w.views_gained, w.engagements_gained,
+            round(w.engagements_gained / (w.span_seconds / 86400.0), 2) AS engagements_per_day,
+            round(w.views_gained / (w.span_seconds / 86400.0), 2) AS views_per_day
+        FROM windowed w JOIN posts p ON p.post_shortcode = w.post_shortcode
+        WHERE 1 = 1{owner_clause}
+        ORDER BY engagements_per_day DESC
+        LIMIT ?
+        """,
+        [int(time.time()) - int(days * 86400)] + owner_params + [int(limit)]
+    )
+
+
+REPORTS = {
+    "growth": growth_curve,
+    "cohorts": cohort_summary,
+    "velocity": top_engagement_velocity,
+}
+
+
+def export_report(path, report, fmt=None, **report_params):
+    """Runs one of REPORTS and writes its rows with exporter.export_rows (format from the file extension). Returns the row count."""
+    columns, rows = REPORTS[report](**report_params)
+    return exporter.export_rows(path, columns, rows, fmt=fmt)
+
+
+def close_analytics():
+    global _conn
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
+
+
+atexit.register(close_analytics)
+
+
+if __name__ == "__main__":
+    import sys
+    import json
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ("sync", "rebuild", "report") or (sys.argv[1] == "report" and (len(sys.argv) < 3 or sys.argv[2] not in REPORTS)):
+        print(f"Usage: python analytics.py sync | rebuild | report <{'|'.join(REPORTS)}> [<output file>]")
+        sys.exit(1)
+
+    if sys.argv[1] in ("sync", "rebuild"):
+        sync_result = sync_analytics(rebuild=sys.argv[1] == "rebuild")
+        print(json.dumps(sync_result))
+        sys.exit(0 if sync_result is not None else 1)
+    elif len(sys.argv) > 3:
+        print(f"{export_report(sys.argv[3], sys.argv[2])} rows written to {sys.argv[3]}")
+    else:
+        report_columns, report_rows = REPORTS[sys.argv[2]]()
+        for report_row in report_rows:
+            print(json.dumps(dict(zip(report_columns, report_row))))
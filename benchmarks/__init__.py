@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Offline extraction benchmarks: saved fixtures + a fake WebDriver. Run with `python -m benchmarks.run_benchmarks`.
@@ -0,0 +1,173 @@
+# benchmarks/db_benchmark.py
+"""
+Database benchmarks on a synthetic scraped_posts table, plus a query-plan check for the
+hot queries listed in database.HOT_QUERIES.
+
+Usage (from the project root):
+  python -m benchmarks.db_benchmark                     # build a 1M-row database and time the hot queries
+  python -m benchmarks.db_benchmark --rows 100000 --keep /tmp/bench.db
+  python -m benchmarks.db_benchmark --check-plans       # only verify every hot query uses its index
+
+The synthetic database is built through database.setup_database(), so it has exactly the
+schema and indexes of a real one. Exits with status 1 if a hot query does not use its index.
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import database
+
+SYNTHETIC_OWNER_COUNT = 2000
+SYNTHETIC_FAILED_RATIO = 0.02
+SYNTHETIC_START_EPOCH = 1600000000
+# Filter-box searches, from broad to exact (see database.search_posts)
+SEARCH_BENCHMARK_TERMS = ("creator_7", "creator_77", "synthetic failure", "SYN000012345")
+
+
+def _synthetic_rows(row_count, seed=1234):
+    rng = random.Random(seed)
+    for i in range(row_count):
+        failed = rng.random() < SYNTHETIC_FAILED_RATIO
+        views = None if failed else rng.randint(100, 5000000)
+        likes = None if failed else rng.randint(0, 200000)
+        comments = None if failed else rng.randint(0, 5000)
+        yield {
+            "post_shortcode": f"SYN{i:09d}",
+            "link": f"https://www.instagram.com/reel/SYN{i:09d}/",
+            "post_date": SYNTHETIC_START_EPOCH + rng.randint(0, 10**8),
+            "last_record": SYNTHETIC_START_EPOCH + rng.randint(0, 10**8),
+            "owner": f"creator_{rng.randrange(SYNTHETIC_OWNER_COUNT)}",
+            "likes": likes,
+            "comments": comments,
+            "views": views,
+            "engagement_rate": round((likes + comments) / views * 100, 2) if views else None,
+            "status": "error" if failed else "ok",
+            "error": "Synthetic failure" if failed else None,
+            "timings": None,
+        }
+
+
+def build_synthetic_database(db_file, row_count):
+    """Creates db_file with the current schema and row_count synthetic posts."""
+    database.DB_FILE = db_file
+    database.setup_database()
+    started = time.perf_counter()
+    with database.write_connection() as conn:
+        conn.executemany(database.UPSERT_POST_SQL, _synthetic_rows(row_count))
+        conn.execute("ANALYZE")
+    print(f"Built {row_count} synthetic rows in {time.perf_counter() - started:.1f}s ({db_file})")
+
+
+def _hot_query_params(name):
+    if name == "load_posts_by_owner":
+        return ("creator_7",)
+    if name == "changes_since":
+        return (max(0, database.current_change_version() - 100),) # A UI poll that missed the last 100 changes
+    if name == "load_posts_page":
+        return (SYNTHETIC_START_EPOCH + 5 * 10**7, "", database.DB_PAGE_SIZE) # A page from the middle of the table
+    return ()
+
+
+def check_query_plans():
+    """Returns a list of (name, plan) for hot queries whose plan does not use the expected index."""
+    failures = []
+    for name, (query, expected_index) in database.HOT_QUERIES.items():
+        plan = database.explain_query_plan(query, _hot_query_params(name))
+        uses_index = any(expected_index in detail for detail in plan)
+        needs_sort = any("USE TEMP B-TREE" in detail for detail in plan)
+        print(f"{name:<22} {'ok ' if uses_index and not needs_sort else 'BAD'} {' | '.join(plan)}")
+        if not uses_index or needs_sort:
+            failures.append((name, plan))
+    return failures
+
+
+def time_query(query, params, iterations, first_rows=None):
+    """Times a query (all rows, or only the first `first_rows`); returns latency stats in milliseconds."""
+    latencies = []
+    row_count = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        with database.read_connection() as conn:
+            cursor = conn.execute(query, params)
+            rows = cursor.fetchmany(first_rows) if first_rows else cursor.fetchall()
+        latencies.append((time.perf_counter() - started) * 1000)
+        row_count = len(rows)
+    latencies.sort()
+    return {
+        "rows": row_count,
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+    }
+
+
+def time_search(search_text, iterations):
+    """Times the first page of database.search_posts; returns latency stats in milliseconds."""
+    latencies = []
+    rows = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        rows, _ = database.search_posts(search_text)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        "rows": len(rows),
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic-database benchmarks for database.py")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--keep", help="Build (or reuse) the synthetic database at this path instead of a temp file")
+    parser.add_argument("--check-plans", action="store_true", help="Only check the hot query plans (on a small database)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger().setLevel(logging.ERROR)
+
+    row_count = 10000 if args.check_plans else args.rows
+    temp_dir = None
+    if args.keep:
+        db_file = args.keep
+    else:
+        temp_dir = tempfile.TemporaryDirectory()
+        db_file = os.path.join(temp_dir.name, "bench.db")
+    try:
+        if os.path.exists(db_file):
+            database.DB_FILE = db_file
+            database.setup_database()
+            print(f"Reusing {db_file}")
+        else:
+            build_synthetic_database(db_file, row_count)
+
+        failures = check_query_plans()
+        if not args.check_plans:
+            print(f"\n{'query':<38} {'rows':>9} {'p50 ms':>10} {'mean ms':>10}")
+            for name, (query, _) in database.HOT_QUERIES.items():
+                params = _hot_query_params(name)
+                for label, first_rows in ((name, None), (f"{name}[first 100]", 100)):
+                    stats = time_query(query, params, args.iterations, first_rows)
+                    print(f"{label:<38} {stats['rows']:>9} {stats['p50_ms']:>10.3f} {stats['mean_ms']:>10.3f}")
+            for search_text in SEARCH_BENCHMARK_TERMS:
+                stats = time_search(search_text, args.iterations)
+                print(f"{'search_posts[' + search_text + ']':<38} {stats['rows']:>9} {stats['p50_ms']:>10.3f} {stats['mean_ms']:>10.3f}")
+    finally:
+        database.close_connections()
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+    for name, plan in failures:
+        print(f"PLAN REGRESSION: {name} does not use {database.HOT_QUERIES[name][1]}: {plan}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+# benchmarks/fake_webdriver.py
+"""
+A minimal stand-in for selenium.webdriver.Chrome that serves saved HTML fixtures.
+
+Only the calls made by scraper.py are implemented. Elements are looked up by the exact
+(by, selector) pair the scraper passes in, so fixtures stay independent of a real DOM engine.
+"""
+
+import json
+
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+
+class FakeElement:
+    """An element with fixed text/attributes and its own selector map for relative lookups."""
+
+    def __init__(self, text="", attributes=None, children=None):
+        self.text = text
+        self._attributes = attributes or {}
+        self._children = children or {} # (by, selector) -> [FakeElement]
+
+    def get_attribute(self, name):
+        return self._attributes.get(name)
+
+    def find_element(self, by, value):
+        matches = self._children.get((by, value))
+        if not matches:
+            raise NoSuchElementException(f"FakeElement: no child for {by} {value}")
+        return matches[0]
+
+    def find_elements(self, by, value):
+        return list(self._children.get((by, value), []))
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        pass
+
+
+class FakeWebDriver:
+    """
+    Serves one page. `elements` maps (by, selector) -> [FakeElement]; entries listed in
+    `revealed_after_scrolls` only become findable once the page has been scrolled that many times,
+    which mimics tiles lazily loading into the Reels grid.
+
+    `network_responses` is a list of (url, body) pairs; one is "downloaded" per scroll and
+    surfaces through get_log("performance") and execute_cdp_cmd("Network.getResponseBody").
+    """
+
+    def __init__(self, page_source, current_url="https://www.instagram.com/", elements=None,
+                 revealed_after_scrolls=None, scroll_height_step=1000, network_responses=None):
+        self.page_source = page_source
+        self.current_url = current_url
+        self._elements = elements or {}
+        self._revealed_after_scrolls = revealed_after_scrolls or {}
+        self._scroll_height_step = scroll_height_step
+        self.scroll_count = 0
+        self.quit_called = False
+        self._network_responses = list(network_responses or [])
+        self._pending_log = []
+        self._bodies = {}
+
+    def get(self, url):
+        self.current_url = url
+
+    def set_page_load_timeout(self, seconds):
+        pass
+
+    def execute_script(self, script, *args):
+        if "scrollTo" in script:
+            self.scroll_count += 1
+            if self._network_responses:
+                self._emit_network_response(*self._network_responses.pop(0))
+            return None
+        if "scrollHeight" in script:
+            return (self.scroll_count + 1) * self._scroll_height_step
+        return None
+
+    def _visible_matches(self, by, value):
+        required_scrolls = self._revealed_after_scrolls.get((by, value), 0)
+        if self.scroll_count < required_scrolls:
+            return []
+        return self._elements.get((by, value), [])
+
+    def find_element(self, by, value):
+        matches = self._visible_matches(by, value)
+        if not matches:
+            raise NoSuchElementException(f"FakeWebDriver: no element for {by} {value}")
+        return matches[0]
+
+    def find_elements(self, by, value):
+        return list(self._visible_matches(by, value))
+
+    def _emit_network_response(self, url, body):
+        request_id = f"fake.{len(self._bodies) + 1}"
+        self._bodies[request_id] = body
+        for method, params in (
+            ("Network.responseReceived", {"requestId": request_id, "response": {"url": url, "mimeType": "application/json"}}),
+            ("Network.loadingFinished", {"requestId": request_id}),
+        ):
+            self._pending_log.append({"message": json.dumps({"message": {"method": method, "params": params}})})
+
+    def get_log(self, log_type):
+        if log_type != "performance":
+            return []
+        entries, self._pending_log = self._pending_log, []
+        return entries
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        if cmd == "Network.getResponseBody":
+            return {"body": self._bodies[cmd_args["requestId"]], "base64Encoded": False}
+        return {}
+
+    def quit(self):
+        self.quit_called = True
+
+
+class FakeWebDriverWait:
+    """Drop-in for WebDriverWait that checks the condition once instead of polling until the timeout."""
+
+    def __init__(self, driver, timeout, *args, **kwargs):
+        self._driver = driver
+
+    def until(self, method, message=""):
+        try:
+            value = method(self._driver)
+        except NoSuchElementException:
+            value = None
+        if value:
+            return value
+        raise TimeoutException(message or "FakeWebDriverWait: condition not met")
@@ -0,0 +1,269 @@
+# benchmarks/run_benchmarks.py
+"""
+Offline extraction benchmarks. Drives the scraper's extraction code over saved fixtures
+with a fake WebDriver, so no browser or network is needed.
+
+Usage (from the project root):
+  python -m benchmarks.run_benchmarks                  # run and compare against baseline.json
+  python -m benchmarks.run_benchmarks --save-baseline  # run and store the results as the new baseline
+  python -m benchmarks.run_benchmarks --iterations 500 --tolerance 0.3
+
+Exits with status 1 if any benchmark returns a wrong value or is slower than the baseline
+by more than the tolerance.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+from selenium.webdriver.common.by import By
+
+import scraper
+from benchmarks.fake_webdriver import FakeElement, FakeWebDriver, FakeWebDriverWait
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCHMARK_DIR, "fixtures")
+BASELINE_FILE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+BENCH_SHORTCODE = "BENCHSHORT1"
+VIEW_COUNT_SAMPLES = ["1,234", "10.5K", "1.2M", "3B", "98,765 views", "12,345 likes", "842", "7.1k", "N/A"]
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+_fixture_cache = {}
+
+
+def load_fixture_cached(name):
+    if name not in _fixture_cache:
+        _fixture_cache[name] = load_fixture(name)
+    return _fixture_cache[name]
+
+
+class _NoSleepTime:
+    """Proxy for the time module whose sleep() returns immediately."""
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+    @staticmethod
+    def sleep(seconds):
+        pass
+
+
+class _SilentApp:
+    def set_status_from_thread(self, message):
+        pass
+
+
+@contextmanager
+def offline_scraper(driver_factory):
+    """Points scraper.py at fake drivers, a single-shot WebDriverWait and a no-op sleep."""
+    originals = (scraper._setup_selenium_driver, scraper.WebDriverWait, scraper.time)
+
+    async def _fake_setup(*args, **kwargs):
+        return driver_factory()
+
+    scraper._setup_selenium_driver = _fake_setup
+    scraper.WebDriverWait = FakeWebDriverWait
+    scraper.time = _NoSleepTime()
+    try:
+        yield
+    finally:
+        scraper._setup_selenium_driver, scraper.WebDriverWait, scraper.time = originals
+
+
+# --- Fake driver builders ---
+
+def _likes_primary_xpath_driver():
+    return FakeWebDriver(
+        load_fixture_cached("post_page_likes.html"),
+        current_url=f"https://www.instagram.com/reel/{BENCH_SHORTCODE}/",
+        elements={(By.XPATH, scraper.LIKES_XPATH_REEL_STYLE): [FakeElement("12,345")]},
+    )
+
+
+def _likes_bs_fallback_driver():
+    # No element matches any Selenium strategy, so extraction falls through to BeautifulSoup.
+    return FakeWebDriver(
+        load_fixture_cached("post_page_likes.html"),
+        current_url=f"https://www.instagram.com/reel/{BENCH_SHORTCODE}/",
+    )
+
+
+def _reels_grid_driver(reveal_after_scrolls=5):
+    container = FakeElement(attributes={"outerHTML": load_fixture_cached("grid_container.html")})
+    reel_link = FakeElement(children={
+        (By.XPATH, "ancestor::div[@role='link' or @role='button' or @tabindex='0'][1]"): [container],
+    })
+    selector = (By.CSS_SELECTOR, f'a[href*="/reel/{BENCH_SHORTCODE}/"]')
+    return FakeWebDriver(
+        load_fixture_cached("reels_grid_page.html"),
+        current_url="https://www.instagram.com/bench_creator/reels/",
+        elements={selector: [reel_link]},
+        revealed_after_scrolls={selector: reveal_after_scrolls},
+    )
+
+
+def _reels_network_driver():
+    # The target only arrives in the third clips page; its tile never renders.
+    clips_pages = json.loads(load_fixture_cached("clips_responses.json"))
+    return FakeWebDriver(
+        load_fixture_cached("reels_grid_page.html"),
+        current_url="https://www.instagram.com/bench_creator/reels/",
+        network_responses=[("https://www.instagram.com/api/v1/clips/user/", json.dumps(page)) for page in clips_pages],
+    )
+
+
+# --- Benchmark definitions: name -> (callable returning the result, expected result) ---
+
+def build_benchmarks(loop):
+    app = _SilentApp()
+    shared_html = load_fixture_cached("shared_data_post.html")
+    grid_html = load_fixture_cached("grid_container.html")
+    grid_sibling_html = load_fixture_cached("grid_container_sibling_div.html")
+    post_url = f"https://www.instagram.com/reel/{BENCH_SHORTCODE}/"
+
+    def run_async(coro_factory, driver_factory):
+        def _call():
+            with offline_scraper(driver_factory):
+                return loop.run_until_complete(coro_factory())
+        return _call
+
+    return {
+        "parse_view_count_text": (
+            lambda: [scraper.parse_view_count_text(sample) for sample in VIEW_COUNT_SAMPLES],
+            [1234, 10500, 1200000, 3000000000, 98765, 12345, 842, 7100, None],
+        ),
+        "_parse_shared_data": (
+            lambda: scraper._parse_shared_data(shared_html)["entry_data"]["PostPage"][0]["graphql"]["shortcode_media"]["video_view_count"],
+            1204331,
+        ),
+        "grid_extract[eye_icon_sibling]": (
+            lambda: scraper._extract_views_from_grid_html(grid_html, BENCH_SHORTCODE),
+            1200000,
+        ),
+        "grid_extract[sibling_div]": (
+            lambda: scraper._extract_views_from_grid_html(grid_sibling_html, "BENCHSHORT2"),
+            98765,
+        ),
+        "scrape_likes_from_post_page[primary_xpath]": (
+            run_async(lambda: scraper.scrape_likes_from_post_page(post_url, app, BENCH_SHORTCODE), _likes_primary_xpath_driver),
+            12345,
+        ),
+        "scrape_likes_from_post_page[bs_fallback]": (
+            run_async(lambda: scraper.scrape_likes_from_post_page(post_url, app, BENCH_SHORTCODE), _likes_bs_fallback_driver),
+            12345,
+        ),
+        "scrape_views_selenium[grid_scroll]": (
+            run_async(lambda: scraper.scrape_views_selenium(post_url, app, BENCH_SHORTCODE, "bench_creator"), _reels_grid_driver),
+            1200000,
+        ),
+        "scrape_views_selenium[network_log]": (
+            run_async(lambda: scraper.scrape_views_selenium(post_url, app, BENCH_SHORTCODE, "bench_creator"), _reels_network_driver),
+            2890112,
+        ),
+    }
+
+
+def run_benchmark(func, expected, iterations, warmup):
+    """Runs func repeatedly; returns latency stats in milliseconds and whether the result matched."""
+    result = None
+    for _ in range(warmup):
+        result = func()
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = func()
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    total_seconds = sum(latencies) / 1000
+    return {
+        "iterations": iterations,
+        "throughput_per_s": round(iterations / total_seconds, 1) if total_seconds else None,
+        "mean_ms": round(statistics.mean(latencies), 4),
+        "p50_ms": round(latencies[len(latencies) // 2], 4),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 4),
+        "correct": result == expected,
+        "result": result,
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Returns a list of (name, ratio) for benchmarks whose p50 regressed beyond the tolerance."""
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if not base or not base.get("p50_ms"):
+            continue
+        ratio = stats["p50_ms"] / base["p50_ms"]
+        stats["vs_baseline"] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline extraction benchmarks for scraper.py")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p50 slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as benchmarks/baseline.json")
+    parser.add_argument("--only", help="Run only benchmarks whose name contains this text")
+    args = parser.parse_args(argv)
+
+    # The extraction code logs heavily at INFO/WARNING; keep it out of the measurements.
+    logging.basicConfig(level=logging.ERROR)
+    logging.getLogger().setLevel(logging.ERROR)
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        benchmarks = build_benchmarks(loop)
+        results = {}
+        for name, (func, expected) in benchmarks.items():
+            if args.only and args.only not in name:
+                continue
+            results[name] = run_benchmark(func, expected, args.iterations, args.warmup)
+    finally:
+        loop.close()
+
+    baseline = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+
+    print(f"{'benchmark':<45} {'ops/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'vs base':>8}  ok")
+    for name, stats in results.items():
+        vs_base = f"{stats['vs_baseline']:.2f}x" if "vs_baseline" in stats else "-"
+        print(f"{name:<45} {stats['throughput_per_s']:>10} {stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f} {vs_base:>8}  {'yes' if stats['correct'] else 'NO'}")
+
+    wrong = [name for name, stats in results.items() if not stats["correct"]]
+    for name in wrong:
+        print(f"WRONG RESULT: {name} returned {results[name]['result']!r}")
+    for name, ratio in regressions:
+        print(f"REGRESSION: {name} p50 is {ratio:.2f}x the baseline (tolerance {1 + args.tolerance:.2f}x)")
+
+    if args.save_baseline:
+        stored = {name: {k: stats[k] for k in ("throughput_per_s", "mean_ms", "p50_ms", "p95_ms")} for name, stats in results.items()}
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {BASELINE_FILE}")
+    elif not baseline:
+        print("No baseline stored yet; run with --save-baseline to create one.")
+
+    return 1 if (wrong or regressions) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
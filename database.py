@@ -3,116 +3,1163 @@ import os
 import logging
 from datetime import datetime
 import re
+import json
+import time
+import calendar
+import atexit
+import threading
+import weakref
+from contextlib import contextmanager
 
 # --- Configuration ---
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_FILE = os.path.join(SCRIPT_DIR, "instagram_analytics.db")
 
+# Connection tuning (applied to every connection opened below)
+DB_CACHE_SIZE_KIB = 64 * 1024 # Page cache per connection (64 MiB)
+DB_BUSY_TIMEOUT_MS = 5000 # How long a connection waits on a lock before raising "database is locked"
+
+# Streaming reads
+DB_FETCH_BATCH_SIZE = 1000 # Rows per fetchmany() in iter_posts
+DB_PAGE_SIZE = 500 # Default page size of load_posts_page
+
+# ------------- Connection manager -------------
+# One long-lived writer connection shared by all threads (serialized by _write_lock), plus one
+# reader connection per thread, closed when that thread ends. With WAL, readers never block the
+# writer and vice versa.
+_write_lock = threading.RLock()
+_writer_conn = None
+_writer_db_file = None
+_reader_local = threading.local()
+_reader_conns = set() # Every open reader, so close_connections() can close them
+_reader_conns_lock = threading.Lock()
+_connection_generation = 0 # Bumped by close_connections() so threads drop their closed readers
+
+
+def _open_connection():
+    # check_same_thread=False: the writer is shared behind _write_lock, and readers are
+    # closed from whichever thread calls close_connections().
+    conn = sqlite3.connect(DB_FILE, timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL") # Durable at checkpoints; safe with WAL
+    conn.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_KIB}")
+    conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA recursive_triggers=ON") # So a REPLACE conflict resolution fires DELETE triggers for the row it replaces
+    return conn
+
+
+@contextmanager
+def write_connection():
+    """
+    Yields the shared writer connection while holding the write lock. Commits when the
+    block finishes and rolls back if it raises, so each block is one transaction.
+    """
+    global _writer_conn, _writer_db_file
+    with _write_lock:
+        if _writer_conn is None or _writer_db_file != DB_FILE:
+            if _writer_conn is not None:
+                _writer_conn.close()
+            _writer_conn = _open_connection()
+            _writer_db_file = DB_FILE
+        try:
+            yield _writer_conn
+            _writer_conn.commit()
+        except BaseException:
+            _writer_conn.rollback()
+            raise
+
+
+class _ReaderSlot:
+    """Holds a thread's reader. Only that thread's local references it, so it is freed when the thread ends."""
+    __slots__ = ("conn", "key", "close", "__weakref__")
+
+
+def _close_reader(conn):
+    with _reader_conns_lock:
+        _reader_conns.discard(conn)
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+@contextmanager
+def read_connection():
+    """
+    Yields this thread's reader connection (opened on first use). It is closed when the thread
+    ends, so short-lived worker threads do not leave connections and file descriptors behind.
+    """
+    slot = getattr(_reader_local, "slot", None)
+    if slot is None or slot.key != (DB_FILE, _connection_generation):
+        if slot is not None:
+            slot.close() # Opened on another database file, or before close_connections()
+        slot = _ReaderSlot()
+        slot.conn = _open_connection()
+        slot.key = (DB_FILE, _connection_generation)
+        slot.close = weakref.finalize(slot, _close_reader, slot.conn) # Runs when the thread's local is cleared
+        with _reader_conns_lock:
+            _reader_conns.add(slot.conn)
+        _reader_local.slot = slot
+    yield slot.conn
+
+
+def close_connections():
+    """Closes the writer and every reader connection (called at exit)."""
+    global _writer_conn, _connection_generation
+    with _write_lock:
+        if _writer_conn is not None:
+            _writer_conn.close()
+            _writer_conn = None
+    with _reader_conns_lock:
+        for conn in _reader_conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        _reader_conns.clear()
+        _connection_generation += 1
+
+
+atexit.register(close_connections)
+
+
+# ------------- Schema and migrations -------------
+# PRAGMA user_version records which migrations a database file has been through.
+# A new file starts at 0 and runs them all, so fresh and upgraded databases end up identical.
+SCHEMA_VERSION = 10
+
+# Each migration spells out the SQL it runs rather than sharing the constants below, which describe
+# the current schema: a later change to one of them must not change what an old migration does.
+
+# One row per scrape that produced metrics; scraped_posts holds the latest of them per post.
+# AUTOINCREMENT: ids are never reused after deletes, so "id > last copied id" finds every new row.
+POST_METRICS_HISTORY_TABLE_SQL = """
+    CREATE TABLE post_metrics_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        post_shortcode TEXT NOT NULL,
+        recorded_at INTEGER NOT NULL, -- Epoch seconds of the scrape (scraped_posts.last_record)
+        likes INTEGER,
+        comments INTEGER,
+        views INTEGER,
+        source TEXT NOT NULL DEFAULT 'scrape' -- 'scrape', 'sweep' or 'migration'
+    )
+"""
+# A post's series is one range scan of this index, already in time order
+POST_METRICS_HISTORY_INDEX_SQL = "CREATE INDEX idx_history_shortcode_recorded_at ON post_metrics_history (post_shortcode, recorded_at)"
+
+# Newest first, with the shortcode as tie-breaker so every row has a unique position (keyset
+# paging on idx_scraped_posts_recent)
+RECENT_FIRST_ORDER = "ORDER BY last_record DESC, post_shortcode DESC"
+
+# Change tracking: every insert, update or delete on scraped_posts takes the next value of one
+# database-wide counter. Rows carry it as row_version; deleted rows leave a tombstone with it.
+CHANGE_TRACKING_SQL = (
+    "ALTER TABLE scraped_posts ADD COLUMN row_version INTEGER NOT NULL DEFAULT 0",
+    "CREATE TABLE change_counter (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)",
+    "CREATE TABLE deleted_posts (post_shortcode TEXT PRIMARY KEY, row_version INTEGER NOT NULL)",
+    "CREATE INDEX idx_scraped_posts_row_version ON scraped_posts (row_version)",
+    "CREATE INDEX idx_deleted_posts_row_version ON deleted_posts (row_version)",
+    """
+    CREATE TRIGGER scraped_posts_track_insert AFTER INSERT ON scraped_posts
+    BEGIN
+        UPDATE change_counter SET version = version + 1;
+        UPDATE scraped_posts SET row_version = (SELECT version FROM change_counter) WHERE id = NEW.id;
+        DELETE FROM deleted_posts WHERE post_shortcode = NEW.post_shortcode;
+    END
+    """,
+    # The WHEN clause keeps the trigger's own row_version update from counting as a change
+    """
+    CREATE TRIGGER scraped_posts_track_update AFTER UPDATE ON scraped_posts
+    WHEN NEW.row_version = OLD.row_version
+    BEGIN
+        UPDATE change_counter SET version = version + 1;
+        UPDATE scraped_posts SET row_version = (SELECT version FROM change_counter) WHERE id = NEW.id;
+    END
+    """,
+    """
+    CREATE TRIGGER scraped_posts_track_delete AFTER DELETE ON scraped_posts
+    BEGIN
+        UPDATE change_counter SET version = version + 1;
+        INSERT OR REPLACE INTO deleted_posts (post_shortcode, row_version)
+        VALUES (OLD.post_shortcode, (SELECT version FROM change_counter));
+    END
+    """,
+)
+
+# v10: the insert trigger no longer clears the post's tombstone. A post deleted and re-added since a
+# reader's version then shows up as both deleted and changed, so the reader drops what it held for the
+# old post (its copied history included) before taking the new one.
+CHANGE_TRACKING_INSERT_TRIGGER_SQL = (
+    "DROP TRIGGER scraped_posts_track_insert",
+    """
+    CREATE TRIGGER scraped_posts_track_insert AFTER INSERT ON scraped_posts
+    BEGIN
+        UPDATE change_counter SET version = version + 1;
+        UPDATE scraped_posts SET row_version = (SELECT version FROM change_counter) WHERE id = NEW.id;
+    END
+    """,
+)
+
+# Per-owner rollups. Triggers only mark owners whose posts changed (cheap, and they also catch writes
+# from outside this module); the write paths then recompute just those owners before committing.
+OWNER_STATS_SQL = (
+    """
+    CREATE TABLE owner_stats (
+        owner TEXT PRIMARY KEY,
+        reel_count INTEGER NOT NULL,
+        total_views INTEGER,
+        median_views REAL,
+        avg_engagement_rate REAL,
+        last_refresh INTEGER -- Latest last_record among the owner's posts
+    )
+    """,
+    "CREATE TABLE owner_stats_dirty (owner TEXT PRIMARY KEY)",
+    """
+    CREATE TRIGGER owner_stats_mark_insert AFTER INSERT ON scraped_posts WHEN NEW.owner IS NOT NULL
+    BEGIN
+        INSERT OR IGNORE INTO owner_stats_dirty (owner) VALUES (NEW.owner);
+    END
+    """,
+    """
+    CREATE TRIGGER owner_stats_mark_update AFTER UPDATE OF owner, views, engagement_rate, last_record ON scraped_posts
+    BEGIN
+        INSERT OR IGNORE INTO owner_stats_dirty (owner) SELECT NEW.owner WHERE NEW.owner IS NOT NULL;
+        INSERT OR IGNORE INTO owner_stats_dirty (owner) SELECT OLD.owner WHERE OLD.owner IS NOT NULL;
+    END
+    """,
+    """
+    CREATE TRIGGER owner_stats_mark_delete AFTER DELETE ON scraped_posts WHEN OLD.owner IS NOT NULL
+    BEGIN
+        INSERT OR IGNORE INTO owner_stats_dirty (owner) VALUES (OLD.owner);
+    END
+    """,
+)
+
+# Recomputes the marked owners; each one is an index range scan on idx_scraped_posts_owner
+REFRESH_OWNER_STATS_SQL = (
+    "DELETE FROM owner_stats WHERE owner IN (SELECT owner FROM owner_stats_dirty)",
+    """
+    INSERT INTO owner_stats (owner, reel_count, total_views, median_views, avg_engagement_rate, last_refresh)
+    WITH ranked AS (
+        SELECT owner, views,
+               ROW_NUMBER() OVER (PARTITION BY owner ORDER BY views) AS position,
+               COUNT(*) OVER (PARTITION BY owner) AS counted
+        FROM scraped_posts
+        WHERE owner IN (SELECT owner FROM owner_stats_dirty) AND views IS NOT NULL
+    ),
+    medians AS (
+        SELECT owner, AVG(views) AS median_views FROM ranked
+        WHERE position IN ((counted + 1) / 2, (counted + 2) / 2)
+        GROUP BY owner
+    )
+    SELECT p.owner, COUNT(*), SUM(p.views), m.median_views, ROUND(AVG(p.engagement_rate), 2), MAX(p.last_record)
+    FROM scraped_posts p LEFT JOIN medians m ON m.owner = p.owner
+    WHERE p.owner IN (SELECT owner FROM owner_stats_dirty)
+    GROUP BY p.owner
+    """,
+    "DELETE FROM owner_stats_dirty",
+)
+
+OWNER_STATS_COLUMNS = ("owner", "reel_count", "total_views", "median_views", "avg_engagement_rate", "last_refresh")
+
+# Full-text search over owner, link, shortcode and error. External content: the index stores only
+# tokens and points at scraped_posts rows by id. '_', '.' and '-' are token characters so usernames
+# and shortcodes stay whole; prefix indexes make short "abc*" queries cheap.
+POSTS_FTS_SQL = (
+    """
+    CREATE VIRTUAL TABLE posts_fts USING fts5(
+        post_shortcode, owner, link, error,
+        content='scraped_posts', content_rowid='id',
+        tokenize="unicode61 tokenchars '_.-'", prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER posts_fts_insert AFTER INSERT ON scraped_posts
+    BEGIN
+        INSERT INTO posts_fts (rowid, post_shortcode, owner, link, error)
+        VALUES (NEW.id, NEW.post_shortcode, NEW.owner, NEW.link, NEW.error);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_fts_delete AFTER DELETE ON scraped_posts
+    BEGIN
+        INSERT INTO posts_fts (posts_fts, rowid, post_shortcode, owner, link, error)
+        VALUES ('delete', OLD.id, OLD.post_shortcode, OLD.owner, OLD.link, OLD.error);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_fts_update AFTER UPDATE OF post_shortcode, owner, link, error ON scraped_posts
+    BEGIN
+        INSERT INTO posts_fts (posts_fts, rowid, post_shortcode, owner, link, error)
+        VALUES ('delete', OLD.id, OLD.post_shortcode, OLD.owner, OLD.link, OLD.error);
+        INSERT INTO posts_fts (rowid, post_shortcode, owner, link, error)
+        VALUES (NEW.id, NEW.post_shortcode, NEW.owner, NEW.link, NEW.error);
+    END
+    """,
+)
+
+# v9: the owner_stats marking triggers, with ON CONFLICT DO NOTHING instead of INSERT OR IGNORE.
+# An outer ON CONFLICT DO UPDATE overrides a trigger's OR IGNORE, so a second post of an already
+# marked owner would fail with a UNIQUE error.
+OWNER_STATS_MARK_TRIGGERS_SQL = (
+    "DROP TRIGGER owner_stats_mark_insert",
+    "DROP TRIGGER owner_stats_mark_update",
+    "DROP TRIGGER owner_stats_mark_delete",
+    """
+    CREATE TRIGGER owner_stats_mark_insert AFTER INSERT ON scraped_posts WHEN NEW.owner IS NOT NULL
+    BEGIN
+        INSERT INTO owner_stats_dirty (owner) VALUES (NEW.owner) ON CONFLICT DO NOTHING;
+    END
+    """,
+    """
+    CREATE TRIGGER owner_stats_mark_update AFTER UPDATE OF owner, views, engagement_rate, last_record ON scraped_posts
+    BEGIN
+        INSERT INTO owner_stats_dirty (owner) SELECT NEW.owner WHERE NEW.owner IS NOT NULL ON CONFLICT DO NOTHING;
+        INSERT INTO owner_stats_dirty (owner) SELECT OLD.owner WHERE OLD.owner IS NOT NULL ON CONFLICT DO NOTHING;
+    END
+    """,
+    """
+    CREATE TRIGGER owner_stats_mark_delete AFTER DELETE ON scraped_posts WHEN OLD.owner IS NOT NULL
+    BEGIN
+        INSERT INTO owner_stats_dirty (owner) VALUES (OLD.owner) ON CONFLICT DO NOTHING;
+    END
+    """,
+)
+
+# v9: re-index a post only when one of its indexed columns actually changed, not on every upsert
+POSTS_FTS_UPDATE_TRIGGER_SQL = """
+    CREATE TRIGGER posts_fts_update AFTER UPDATE OF post_shortcode, owner, link, error ON scraped_posts
+    WHEN OLD.post_shortcode IS NOT NEW.post_shortcode OR OLD.owner IS NOT NEW.owner
+        OR OLD.link IS NOT NEW.link OR OLD.error IS NOT NEW.error
+    BEGIN
+        INSERT INTO posts_fts (posts_fts, rowid, post_shortcode, owner, link, error)
+        VALUES ('delete', OLD.id, OLD.post_shortcode, OLD.owner, OLD.link, OLD.error);
+        INSERT INTO posts_fts (rowid, post_shortcode, owner, link, error)
+        VALUES (NEW.id, NEW.post_shortcode, NEW.owner, NEW.link, NEW.error);
+    END
+"""
+
+HISTORY_COLUMNS = ("post_shortcode", "recorded_at", "likes", "comments", "views", "source")
+
+POST_COLUMNS = (
+    "post_shortcode", "link", "post_date", "last_record", "owner",
+    "likes", "comments", "views", "engagement_rate", "status", "error", "timings"
+)
+
+def _migrate_v1_text_schema(cursor):
+    """v1: the original all-TEXT table, with the timings column added in place if missing."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS scraped_posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            post_shortcode TEXT UNIQUE,
+            link TEXT,
+            post_date TEXT,
+            last_record TEXT,
+            owner TEXT,
+            likes TEXT,
+            comments TEXT,
+            views TEXT,
+            engagement_rate TEXT,
+            error TEXT,
+            timings TEXT
+        )
+    """)
+    existing_columns = {row[1] for row in cursor.execute("PRAGMA table_info(scraped_posts)")}
+    if "timings" not in existing_columns:
+        cursor.execute("ALTER TABLE scraped_posts ADD COLUMN timings TEXT")
+
+def _migrate_v2_typed_schema(cursor):
+    """v2: INTEGER/REAL metrics, epoch timestamps and a status column; rows are converted in place."""
+    cursor.execute("ALTER TABLE scraped_posts RENAME TO scraped_posts_v1")
+    # Metrics are NULL when unavailable (the reason is in error); dates are Unix epoch seconds.
+    cursor.execute("""
+        CREATE TABLE scraped_posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            post_shortcode TEXT UNIQUE NOT NULL,
+            link TEXT,
+            post_date INTEGER, -- UTC publish time
+            last_record INTEGER NOT NULL DEFAULT 0, -- Time of the latest scrape
+            owner TEXT,
+            likes INTEGER,
+            comments INTEGER,
+            views INTEGER,
+            engagement_rate REAL, -- Percent, e.g. 3.21
+            status TEXT NOT NULL DEFAULT 'ok', -- 'ok', 'error' or 'timed_out'
+            error TEXT,
+            timings TEXT -- JSON per-stage timing record from scrape_post_data
+        )
+    """)
+    typed_columns = ("post_shortcode", "link", "post_date", "last_record", "owner", "likes", "comments", "views", "engagement_rate", "status", "error", "timings")
+    legacy_columns = ("post_shortcode", "link", "post_date", "last_record", "owner", "likes", "comments", "views", "engagement_rate", "error", "timings")
+    legacy_rows = cursor.execute(f"SELECT {', '.join(legacy_columns)} FROM scraped_posts_v1").fetchall()
+    converted_rows = []
+    for row in legacy_rows:
+        if not row[0]:
+            continue
+        legacy_row = dict(zip(legacy_columns, row))
+        db_row = _build_db_row(legacy_row, row[0])
+        if _to_epoch_seconds(legacy_row["last_record"], assume_utc=False) is None:
+            db_row["last_record"] = 0 # Unknown, rather than the time of the migration
+        converted_rows.append(tuple(db_row[column] for column in typed_columns))
+    # Shortcodes were UNIQUE in v1 too, so every row is a plain insert
+    cursor.executemany(
+        f"INSERT INTO scraped_posts ({', '.join(typed_columns)}) VALUES ({', '.join('?' * len(typed_columns))})",
+        converted_rows
+    )
+    cursor.execute("DROP TABLE scraped_posts_v1")
+    logging.info(f"Converted {len(converted_rows)} rows to the typed scraped_posts schema.")
+
+def _migrate_v3_metrics_history(cursor):
+    """v3: post_metrics_history, seeded with the current values of every post that has metrics."""
+    cursor.execute("""
+        CREATE TABLE post_metrics_history (
+            id INTEGER PRIMARY KEY,
+            post_shortcode TEXT NOT NULL,
+            recorded_at INTEGER NOT NULL, -- Epoch seconds of the scrape (scraped_posts.last_record)
+            likes INTEGER,
+            comments INTEGER,
+            views INTEGER,
+            source TEXT NOT NULL DEFAULT 'scrape' -- 'scrape', 'sweep' or 'migration'
+        )
+    """)
+    cursor.execute("CREATE INDEX idx_history_shortcode_recorded_at ON post_metrics_history (post_shortcode, recorded_at)")
+    cursor.execute("""
+        INSERT INTO post_metrics_history (post_shortcode, recorded_at, likes, comments, views, source)
+        SELECT post_shortcode, last_record, likes, comments, views, 'migration' FROM scraped_posts
+        WHERE likes IS NOT NULL OR comments IS NOT NULL OR views IS NOT NULL
+    """)
+    logging.info(f"Seeded post_metrics_history with {cursor.rowcount} rows.")
+
+def _migrate_v4_scraped_posts_indexes(cursor):
+    """v4: indexes on last_record, owner and failed status, for the hot queries (see HOT_QUERIES)."""
+    cursor.execute("CREATE INDEX idx_scraped_posts_last_record ON scraped_posts (last_record)")
+    cursor.execute("CREATE INDEX idx_scraped_posts_owner ON scraped_posts (owner, last_record)")
+    # Partial: only failed rows are ever looked up by status, and they are a small fraction of the table.
+    # Keyed on last_record so the newest-first listing needs no sort.
+    cursor.execute("CREATE INDEX idx_scraped_posts_failed ON scraped_posts (last_record) WHERE status != 'ok'")
+    cursor.execute("ANALYZE scraped_posts")
+
+def _migrate_v5_keyset_index(cursor):
+    """v5: (last_record, post_shortcode) replaces the last_record index, giving pages a unique, index-ordered key."""
+    cursor.execute("DROP INDEX IF EXISTS idx_scraped_posts_last_record")
+    cursor.execute("CREATE INDEX idx_scraped_posts_recent ON scraped_posts (last_record, post_shortcode)")
+    cursor.execute("ANALYZE scraped_posts")
+
+def _migrate_v6_change_tracking(cursor):
+    """v6: row_version, the change counter, tombstones for deleted posts and the triggers maintaining them."""
+    for statement in CHANGE_TRACKING_SQL:
+        cursor.execute(statement)
+    # Existing rows get distinct versions in insertion order; the counter continues after them
+    cursor.execute("UPDATE scraped_posts SET row_version = id")
+    cursor.execute("INSERT INTO change_counter (id, version) SELECT 1, COALESCE(MAX(id), 0) FROM scraped_posts")
+
+def _migrate_v7_owner_stats(cursor):
+    """v7: owner_stats with its dirty-owner triggers, filled for every existing owner."""
+    for statement in OWNER_STATS_SQL:
+        cursor.execute(statement)
+    cursor.execute("INSERT INTO owner_stats_dirty (owner) SELECT DISTINCT owner FROM scraped_posts WHERE owner IS NOT NULL")
+    _refresh_owner_stats(cursor)
+
+def _migrate_v8_search_index(cursor):
+    """v8: the posts_fts search index, built from the existing rows. Skipped where SQLite lacks FTS5 (search falls back to LIKE)."""
+    try:
+        for statement in POSTS_FTS_SQL:
+            cursor.execute(statement)
+    except sqlite3.OperationalError as e:
+        if "fts5" not in str(e):
+            raise
+        logging.warning(f"SQLite has no FTS5 ({e}); post search will use slower LIKE matching.")
+        return
+    cursor.execute("INSERT INTO posts_fts (posts_fts) VALUES ('rebuild')")
+
+def _migrate_v9_upsert_triggers(cursor):
+    """
+    v9: triggers fit for in-place upserts. The owner_stats marking triggers no longer rely on
+    INSERT OR IGNORE, and the posts_fts update trigger skips rows whose indexed text is unchanged.
+    """
+    for statement in OWNER_STATS_MARK_TRIGGERS_SQL:
+        cursor.execute(statement)
+    if cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'posts_fts_update'").fetchone() is None:
+        return # No FTS5 index (see v8)
+    cursor.execute("DROP TRIGGER posts_fts_update")
+    cursor.execute(POSTS_FTS_UPDATE_TRIGGER_SQL)
+
+def _migrate_v10_history_ids(cursor):
+    """
+    v10: post_metrics_history ids are never reused (the table is rebuilt with AUTOINCREMENT, keeping
+    its ids), and re-adding a deleted post keeps its tombstone so changes_since reports the delete too.
+    """
+    cursor.execute("ALTER TABLE post_metrics_history RENAME TO post_metrics_history_v9")
+    cursor.execute(POST_METRICS_HISTORY_TABLE_SQL)
+    cursor.execute(f"INSERT INTO post_metrics_history (id, {', '.join(HISTORY_COLUMNS)}) SELECT id, {', '.join(HISTORY_COLUMNS)} FROM post_metrics_history_v9")
+    cursor.execute("DROP TABLE post_metrics_history_v9")
+    cursor.execute(POST_METRICS_HISTORY_INDEX_SQL)
+    for statement in CHANGE_TRACKING_INSERT_TRIGGER_SQL:
+        cursor.execute(statement)
+
+MIGRATIONS = {
+    1: _migrate_v1_text_schema,
+    2: _migrate_v2_typed_schema,
+    3: _migrate_v3_metrics_history,
+    4: _migrate_v4_scraped_posts_indexes,
+    5: _migrate_v5_keyset_index,
+    6: _migrate_v6_change_tracking,
+    7: _migrate_v7_owner_stats,
+    8: _migrate_v8_search_index,
+    9: _migrate_v9_upsert_triggers,
+    10: _migrate_v10_history_ids,
+}
+
 def setup_database():
-    """Sets up the SQLite database and creates the scraped_posts table if it doesn't exist."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+    """Creates the database or brings an existing one up to SCHEMA_VERSION, all in one transaction."""
     try:
-        # Added 'error' column to the table schema
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS scraped_posts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                post_shortcode TEXT UNIQUE,
-                link TEXT,
-                post_date TEXT,
-                last_record TEXT,
-                owner TEXT,
-                likes TEXT,
-                comments TEXT,
-                views TEXT,
-                engagement_rate TEXT,
-                error TEXT -- Added error column
-            )
-        """)
-        conn.commit()
+        with write_connection() as conn:
+            cursor = conn.cursor()
+            current_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            if current_version < SCHEMA_VERSION:
+                if not conn.in_transaction:
+                    cursor.execute("BEGIN") # DDL does not open a transaction implicitly
+                for version in range(current_version + 1, SCHEMA_VERSION + 1):
+                    MIGRATIONS[version](cursor)
+                    logging.info(f"Database migrated to schema version {version}.")
+                cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
         logging.info("Database setup/check complete.")
     except Exception as e:
         logging.error(f"Failed to setup database: {e}", exc_info=True)
-    finally:
-        conn.close()
+
+# Columns compared before a write: a post whose scraped values all match its stored row is not rewritten
+COMPARED_POST_COLUMNS = ("link", "post_date", "owner", "likes", "comments", "views", "engagement_rate", "status", "error")
+
+# Updates the existing row in place (same id, only the changed indexes and triggers touched)
+# instead of deleting and reinserting it as INSERT OR REPLACE did
+UPSERT_POST_SQL = f"""
+    INSERT INTO scraped_posts
+    ({', '.join(POST_COLUMNS)})
+    VALUES ({', '.join(':' + column for column in POST_COLUMNS)})
+    ON CONFLICT (post_shortcode) DO UPDATE SET
+    {', '.join(f'{column} = excluded.{column}' for column in POST_COLUMNS if column != 'post_shortcode')}
+"""
+
+# A re-scrape that found nothing new only records when it was checked
+TOUCH_POST_SQL = "UPDATE scraped_posts SET last_record = :last_record WHERE post_shortcode = :post_shortcode"
+
+INSERT_HISTORY_SQL = f"""
+    INSERT INTO post_metrics_history
+    ({', '.join(HISTORY_COLUMNS)})
+    VALUES ({', '.join(':' + column for column in HISTORY_COLUMNS)})
+"""
+
+def _refresh_owner_stats(cursor):
+    """Recomputes owner_stats for the owners marked dirty; runs inside the caller's write transaction."""
+    for statement in REFRESH_OWNER_STATS_SQL:
+        cursor.execute(statement)
+
+def _shortcode_from_link(link):
+    if not isinstance(link, str):
+        return None
+    shortcode_match = re.search(r"/(?:p|reel|reels)/([A-Za-z0-9_-]+)", link)
+    return shortcode_match.group(1) if shortcode_match else None
+
+def _to_int_metric(value):
+    """12345, "12345" or "12,345" -> int; "N/A (...)", None and anything else -> None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    if isinstance(value, str) and re.fullmatch(r"\s*\d[\d,]*\s*", value):
+        return int(value.replace(",", ""))
+    return None
+
+def _to_percent(value):
+    """3.21 or "3.21%" -> 3.21; anything else -> None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return round(float(value), 2)
+    if isinstance(value, str):
+        try:
+            return round(float(value.strip().rstrip("%")), 2)
+        except ValueError:
+            return None
+    return None
+
+def _to_epoch_seconds(value, assume_utc):
+    """
+    Converts epoch numbers, datetimes and "YYYY-MM-DD[ HH:MM:SS]" strings to epoch seconds.
+    Naive values are read as UTC (post dates from Instaloader) or local time (last_record).
+    """
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        text = value.strip()
+        for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+            try:
+                value = datetime.strptime(text[:19], fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None and assume_utc:
+            return calendar.timegm(value.timetuple())
+        return int(value.timestamp())
+    return None
+
+def normalize_post_data(post_data_dict, post_shortcode=None):
+    """
+    Returns the typed form of a post, as stored in scraped_posts: metrics as int/float
+    (None when unavailable), dates as epoch seconds and a status derived from error/timed_out.
+    Accepts raw scrape results, UI rows and already-normalized rows alike.
+    """
+    post_shortcode = post_shortcode or post_data_dict.get("post_shortcode") or _shortcode_from_link(post_data_dict.get("link"))
+    error = post_data_dict.get("error") or None
+    if post_data_dict.get("timed_out") or (error and post_data_dict.get("status") == "timed_out"):
+        status = "timed_out" # Scrape results carry the flag; stored rows carry the status
+    else:
+        status = "error" if error else "ok"
+    owner = post_data_dict.get("owner")
+    last_record = _to_epoch_seconds(post_data_dict.get("last_record"), assume_utc=False)
+    return {
+        "post_shortcode": post_shortcode,
+        "link": post_data_dict.get("link") or None,
+        "post_date": _to_epoch_seconds(post_data_dict.get("post_date"), assume_utc=True),
+        "last_record": last_record if last_record is not None else int(time.time()),
+        "owner": owner if owner and owner != "N/A" else None,
+        "likes": _to_int_metric(post_data_dict.get("likes")),
+        "comments": _to_int_metric(post_data_dict.get("comments")),
+        "views": _to_int_metric(post_data_dict.get("views")),
+        "engagement_rate": _to_percent(post_data_dict.get("engagement_rate")),
+        "status": status,
+        "error": error,
+        "timings": post_data_dict.get("timings"),
+    }
+
+def _build_db_row(post_data_dict, post_shortcode):
+    """Converts a post dict into the parameters of UPSERT_POST_SQL."""
+    db_row = normalize_post_data(post_data_dict, post_shortcode)
+    timings_record = db_row["timings"]
+    if timings_record and not isinstance(timings_record, str):
+        db_row["timings"] = json.dumps(timings_record) # Per-stage timing record, if any
+    return db_row
+
+def _build_history_rows(db_rows, sources):
+    """History rows for the scrapes in db_rows that produced at least one metric (failed scrapes add no data point)."""
+    return [
+        {
+            "post_shortcode": db_row["post_shortcode"],
+            "recorded_at": db_row["last_record"],
+            "likes": db_row["likes"],
+            "comments": db_row["comments"],
+            "views": db_row["views"],
+            "source": source or "scrape",
+        }
+        for db_row, source in zip(db_rows, sources)
+        if db_row["likes"] is not None or db_row["comments"] is not None or db_row["views"] is not None
+    ]
+
+def _write_post_rows(cursor, db_rows, sources, touch_unchanged):
+    """
+    Compare-before-write inside the caller's transaction: looks up the stored COMPARED_POST_COLUMNS
+    of the whole batch in one query per 500 posts, upserts (with a history data point) only posts
+    that are new or changed. With touch_unchanged the rest have last_record updated alone and still
+    get their history data point, since the scrape observed those values at that time.
+    Returns (changed_rows, unchanged_rows).
+    """
+    shortcodes = list({db_row["post_shortcode"] for db_row in db_rows})
+    stored = {}
+    # Chunked to stay under SQLite's bound-parameter limit
+    for start in range(0, len(shortcodes), 500):
+        chunk = shortcodes[start:start + 500]
+        cursor.execute(
+            f"SELECT post_shortcode, {', '.join(COMPARED_POST_COLUMNS)} FROM scraped_posts "
+            f"WHERE post_shortcode IN ({', '.join('?' * len(chunk))})",
+            chunk
+        )
+        for row in cursor.fetchall():
+            stored[row[0]] = row[1:]
+
+    changed_rows, changed_sources, unchanged_rows, unchanged_sources = [], [], [], []
+    for db_row, source in zip(db_rows, sources):
+        if stored.get(db_row["post_shortcode"]) == tuple(db_row[col] for col in COMPARED_POST_COLUMNS):
+            unchanged_rows.append(db_row)
+            unchanged_sources.append(source)
+        else:
+            changed_rows.append(db_row)
+            changed_sources.append(source)
+
+    if touch_unchanged:
+        history_rows = _build_history_rows(changed_rows + unchanged_rows, changed_sources + unchanged_sources)
+    else:
+        history_rows = _build_history_rows(changed_rows, changed_sources)
+    if history_rows:
+        cursor.executemany(INSERT_HISTORY_SQL, history_rows)
+    if changed_rows:
+        cursor.executemany(UPSERT_POST_SQL, changed_rows)
+    if touch_unchanged and unchanged_rows:
+        cursor.executemany(TOUCH_POST_SQL, unchanged_rows)
+    if changed_rows or (touch_unchanged and unchanged_rows):
+        _refresh_owner_stats(cursor)
+    return changed_rows, unchanged_rows
+
+def save_many_to_database(post_data_dicts, stats=None):
+    """
+    Saves or updates many scraped posts in a single transaction (one commit for the whole batch).
+    Each dict needs "post_shortcode" or a post "link". New and changed posts are written in full;
+    a post whose values match its stored row only has last_record updated. Every scrape with metrics
+    gets a data point in post_metrics_history either way. Returns the number of posts saved.
+    `stats` (a dict, if given) has "written" and "unchanged" (writes avoided) incremented.
+    """
+    db_rows = []
+    sources = []
+    for post_data_dict in post_data_dicts:
+        post_shortcode = post_data_dict.get("post_shortcode") or _shortcode_from_link(post_data_dict.get("link"))
+        if not post_shortcode:
+            logging.warning(f"Skipping save of post without shortcode: {post_data_dict.get('link')}")
+            continue
+        db_rows.append(_build_db_row(post_data_dict, post_shortcode))
+        sources.append(post_data_dict.get("source"))
+    if not db_rows:
+        return 0
+
+    try:
+        # The lookup runs on the writer so nothing can change between compare and write
+        with write_connection() as conn:
+            changed_rows, unchanged_rows = _write_post_rows(conn.cursor(), db_rows, sources, touch_unchanged=True)
+        if stats is not None:
+            stats["written"] = stats.get("written", 0) + len(changed_rows)
+            stats["unchanged"] = stats.get("unchanged", 0) + len(unchanged_rows)
+        logging.info(f"Saved {len(db_rows)} posts to database in one transaction ({len(unchanged_rows)} unchanged, only last_record and history updated).")
+        return len(db_rows)
+    except sqlite3.Error as e:
+        logging.error(f"Database error saving {len(db_rows)} posts: {e}", exc_info=True)
+        return 0
 
 def save_to_database(post_data_dict, post_shortcode):
     """Saves or updates a scraped post's data in the database."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+    save_many_to_database([dict(post_data_dict, post_shortcode=post_shortcode)])
+
+def save_changed_posts_to_database(post_data_dicts):
+    """
+    Bulk upsert for account sweeps: writes (in one transaction) only posts that are new or whose
+    compared columns changed, and leaves unchanged posts untouched.
+    Only written posts get a history data point; an unchanged post's series already ends at these values.
+    Returns the list of shortcodes that were written.
+    """
+    db_rows = {}
+    sources = {}
+    for post_data_dict in post_data_dicts:
+        post_shortcode = post_data_dict.get("post_shortcode")
+        if post_shortcode:
+            db_rows[post_shortcode] = _build_db_row(post_data_dict, post_shortcode)
+            sources[post_shortcode] = post_data_dict.get("source")
+    if not db_rows:
+        return []
+
     try:
-        # Format engagement_rate as percentage string before saving
-        engagement_rate_value = post_data_dict.get("engagement_rate", "N/A")
-        if isinstance(engagement_rate_value, (int, float)) and engagement_rate_value != "N/A":
-            formatted_engagement_rate = f"{engagement_rate_value:.2f}%"
-        else:
-            formatted_engagement_rate = str(engagement_rate_value) # Ensures "N/A" or other strings are saved as-is
-
-        db_row = {
-            "post_shortcode": post_shortcode,
-            "link": post_data_dict.get("link", "N/A"),
-            "post_date": post_data_dict.get("post_date", "N/A"),
-            "last_record": post_data_dict.get("last_record", datetime.now().strftime("%Y-%m-%d")), # Use local time for consistency with UI
-            "owner": post_data_dict.get("owner", "N/A"),
-            "likes": str(post_data_dict.get("likes", "N/A")),
-            "comments": str(post_data_dict.get("comments", "N/A")),
-            "views": str(post_data_dict.get("views", "N/A")),
-            "engagement_rate": formatted_engagement_rate, # Save as percentage string
-            "error": post_data_dict.get("error", None) # Save the error status
-        }
-        cursor.execute("""
-            INSERT OR REPLACE INTO scraped_posts
-            (post_shortcode, link, post_date, last_record, owner, likes, comments, views, engagement_rate, error)
-            VALUES (:post_shortcode, :link, :post_date, :last_record, :owner, :likes, :comments, :views, :engagement_rate, :error)
-        """, db_row)
-        conn.commit()
-        logging.info(f"Data for {post_shortcode} saved to database.")
+        with write_connection() as conn:
+            changed_rows, _ = _write_post_rows(conn.cursor(), list(db_rows.values()), list(sources.values()), touch_unchanged=False)
+        logging.info(f"Sweep batch: {len(changed_rows)} of {len(db_rows)} posts new or changed and saved to database.")
+        return [db_row["post_shortcode"] for db_row in changed_rows]
     except sqlite3.Error as e:
-        log_msg = f"Database error for {post_shortcode}: {e}"
-        logging.error(log_msg, exc_info=True)
-    finally:
-        conn.close()
+        logging.error(f"Database error saving sweep batch: {e}", exc_info=True)
+        return []
 
-def load_data_from_db():
-    """Loads all scraped post data from the database."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
-
-    # Explicitly select all columns in the order they appear in the table creation
-    # This order must match db_columns in ui.py for correct mapping
-    db_columns = [
-        "post_shortcode", "link", "post_date", "last_record",
-        "owner", "likes", "comments", "views", "engagement_rate", "error"
-    ]
-    select_query = f"SELECT {', '.join(db_columns)} FROM scraped_posts ORDER BY last_record DESC"
+# Explicitly select all columns in the order they appear in the table creation
+# This order must match db_columns in ui.py for correct mapping
+LOADED_POST_COLUMNS = (
+    "post_shortcode", "link", "post_date", "last_record",
+    "owner", "likes", "comments", "views", "engagement_rate", "error", "status", "row_version"
+)
+
+# The queries every app start or filter runs, and the index each one must be served by.
+# benchmarks/db_benchmark.py --check-plans fails if a plan stops using its index.
+HOT_QUERIES = {
+    "load_data_from_db": (
+        f"SELECT {', '.join(LOADED_POST_COLUMNS)} FROM scraped_posts {RECENT_FIRST_ORDER}",
+        "idx_scraped_posts_recent",
+    ),
+    "load_posts_page": (
+        f"SELECT {', '.join(LOADED_POST_COLUMNS)} FROM scraped_posts "
+        f"WHERE (last_record, post_shortcode) < (?, ?) {RECENT_FIRST_ORDER} LIMIT ?",
+        "idx_scraped_posts_recent",
+    ),
+    "changes_since": (
+        f"SELECT {', '.join(LOADED_POST_COLUMNS)} FROM scraped_posts WHERE row_version > ? ORDER BY row_version",
+        "idx_scraped_posts_row_version",
+    ),
+    "load_posts_by_owner": (
+        f"SELECT {', '.join(LOADED_POST_COLUMNS)} FROM scraped_posts WHERE owner = ? ORDER BY last_record DESC",
+        "idx_scraped_posts_owner",
+    ),
+    "load_failed_posts": (
+        f"SELECT {', '.join(LOADED_POST_COLUMNS)} FROM scraped_posts WHERE status != 'ok' ORDER BY last_record DESC",
+        "idx_scraped_posts_failed",
+    ),
+}
+
+def explain_query_plan(query, params=()):
+    """Returns the EXPLAIN QUERY PLAN detail lines for a query."""
+    with read_connection() as conn:
+        return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()]
+
+def _run_hot_query(name, params=()):
     try:
-        cursor.execute(select_query)
-        rows = cursor.fetchall()
-        logging.info(f"Loaded {len(rows)} rows from database.")
+        with read_connection() as conn:
+            rows = conn.execute(HOT_QUERIES[name][0], params).fetchall()
+        logging.info(f"{name}: loaded {len(rows)} rows from database.")
         return rows
     except sqlite3.Error as e:
-        logging.error(f"Database error loading data: {e}", exc_info=True)
+        logging.error(f"Database error in {name}: {e}", exc_info=True)
         return []
-    finally:
-        conn.close()
 
-def delete_data_from_db(link):
-    """Deletes a record from the database based on its link."""
-    conn = sqlite3.connect(DB_FILE)
-    cursor = conn.cursor()
+def load_data_from_db():
+    """Loads all scraped post data from the database (typed values, see normalize_post_data), newest first."""
+    return _run_hot_query("load_data_from_db")
+
+HISTORY_EXPORT_COLUMNS = ("post_shortcode", "owner", "recorded_at", "likes", "comments", "views", "source")
+
+def _filter_clause(owner, since, until, owner_column, date_column):
+    """WHERE clause and parameters for an owner filter and a [since, until) epoch-second range."""
+    conditions = []
+    params = []
+    if owner:
+        conditions.append(f"{owner_column} = ?")
+        params.append(owner)
+    if since is not None:
+        conditions.append(f"{date_column} >= ?")
+        params.append(int(since))
+    if until is not None:
+        conditions.append(f"{date_column} < ?")
+        params.append(int(until))
+    return (" WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+def _iter_query(query, params, batch_size):
+    with read_connection() as conn:
+        cursor = conn.execute(query, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+def _count_query(query, params):
     try:
-        shortcode_match = re.search(r"/(?:p|reel|reels)/([A-Za-z0-9_-]+)", link)
-        if shortcode_match:
-            post_shortcode = shortcode_match.group(1)
-            cursor.execute("DELETE FROM scraped_posts WHERE post_shortcode = ?", (post_shortcode,))
-            conn.commit()
-            if cursor.rowcount > 0:
-                logging.info(f"Successfully deleted record for post_shortcode: {post_shortcode}")
-            else:
-                logging.warning(f"No record found for post_shortcode: {post_shortcode} (link: {link})")
-        else:
-            logging.warning(f"Could not extract shortcode from link: {link}. Cannot delete.")
+        with read_connection() as conn:
+            return conn.execute(query, params).fetchone()[0]
     except sqlite3.Error as e:
-        logging.error(f"Database error deleting data for link {link}: {e}", exc_info=True)
+        logging.error(f"Database error counting rows: {e}", exc_info=True)
+        return None
+
+def iter_posts(batch_size=DB_FETCH_BATCH_SIZE, owner=None, since=None, until=None):
+    """
+    Yields the same rows as load_data_from_db, newest first, fetching batch_size rows at a time,
+    so callers never hold the whole table in memory. The rows come from one consistent snapshot.
+    Optionally only one owner's posts and/or posts published in [since, until) (epoch seconds).
+    """
+    if owner is None and since is None and until is None:
+        return _iter_query(HOT_QUERIES["load_data_from_db"][0], (), batch_size)
+    where, params = _filter_clause(owner, since, until, "owner", "post_date")
+    return _iter_query(f"SELECT {', '.join(LOADED_POST_COLUMNS)} FROM scraped_posts{where} {RECENT_FIRST_ORDER}", params, batch_size)
+
+def count_posts(owner=None, since=None, until=None):
+    """Number of rows iter_posts would yield for the same filters (None on error)."""
+    where, params = _filter_clause(owner, since, until, "owner", "post_date")
+    return _count_query(f"SELECT COUNT(*) FROM scraped_posts{where}", params)
+
+def iter_post_history(batch_size=DB_FETCH_BATCH_SIZE, owner=None, since=None, until=None):
+    """
+    Streams post_metrics_history as HISTORY_EXPORT_COLUMNS tuples, grouped by post and oldest first
+    within a post, optionally for one owner and/or data points recorded in [since, until).
+    """
+    where, params = _filter_clause(owner, since, until, "p.owner", "h.recorded_at")
+    query = (
+        "SELECT h.post_shortcode, p.owner, h.recorded_at, h.likes, h.comments, h.views, h.source "
+        f"FROM post_metrics_history h LEFT JOIN scraped_posts p ON p.post_shortcode = h.post_shortcode{where} "
+        "ORDER BY h.post_shortcode, h.recorded_at, h.id"
+    )
+    return _iter_query(query, params, batch_size)
+
+def count_post_history(owner=None, since=None, until=None):
+    """Number of rows iter_post_history would yield for the same filters (None on error)."""
+    where, params = _filter_clause(owner, since, until, "p.owner", "h.recorded_at")
+    return _count_query(
+        f"SELECT COUNT(*) FROM post_metrics_history h LEFT JOIN scraped_posts p ON p.post_shortcode = h.post_shortcode{where}",
+        params
+    )
+
+HISTORY_SYNC_COLUMNS = ("id",) + HISTORY_COLUMNS
+
+def iter_post_history_after(after_id, batch_size=DB_FETCH_BATCH_SIZE):
+    """Streams post_metrics_history rows (HISTORY_SYNC_COLUMNS) with an id above after_id, in id order, for incremental copies."""
+    return _iter_query(
+        f"SELECT {', '.join(HISTORY_SYNC_COLUMNS)} FROM post_metrics_history WHERE id > ? ORDER BY id",
+        (after_id,), batch_size
+    )
+
+def load_posts_page(after=None, limit=DB_PAGE_SIZE):
+    """
+    Keyset pagination over the load_data_from_db order. Returns (rows, next_after): pass
+    next_after back as `after` to get the following page; it is None after the last page.
+    Each page is an index range scan, so page N costs the same as page 1.
+    """
+    if after is None:
+        after = (2**63 - 1, "") # Sorts before every row in descending order
+    rows = _run_hot_query("load_posts_page", (after[0], after[1], limit))
+    next_after = (rows[-1][3], rows[-1][0]) if len(rows) == limit else None
+    return rows, next_after
+
+def load_posts_by_owner(owner):
+    """Loads one account's posts, newest first (same columns as load_data_from_db)."""
+    return _run_hot_query("load_posts_by_owner", (owner,))
+
+def load_failed_posts():
+    """Loads posts whose last scrape failed or timed out, newest first (same columns as load_data_from_db)."""
+    return _run_hot_query("load_failed_posts")
+
+def current_change_version():
+    """Returns the database's change counter: the row_version of the most recent change to scraped_posts."""
+    try:
+        with read_connection() as conn:
+            row = conn.execute("SELECT version FROM change_counter WHERE id = 1").fetchone()
+        return row[0] if row else 0
+    except sqlite3.Error as e:
+        logging.error(f"Database error reading change version: {e}", exc_info=True)
+        return 0
+
+def changes_since(version, limit=None):
+    """
+    Returns (changed_rows, deleted_shortcodes, new_version) for everything that happened after `version`:
+    changed_rows are inserted or updated posts (load_data_from_db columns) in change order, deleted_shortcodes
+    the posts deleted since, including ones re-added afterwards (also in changed_rows, so apply deletions
+    first). Pass new_version to the next call. Returns None if the changes could not be read.
+    With a limit, about that many changed rows are returned (more only when rows share the last version)
+    and new_version stops at the last of them; a result of `limit` rows or more means more may be waiting.
+    """
+    try:
+        with read_connection() as conn:
+            conn.execute("BEGIN") # One snapshot for all three reads
+            try:
+                new_version = conn.execute("SELECT version FROM change_counter WHERE id = 1").fetchone()[0]
+                if new_version == version:
+                    return [], [], version
+                if limit is None:
+                    changed_rows = conn.execute(HOT_QUERIES["changes_since"][0], (version,)).fetchall()
+                else:
+                    changed_rows = conn.execute(f"{HOT_QUERIES['changes_since'][0]} LIMIT ?", (version, limit)).fetchall()
+                    if len(changed_rows) == limit:
+                        new_version = changed_rows[-1][LOADED_POST_COLUMNS.index("row_version")]
+                        # Rows can share a version (e.g. written by another tool); the page takes all of the last one's
+                        changed_rows = [
+                            row for row in changed_rows if row[LOADED_POST_COLUMNS.index("row_version")] < new_version
+                        ] + conn.execute(
+                            f"SELECT {', '.join(LOADED_POST_COLUMNS)} FROM scraped_posts WHERE row_version = ?", (new_version,)
+                        ).fetchall()
+                deleted_shortcodes = [
+                    row[0] for row in conn.execute(
+                        "SELECT post_shortcode FROM deleted_posts WHERE row_version > ? AND row_version <= ?", (version, new_version)
+                    )
+                ]
+            finally:
+                conn.commit()
+        if changed_rows or deleted_shortcodes:
+            logging.info(f"Changes since version {version}: {len(changed_rows)} changed, {len(deleted_shortcodes)} deleted (now {new_version}).")
+        return changed_rows, deleted_shortcodes, new_version
+    except sqlite3.Error as e:
+        logging.error(f"Database error reading changes since version {version}: {e}", exc_info=True)
+        return None
+
+def load_owner_stats(owner=None):
+    """
+    Returns per-owner rollups as OWNER_STATS_COLUMNS tuples, most viewed first (or only `owner`'s row).
+    Reads the materialized owner_stats table, so the cost grows with the number of owners, not posts.
+    """
+    try:
+        with read_connection() as conn:
+            has_dirty_owners = conn.execute("SELECT 1 FROM owner_stats_dirty LIMIT 1").fetchone() is not None
+        if has_dirty_owners:
+            # Marked by a write that did not go through this module; bring those owners up to date first
+            with write_connection() as conn:
+                _refresh_owner_stats(conn.cursor())
+        query = f"SELECT {', '.join(OWNER_STATS_COLUMNS)} FROM owner_stats"
+        params = ()
+        if owner is not None:
+            query += " WHERE owner = ?"
+            params = (owner,)
+        query += " ORDER BY total_views DESC, owner"
+        with read_connection() as conn:
+            return conn.execute(query, params).fetchall()
+    except sqlite3.Error as e:
+        logging.error(f"Database error loading owner stats: {e}", exc_info=True)
+        return []
+
+SEARCH_COLUMNS = ("post_shortcode", "owner", "link", "error")
+
+def _fts_match_expression(search_text):
+    """'Some_Creator timeout' -> '"Some_Creator"* "timeout"*': every word must prefix-match some column."""
+    words = search_text.split()
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in words)
+
+def _has_search_index(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'posts_fts'").fetchone() is not None
+
+def _search_match_clause(conn, search_text):
+    """The WHERE clause (and its parameters) selecting scraped_posts rows that match search_text."""
+    if _has_search_index(conn):
+        return "id IN (SELECT rowid FROM posts_fts WHERE posts_fts MATCH ?)", [_fts_match_expression(search_text)]
+    match_clauses = []
+    match_params = []
+    for word in search_text.split():
+        match_clauses.append("(" + " OR ".join(f"{col} LIKE ? ESCAPE '\\'" for col in SEARCH_COLUMNS) + ")")
+        pattern = "%" + word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        match_params.extend([pattern] * len(SEARCH_COLUMNS))
+    return " AND ".join(match_clauses), match_params
+
+def search_posts(search_text, after=None, limit=DB_PAGE_SIZE):
+    """
+    Posts whose owner, link, shortcode or error contain words starting with every word of search_text,
+    newest first, paginated like load_posts_page: returns (rows, next_after). Uses the posts_fts
+    index, or case-insensitive LIKE matching where SQLite has no FTS5.
+    """
+    if not search_text or not search_text.strip():
+        return load_posts_page(after, limit)
+    if after is None:
+        after = (2**63 - 1, "")
+    try:
+        with read_connection() as conn:
+            match_clause, match_params = _search_match_clause(conn, search_text)
+            rows = conn.execute(
+                f"SELECT {', '.join(LOADED_POST_COLUMNS)} FROM scraped_posts "
+                f"WHERE {match_clause} AND (last_record, post_shortcode) < (?, ?) {RECENT_FIRST_ORDER} LIMIT ?",
+                match_params + [after[0], after[1], limit]
+            ).fetchall()
+    except sqlite3.Error as e:
+        logging.error(f"Database error searching posts for '{search_text}': {e}", exc_info=True)
+        return [], None
+    next_after = (rows[-1][3], rows[-1][0]) if len(rows) == limit else None
+    return rows, next_after
+
+def filter_matching_shortcodes(search_text, post_shortcodes):
+    """
+    Returns the set of post_shortcodes whose posts match search_text as search_posts would, so a live
+    filter can take in changed posts without re-running the whole search. None on a database error.
+    """
+    post_shortcodes = list(post_shortcodes)
+    matching = set()
+    try:
+        with read_connection() as conn:
+            match_clause, match_params = _search_match_clause(conn, search_text)
+            # Chunked to stay under SQLite's bound-parameter limit
+            for start in range(0, len(post_shortcodes), 500):
+                chunk = post_shortcodes[start:start + 500]
+                matching.update(row[0] for row in conn.execute(
+                    f"SELECT post_shortcode FROM scraped_posts "
+                    f"WHERE post_shortcode IN ({', '.join('?' * len(chunk))}) AND {match_clause}",
+                    chunk + match_params
+                ))
+    except sqlite3.Error as e:
+        logging.error(f"Database error matching posts against '{search_text}': {e}", exc_info=True)
+        return None
+    return matching
+
+@contextmanager
+def import_filter_session():
+    """
+    Yields a private connection for filter_new_or_stale_shortcodes, with a temp table remembering
+    the shortcodes already accepted during this import. The temp table is disk-backed, so memory
+    stays bounded however many rows the import has.
+    """
+    conn = _open_connection()
+    try:
+        conn.execute("PRAGMA temp_store=FILE")
+        conn.execute("CREATE TEMP TABLE import_seen (post_shortcode TEXT PRIMARY KEY)")
+        conn.commit()
+        yield conn
     finally:
         conn.close()
+
+def filter_new_or_stale_shortcodes(session_conn, post_shortcodes, stale_before):
+    """
+    Returns the shortcodes (in input order, without duplicates) that are not stored yet, were last
+    recorded before stale_before (epoch seconds) or whose last scrape failed, and that were not
+    accepted earlier in this import session. One query per call, using the unique shortcode index.
+    """
+    if not post_shortcodes:
+        return []
+    rows = session_conn.execute(
+        """
+        SELECT j.value FROM json_each(?) j
+        LEFT JOIN scraped_posts p ON p.post_shortcode = j.value
+        WHERE j.value NOT IN (SELECT post_shortcode FROM temp.import_seen)
+          AND (p.post_shortcode IS NULL OR p.last_record < ? OR p.status != 'ok')
+        GROUP BY j.value
+        ORDER BY MIN(j.key)
+        """,
+        (json.dumps(list(post_shortcodes)), int(stale_before))
+    ).fetchall()
+    accepted = [row[0] for row in rows]
+    session_conn.executemany("INSERT INTO temp.import_seen (post_shortcode) VALUES (?)", ((post_shortcode,) for post_shortcode in accepted))
+    session_conn.commit()
+    return accepted
+
+def load_post_history(post_shortcode, since=None):
+    """
+    Returns a post's metrics series as (recorded_at, likes, comments, views, source) tuples,
+    oldest first, optionally only points recorded at or after `since` (epoch seconds).
+    """
+    query = "SELECT recorded_at, likes, comments, views, source FROM post_metrics_history WHERE post_shortcode = ?"
+    params = [post_shortcode]
+    if since is not None:
+        query += " AND recorded_at >= ?"
+        params.append(int(since))
+    query += " ORDER BY recorded_at, id"
+    try:
+        with read_connection() as conn:
+            return conn.execute(query, params).fetchall()
+    except sqlite3.Error as e:
+        logging.error(f"Database error loading history for {post_shortcode}: {e}", exc_info=True)
+        return []
+
+def delete_posts_from_db(post_shortcodes):
+    """
+    Deletes many posts, and their metrics history, in one transaction. The shortcodes go into a
+    temp table that both DELETEs join against, so there is no bound-parameter limit.
+    Returns the number of posts deleted.
+    """
+    post_shortcodes = {post_shortcode for post_shortcode in post_shortcodes if post_shortcode}
+    if not post_shortcodes:
+        return 0
+    try:
+        with write_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS shortcodes_to_delete (post_shortcode TEXT PRIMARY KEY)")
+            cursor.execute("DELETE FROM shortcodes_to_delete")
+            cursor.executemany("INSERT INTO shortcodes_to_delete (post_shortcode) VALUES (?)", ((post_shortcode,) for post_shortcode in post_shortcodes))
+            cursor.execute("DELETE FROM post_metrics_history WHERE post_shortcode IN (SELECT post_shortcode FROM shortcodes_to_delete)")
+            cursor.execute("DELETE FROM scraped_posts WHERE post_shortcode IN (SELECT post_shortcode FROM shortcodes_to_delete)")
+            deleted_count = cursor.rowcount
+            cursor.execute("DELETE FROM shortcodes_to_delete")
+            _refresh_owner_stats(cursor)
+        if deleted_count < len(post_shortcodes):
+            logging.warning(f"{len(post_shortcodes) - deleted_count} of {len(post_shortcodes)} posts to delete had no record.")
+        logging.info(f"Deleted {deleted_count} posts in one transaction.")
+        return deleted_count
+    except sqlite3.Error as e:
+        logging.error(f"Database error deleting {len(post_shortcodes)} posts: {e}", exc_info=True)
+        return 0
+
+def delete_data_from_db(link):
+    """Deletes a record, and its metrics history, from the database based on its link."""
+    post_shortcode = _shortcode_from_link(link)
+    if post_shortcode:
+        delete_posts_from_db([post_shortcode])
+    else:
+        logging.warning(f"Could not extract shortcode from link: {link}. Cannot delete.")
@@ -0,0 +1,175 @@
+# db_writer.py
+"""
+Write-behind writer for scrape results.
+
+Scrapers and the UI hand rows to submit_post_write() and return immediately; one background
+thread takes them from a bounded queue and commits them in groups through
+database.save_many_to_database (one transaction per group). Several results for the same post
+within a group are coalesced into the latest one. A full queue blocks the submitter, so a slow
+disk slows scraping down instead of growing memory without bound.
+
+flush_writes() waits until everything submitted so far is committed; close_writer() (also run at
+exit) flushes and stops the thread. writer_stats() reports queue depth, commit latency and how
+many rows needed no rewrite because the post was unchanged.
+"""
+
+import time
+import queue
+import atexit
+import logging
+import threading
+
+import database
+
+# --- Configuration ---
+DB_WRITE_QUEUE_SIZE = 1000 # Rows waiting to be written before submitters block
+DB_WRITE_BATCH_SIZE = 200 # Most rows committed in one transaction
+DB_WRITE_MAX_DELAY_SECONDS = 1.0 # How long the first row of a group waits for more to join it
+
+_STOP = object()
+
+
+class DatabaseWriter:
+    """A background thread that commits submitted post rows in grouped transactions."""
+
+    def __init__(self, max_queue_size=DB_WRITE_QUEUE_SIZE, batch_size=DB_WRITE_BATCH_SIZE, max_delay=DB_WRITE_MAX_DELAY_SECONDS):
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "written": 0,
+            "coalesced": 0, # Rows superseded by a newer result for the same post in the same group
+            "writes_avoided": 0, # Rows whose values matched the stored post, so only last_record was updated
+            "failed": 0,
+            "transactions": 0,
+            "last_commit_ms": None,
+            "max_commit_ms": None,
+            "total_commit_ms": 0.0,
+        }
+        self._thread = threading.Thread(target=self._run, name="DatabaseWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, post_data_dict):
+        """Queues one row for save_many_to_database; blocks while the queue is full."""
+        self._queue.put(dict(post_data_dict)) # Copied: the caller's dict may keep changing
+        with self._stats_lock:
+            self._stats["submitted"] += 1
+
+    def flush(self):
+        """Blocks until every row submitted so far has been committed (or has failed)."""
+        self._queue.join()
+
+    def close(self):
+        """Commits what is still queued and stops the writer thread."""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self):
+        """Counters plus the current queue depth and average commit latency in milliseconds."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        total_commit_ms = stats.pop("total_commit_ms")
+        stats["queue_depth"] = self._queue.qsize()
+        stats["avg_commit_ms"] = round(total_commit_ms / stats["transactions"], 2) if stats["transactions"] else None
+        return stats
+
+    def _collect_group(self, first_item):
+        """Gathers rows that arrive within max_delay of the first one, up to batch_size."""
+        group = [first_item]
+        deadline = time.monotonic() + self.max_delay
+        while len(group) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            group.append(item)
+            if item is _STOP:
+                break
+        return group
+
+    def _write_group(self, rows):
+        # Latest result per post wins; rows without a shortcode are passed through for save_many_to_database to report
+        rows_by_key = {}
+        for position, row in enumerate(rows):
+            key = row.get("post_shortcode") or row.get("link") or position
+            rows_by_key[key] = row
+        started = time.perf_counter()
+        save_stats = {}
+        written = database.save_many_to_database(list(rows_by_key.values()), stats=save_stats)
+        commit_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self._stats["transactions"] += 1
+            self._stats["written"] += written
+            self._stats["coalesced"] += len(rows) - len(rows_by_key)
+            self._stats["writes_avoided"] += save_stats.get("unchanged", 0)
+            self._stats["failed"] += len(rows_by_key) - written
+            self._stats["last_commit_ms"] = round(commit_ms, 2)
+            self._stats["max_commit_ms"] = round(max(commit_ms, self._stats["max_commit_ms"] or 0), 2)
+            self._stats["total_commit_ms"] += commit_ms
+        logging.debug(f"[DB writer] Committed {written} of {len(rows)} rows in {commit_ms:.1f} ms.")
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            group = self._collect_group(self._queue.get())
+            rows = [item for item in group if item is not _STOP]
+            stopping = len(rows) != len(group)
+            try:
+                if rows:
+                    self._write_group(rows)
+            except Exception as e:
+                logging.error(f"[DB writer] Failed to write {len(rows)} rows: {e}", exc_info=True)
+                with self._stats_lock:
+                    self._stats["failed"] += len(rows)
+            finally:
+                for _ in group:
+                    self._queue.task_done()
+        logging.info(f"[DB writer] Stopped. {self.stats()}")
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    """Returns the process-wide writer, starting it on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = DatabaseWriter()
+        return _writer
+
+
+def submit_post_write(post_data_dict):
+    """Queues a post row (as accepted by database.save_many_to_database) for the background writer."""
+    get_writer().submit(post_data_dict)
+
+
+def flush_writes():
+    """Waits until every queued row is committed. Does nothing if the writer never started."""
+    if _writer is not None:
+        _writer.flush()
+
+
+def writer_stats():
+    return _writer.stats() if _writer is not None else None
+
+
+def close_writer():
+    """Flushes and stops the writer; later submissions start a new one."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.close()
+
+
+# Registered after database.py's close_connections, so it runs first and can still commit
+atexit.register(close_writer)
@@ -0,0 +1,225 @@
+# exporter.py
+"""
+Streaming export of stored posts and their metrics history.
+
+Rows are read from a database cursor in batches and written as they arrive, so an export never
+holds the table in memory and can run in a background thread. Supported formats, chosen by the
+file extension: .csv, .csv.gz, .jsonl, .jsonl.gz and .parquet (the last needs pyarrow).
+
+  export_data("reels.csv.gz", owner="some_creator", since=..., until=..., include_history=True)
+
+writes reels.csv.gz plus reels_history.csv.gz. Dates are written as ISO 8601 UTC in text
+formats and as UTC timestamps in Parquet; unavailable metrics are empty (CSV) or null.
+"""
+
+import os
+import csv
+import gzip
+import json
+import logging
+from datetime import datetime, timezone
+
+import database
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # Optional: only needed for Parquet output
+    pa = None
+    pq = None
+
+# --- Configuration ---
+EXPORT_FORMATS = ("csv", "csv.gz", "jsonl", "jsonl.gz", "parquet")
+EXPORT_PROGRESS_EVERY = 5000 # rows between progress callbacks
+EXPORT_PARQUET_BATCH_ROWS = 50000 # rows per Parquet record batch
+
+# Exported post columns, in file order (a subset of database.LOADED_POST_COLUMNS)
+POST_EXPORT_COLUMNS = (
+    "post_shortcode", "link", "owner", "post_date", "last_record",
+    "likes", "comments", "views", "engagement_rate", "status", "error"
+)
+HISTORY_EXPORT_COLUMNS = database.HISTORY_EXPORT_COLUMNS
+TIMESTAMP_COLUMNS = ("post_date", "last_record", "recorded_at")
+
+if pa is not None:
+    _PARQUET_TYPES = {
+        "post_date": pa.timestamp("s", tz="UTC"),
+        "last_record": pa.timestamp("s", tz="UTC"),
+        "recorded_at": pa.timestamp("s", tz="UTC"),
+        "likes": pa.int64(),
+        "comments": pa.int64(),
+        "views": pa.int64(),
+        "engagement_rate": pa.float64(),
+        # Analytics report columns (see analytics.REPORTS)
+        "post_count": pa.int64(),
+        "total_views": pa.int64(),
+        "median_views": pa.float64(),
+        "avg_engagement_rate": pa.float64(),
+        "views_gained": pa.int64(),
+        "engagements_gained": pa.int64(),
+        "engagements_per_day": pa.float64(),
+        "views_per_day": pa.float64(),
+    }
+
+
+def parquet_available():
+    return pa is not None
+
+
+def format_from_path(path):
+    """Returns the export format implied by a file name, or None if it is not one of EXPORT_FORMATS."""
+    name = path.lower()
+    for fmt in sorted(EXPORT_FORMATS, key=len, reverse=True): # ".csv.gz" before ".csv"
+        if name.endswith("." + fmt):
+            return fmt
+    return None
+
+
+def history_path_for(path):
+    """reels.csv.gz -> reels_history.csv.gz"""
+    fmt = format_from_path(path)
+    stem = path[:-(len(fmt) + 1)] if fmt else path
+    return f"{stem}_history.{fmt}" if fmt else f"{path}_history"
+
+
+def _iso_utc(epoch_seconds):
+    if epoch_seconds is None or epoch_seconds <= 0:
+        return None
+    return datetime.fromtimestamp(epoch_seconds, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _text_record(columns, values):
+    """A row as a dict for CSV/JSON Lines, with timestamps as ISO 8601 UTC."""
+    return {
+        col: _iso_utc(value) if col in TIMESTAMP_COLUMNS else value
+        for col, value in zip(columns, values)
+    }
+
+
+def _open_text(path, fmt):
+    if fmt.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8", newline="", compresslevel=6)
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def _write_csv(path, fmt, columns, rows, on_row):
+    with _open_text(path, fmt) as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for values in rows:
+            record = _text_record(columns, values)
+            writer.writerow(["" if record[col] is None else record[col] for col in columns])
+            on_row()
+
+
+def _write_jsonl(path, fmt, columns, rows, on_row):
+    with _open_text(path, fmt) as f:
+        for values in rows:
+            f.write(json.dumps(_text_record(columns, values), ensure_ascii=False))
+            f.write("\n")
+            on_row()
+
+
+def _write_parquet(path, columns, rows, on_row):
+    if pa is None:
+        raise RuntimeError("Parquet export needs the optional 'pyarrow' package (pip install pyarrow).")
+    schema = pa.schema([(col, _PARQUET_TYPES.get(col, pa.string())) for col in columns])
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        batch = []
+        for values in rows:
+            batch.append(values)
+            on_row()
+            if len(batch) >= EXPORT_PARQUET_BATCH_ROWS:
+                writer.write_batch(_parquet_batch(schema, columns, batch))
+                batch = []
+        if batch:
+            writer.write_batch(_parquet_batch(schema, columns, batch))
+
+
+def _parquet_batch(schema, columns, batch):
+    # Column-wise arrays; a post without a date gets null, not the 1970 epoch
+    arrays = []
+    for index, col in enumerate(columns):
+        column_values = [values[index] for values in batch]
+        if col in TIMESTAMP_COLUMNS:
+            column_values = [value if value and value > 0 else None for value in column_values]
+        arrays.append(pa.array(column_values, type=schema.field(col).type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _export_rows(path, fmt, columns, rows, total, label, progress, cancel_event):
+    """Writes rows to path (via a temp file, so a failed export never leaves a partial file). Returns the row count."""
+    written = 0
+
+    def on_row():
+        nonlocal written
+        written += 1
+        if written % EXPORT_PROGRESS_EVERY == 0:
+            if cancel_event is not None and cancel_event.is_set():
+                raise InterruptedError("Export cancelled.")
+            if progress:
+                progress(label, written, total)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        if fmt == "parquet":
+            _write_parquet(tmp_path, columns, rows, on_row)
+        elif fmt.startswith("jsonl"):
+            _write_jsonl(tmp_path, fmt, columns, rows, on_row)
+        else:
+            _write_csv(tmp_path, fmt, columns, rows, on_row)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    if progress:
+        progress(label, written, total)
+    return written
+
+
+def export_rows(path, columns, rows, fmt=None, progress=None, cancel_event=None):
+    """
+    Writes any (columns, rows) result, such as an analytics report, in the format implied by path.
+    Columns named like the post and history columns get the same date and type handling. Returns the row count.
+    """
+    fmt = fmt or format_from_path(path)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format for '{path}'. Use one of: {', '.join('.' + f for f in EXPORT_FORMATS)}")
+    row_count = _export_rows(path, fmt, tuple(columns), rows, len(rows) if isinstance(rows, list) else None, "rows", progress, cancel_event)
+    logging.info(f"Exported {row_count} rows to {path}.")
+    return row_count
+
+
+def _post_export_rows(owner, since, until):
+    column_indexes = [database.LOADED_POST_COLUMNS.index(col) for col in POST_EXPORT_COLUMNS]
+    for row in database.iter_posts(owner=owner, since=since, until=until):
+        yield tuple(row[index] for index in column_indexes)
+
+
+def export_data(path, fmt=None, owner=None, since=None, until=None, include_history=False, progress=None, cancel_event=None):
+    """
+    Exports posts (newest first) to path and, with include_history, their metrics history to
+    history_path_for(path). owner limits the export to one account; since/until (epoch seconds,
+    until exclusive) filter posts by publish date and history by when each data point was recorded.
+    progress(label, rows_written, total_rows) is called every EXPORT_PROGRESS_EVERY rows and at the end;
+    setting cancel_event stops the export without leaving partial files.
+    Returns {"posts": n, "history": m or None, "files": [...]}. Raises on failure.
+    """
+    fmt = fmt or format_from_path(path)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format for '{path}'. Use one of: {', '.join('.' + f for f in EXPORT_FORMATS)}")
+
+    result = {"posts": 0, "history": None, "files": [path]}
+    result["posts"] = _export_rows(
+        path, fmt, POST_EXPORT_COLUMNS, _post_export_rows(owner, since, until),
+        database.count_posts(owner, since, until), "posts", progress, cancel_event
+    )
+    if include_history:
+        history_path = history_path_for(path)
+        result["history"] = _export_rows(
+            history_path, fmt, HISTORY_EXPORT_COLUMNS, database.iter_post_history(owner=owner, since=since, until=until),
+            database.count_post_history(owner, since, until), "history", progress, cancel_event
+        )
+        result["files"].append(history_path)
+    logging.info(f"Export finished: {result}")
+    return result
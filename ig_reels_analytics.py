@@ -1,11 +1,11 @@
 # ig_reels_analytics.py
 import tkinter as tk
 import logging
+import multiprocessing
 import os
 import traceback
 from datetime import datetime
 
-from ui import InstagramScraperApp, login_sequence
 from database import setup_database, DB_FILE
 from scraper import USER_DATA_DIR, BROWSER_USER_DATA_DIR # Corrected: BROWSER_USER_DATA_DIR
 
@@ -60,6 +60,10 @@ def global_exception_handler(exc_type, exc_value, exc_traceback):
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # Scrape workers re-launch the frozen executable on Windows
+    # Imported here rather than at the top: spawned scrape workers re-import this module (as
+    # __mp_main__) and must not load the GUI module, its Tk/CustomTkinter setup or its side effects.
+    from ui import InstagramScraperApp, login_sequence
     try:
         setup_database()
 
@@ -0,0 +1,146 @@
+# importer.py
+"""
+Streaming CSV import of Instagram post URLs.
+
+The file is read in chunks of IMPORT_CHUNK_ROWS rows, so million-row URL dumps import with
+bounded memory. The URL column is found by its header (url, link, shortcode, ...) or, for
+files without a recognized header, by the first cell that holds a full post URL. Bare
+shortcodes are only accepted in a column whose header names it a shortcode column, so
+usernames or titles are never mistaken for posts. Every value is validated and canonicalized;
+each chunk is then checked against the database in one indexed query, and only posts that are
+new, stale or failed are yielded for scraping:
+
+  stats = {}
+  for post_url in iter_import_urls("urls.csv", stats=stats):
+      ...
+"""
+
+import re
+import csv
+import time
+import logging
+
+import database
+
+# --- Configuration ---
+IMPORT_CHUNK_ROWS = 5000
+IMPORT_STALE_AFTER_SECONDS = 24 * 60 * 60 # Stored posts older than this are scraped again
+IMPORT_SNIFF_ROWS = 20 # Rows examined to find the URL column when there is no recognizable header
+
+# Header names (lower-cased, spaces/dashes as underscores) recognized as the URL/shortcode column, best first
+URL_COLUMN_HEADERS = ("url", "post_url", "reel_url", "link", "post_link", "permalink", "shortcode", "post_shortcode", "code")
+SHORTCODE_COLUMN_HEADERS = {"shortcode", "post_shortcode", "code"} # The only columns where bare shortcodes are accepted
+
+# Bare shortcodes: public posts have 11 characters (10 for some older ones); a little slack either side
+SHORTCODE_PATTERN = re.compile(r"[A-Za-z0-9_-]{10,14}")
+# One compiled match per row (urllib.parse is several times slower on million-row files).
+# Host and path kind are case-insensitive; the shortcode is not.
+POST_URL_PATTERN = re.compile(
+    r"(?i:(?:https?://)?(?:www\.|m\.)?instagram\.com/(?:[a-z0-9._]+/)?(p|reels?|tv)/)([A-Za-z0-9_-]{5,64})(?:[/?#]|$)"
+)
+
+
+def canonicalize_post(value, allow_shortcode=True):
+    """
+    Validates a post URL or (if allow_shortcode) a bare shortcode and returns (shortcode,
+    canonical_url), or None if the value is not an Instagram post. Query strings, tracking
+    parameters, "m." hosts and "/<username>/reel/" paths all map to the same canonical URL.
+    """
+    if not isinstance(value, str):
+        return None
+    value = value.strip().strip('"').strip()
+    if not value:
+        return None
+    if allow_shortcode and SHORTCODE_PATTERN.fullmatch(value):
+        return value, f"https://www.instagram.com/reel/{value}/"
+    url_match = POST_URL_PATTERN.match(value)
+    if not url_match:
+        return None
+    kind = "p" if url_match.group(1).lower() == "p" else "reel"
+    shortcode = url_match.group(2)
+    return shortcode, f"https://www.instagram.com/{kind}/{shortcode}/"
+
+
+def _normalize_header(cell):
+    return re.sub(r"[\s-]+", "_", cell.strip().lower())
+
+
+def detect_url_column(first_rows):
+    """
+    Returns (column_index, has_header, allow_shortcode) for the first rows of a CSV file.
+    A recognized header name wins; otherwise the first column with a full post URL in any sniffed
+    row. Bare shortcodes are only allowed in a column headed as a shortcode column.
+    """
+    if first_rows:
+        headers = [_normalize_header(cell) for cell in first_rows[0]]
+        for name in URL_COLUMN_HEADERS:
+            if name in headers:
+                return headers.index(name), True, name in SHORTCODE_COLUMN_HEADERS
+    for row_index, row in enumerate(first_rows):
+        for column_index, cell in enumerate(row):
+            if canonicalize_post(cell, allow_shortcode=False) is not None:
+                # A first row without any post URL is a header we did not recognize
+                return column_index, row_index > 0, False
+    return 0, False, False
+
+
+def _iter_chunks(filepath, stats):
+    """Yields lists of (shortcode, canonical_url) per IMPORT_CHUNK_ROWS rows, duplicates within a chunk removed."""
+    with open(filepath, "r", newline="", encoding="utf-8-sig") as csvfile:
+        reader = csv.reader(csvfile)
+        sniffed_rows = []
+        for row in reader:
+            sniffed_rows.append(row)
+            if len(sniffed_rows) >= IMPORT_SNIFF_ROWS:
+                break
+        column_index, has_header, allow_shortcode = detect_url_column(sniffed_rows)
+        logging.info(
+            f"Import {filepath}: using column {column_index}{' (by header)' if has_header else ''}"
+            f"{', bare shortcodes accepted' if allow_shortcode else ''}."
+        )
+
+        def rows():
+            yield from sniffed_rows[1:] if has_header else sniffed_rows
+            yield from reader
+
+        chunk = {}
+        for row in rows():
+            stats["rows"] += 1
+            canonical = canonicalize_post(row[column_index], allow_shortcode) if column_index < len(row) else None
+            if canonical is None:
+                if any(cell.strip() for cell in row):
+                    stats["invalid"] += 1
+                continue
+            if canonical[0] in chunk:
+                stats["duplicates"] += 1
+                continue
+            chunk[canonical[0]] = canonical[1]
+            if len(chunk) >= IMPORT_CHUNK_ROWS:
+                yield list(chunk.items())
+                chunk = {}
+        if chunk:
+            yield list(chunk.items())
+
+
+def iter_import_urls(filepath, stale_after=IMPORT_STALE_AFTER_SECONDS, stats=None):
+    """
+    Yields canonical URLs from a CSV file that need scraping: posts not in the database, last
+    recorded more than stale_after seconds ago, or whose last scrape failed. Each URL is yielded
+    once per import. Consumed lazily, so a scrape pool pulls chunks only as it needs jobs.
+    `stats` (a dict, if given) is kept up to date with rows, invalid, duplicates, skipped (fresh in the database or queued earlier) and queued.
+    """
+    stats = stats if stats is not None else {}
+    for key in ("rows", "invalid", "duplicates", "skipped", "queued"):
+        stats[key] = 0
+    stale_before = time.time() - stale_after
+
+    with database.import_filter_session() as session_conn:
+        for chunk in _iter_chunks(filepath, stats):
+            accepted = set(database.filter_new_or_stale_shortcodes(session_conn, [shortcode for shortcode, _ in chunk], stale_before))
+            # Whatever was rejected is either already fresh in the database or was queued in an earlier chunk
+            stats["skipped"] += len(chunk) - len(accepted)
+            for shortcode, post_url in chunk:
+                if shortcode in accepted:
+                    stats["queued"] += 1
+                    yield post_url
+    logging.info(f"Import {filepath} finished reading: {stats}")
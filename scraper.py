@@ -9,10 +9,21 @@ import time
 import subprocess
 import shutil
 import sys
+import threading
+import math
+import functools
+from contextlib import contextmanager
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
 
 import instaloader
 from instaloader import (
     Post,
+    Profile,
+    FrozenNodeIterator,
     exceptions as instaloader_exceptions
 )
 
@@ -27,8 +38,11 @@ from selenium.common.exceptions import WebDriverException, TimeoutException, NoS
 
 import requests
 import json
+import base64
 from bs4 import BeautifulSoup
 
+import snapshots
+
 # --- Custom Exception for Path Errors ---
 class BrowserPathError(Exception):
     """Custom exception for when Chrome or ChromeDriver paths are not found."""
@@ -181,9 +195,13 @@ def get_browser_and_driver_versions():
 get_browser_and_driver_versions()
 
 
+# Instaloader's per-request timeout and attempts when no scrape budget applies (its own defaults)
+INSTALOADER_REQUEST_TIMEOUT_SECONDS = 300
+INSTALOADER_MAX_CONNECTION_ATTEMPTS = 3
+INSTALOADER_MIN_REQUEST_TIMEOUT_SECONDS = 10 # Under a budget, fewer attempts rather than shorter ones
+
 # Instantiate a single Instaloader
-L = instaloader.Instaloader()
-L.context.timeout = 300
+L = instaloader.Instaloader(request_timeout=INSTALOADER_REQUEST_TIMEOUT_SECONDS, max_connection_attempts=INSTALOADER_MAX_CONNECTION_ATTEMPTS)
 
 
 # ------------- Configuration for direct HTML (requests) logic -------------
@@ -196,6 +214,322 @@ HEADERS = {
 }
 REQUEST_TIMEOUT = 15
 
+# Wall-clock budget for one scrape_post_data call; stages clamp their waits to what is left of it
+SCRAPE_TIME_BUDGET_SECONDS = 5 * 60
+
+# Read view counts from the Reels grid's own XHR responses while scrolling (DOM parsing remains the fallback)
+NETWORK_VIEW_HARVEST_ENABLED = True
+NETWORK_LOG_POLL_INTERVAL = 0.5 # Seconds between performance log reads while waiting after a scroll
+
+# Absolute XPaths of the likes counter on the post page (/reel/ layout first, then /reels/ layout)
+LIKES_XPATH_REEL_STYLE = "/html/body/div[1]/div/div/div[2]/div/div/div[1]/div[1]/div[1]/section/main/div/div[1]/div/div[2]/div/div[3]/section[2]/div/div/span/a/span/span"
+LIKES_XPATH_REELS_STYLE = "/html/body/div[1]/div/div/div[2]/div/div/div[1]/div[1]/div[1]/section/main/div/div[1]/div/div[2]/div[1]/div/div/div/span/span"
+
+
+# ------------- Owner profile cache (used by follow_profile) -------------
+# Kept next to the database rather than in USER_DATA_DIR, because every file in
+# USER_DATA_DIR is treated as an Instaloader session file by login_sequence.
+# Scrape worker processes share the file: each save re-reads it under a file lock and merges
+# (the newer entry per owner wins), and reads pick up entries other processes have saved.
+OWNER_CACHE_FILE = os.path.join(SCRIPT_DIR, "owner_cache.json")
+OWNER_CACHE_LOCK_FILE = f"{OWNER_CACHE_FILE}.lock"
+OWNER_CACHE_TTL_SECONDS = 24 * 60 * 60 # Re-check followed state after a day
+
+# username -> {"userid": int, "followed": bool, "fetched_at": float, "checked_at": float}
+# checked_at is the last follow attempt, successful or not; it drives the per-batch dedupe.
+_owner_cache = None
+_owner_cache_mtime = None # mtime_ns of the file as last read or written by this process
+_owner_cache_lock = threading.Lock()
+_follow_results_this_batch = {} # username -> bool, reset by start_follow_batch()
+_follow_batch_started_at = 0.0 # Owners checked since then, by any process, are not tried again
+
+
+def _owner_entry_stamp(entry):
+    return max(entry.get("fetched_at", 0), entry.get("checked_at", 0))
+
+
+def _merge_owner_entries(target, source):
+    """Copies the entries of source that are newer than (or missing from) target."""
+    for owner_key, entry in source.items():
+        if isinstance(entry, dict) and (owner_key not in target or _owner_entry_stamp(entry) > _owner_entry_stamp(target[owner_key])):
+            target[owner_key] = entry
+
+
+@contextmanager
+def _owner_cache_file_lock():
+    """Serializes read-merge-writes of the owner cache file across processes."""
+    with open(OWNER_CACHE_LOCK_FILE, "a+b") as lock_file:
+        lock_file.seek(0)
+        if fcntl:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            lock_file.seek(0)
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _owner_cache_file_mtime():
+    try:
+        return os.stat(OWNER_CACHE_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_owner_cache_file():
+    """Returns the owner cache as saved on disk ({} if missing or unreadable)."""
+    try:
+        with open(OWNER_CACHE_FILE, "r", encoding="utf-8") as f:
+            loaded = json.load(f)
+        return loaded if isinstance(loaded, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning(f"Could not read owner cache {OWNER_CACHE_FILE}: {e}. Ignoring its contents.")
+        return {}
+
+
+def _load_owner_cache():
+    """
+    Returns the in-memory owner cache, merging in what other processes saved since it was last
+    read (checked by file mtime). Call with _owner_cache_lock held.
+    """
+    global _owner_cache, _owner_cache_mtime
+    if _owner_cache is None:
+        _owner_cache = {}
+    mtime = _owner_cache_file_mtime()
+    if mtime is not None and mtime != _owner_cache_mtime:
+        _merge_owner_entries(_owner_cache, _read_owner_cache_file())
+        _owner_cache_mtime = mtime
+        logging.debug(f"Owner cache now holds {len(_owner_cache)} profiles (merged from {OWNER_CACHE_FILE}).")
+    return _owner_cache
+
+
+def save_owner_cache():
+    """Merges the in-memory owner cache into the file on disk and writes it atomically."""
+    global _owner_cache_mtime
+    with _owner_cache_lock:
+        if _owner_cache is None:
+            return
+        tmp_path = f"{OWNER_CACHE_FILE}.{os.getpid()}.tmp"
+        try:
+            with _owner_cache_file_lock():
+                # Entries other workers saved since our last read must not be overwritten
+                _merge_owner_entries(_owner_cache, _read_owner_cache_file())
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(_owner_cache, f)
+                os.replace(tmp_path, OWNER_CACHE_FILE)
+                _owner_cache_mtime = _owner_cache_file_mtime()
+        except OSError as e:
+            logging.warning(f"Could not save owner cache to {OWNER_CACHE_FILE}: {e}")
+
+
+def start_follow_batch(started_at=None):
+    """
+    Starts a follow batch, so each owner is followed at most once per batch. Scrape worker
+    processes are given the parent's started_at, which makes the dedupe span the whole pool:
+    an owner checked by any worker since then is not tried again.
+    """
+    global _follow_batch_started_at
+    with _owner_cache_lock:
+        _follow_results_this_batch.clear()
+        _follow_batch_started_at = started_at if started_at is not None else time.time()
+
+
+def _get_cached_owner(owner_username):
+    """Returns the cached entry for an owner, or None. Its userid never goes stale; check _is_follow_state_fresh before trusting "followed"."""
+    with _owner_cache_lock:
+        return _load_owner_cache().get(owner_username.lower())
+
+
+def _is_follow_state_fresh(entry):
+    return time.time() - entry.get("fetched_at", 0) <= OWNER_CACHE_TTL_SECONDS
+
+
+def _get_batch_follow_result(owner_username):
+    """The follow result for an owner if this batch (in this or another process) already handled it, else None."""
+    owner_key = owner_username.lower()
+    with _owner_cache_lock:
+        batch_result = _follow_results_this_batch.get(owner_key)
+        if batch_result is not None:
+            return batch_result
+        entry = _load_owner_cache().get(owner_key)
+    if entry and entry.get("checked_at", 0) >= _follow_batch_started_at:
+        return bool(entry.get("followed"))
+    return None
+
+
+def _set_cached_owner(owner_username, userid, followed):
+    now = time.time()
+    with _owner_cache_lock:
+        _load_owner_cache()[owner_username.lower()] = {
+            "userid": userid,
+            "followed": followed,
+            "fetched_at": now,
+            "checked_at": now,
+        }
+    save_owner_cache()
+
+
+def _record_follow_attempt(owner_username, follow_result):
+    """Records a follow attempt for the batch dedupe, in this process and (via the cache file) for the other workers."""
+    owner_key = owner_username.lower()
+    with _owner_cache_lock:
+        _follow_results_this_batch[owner_key] = follow_result
+        entry = _load_owner_cache().get(owner_key) or {"userid": None, "followed": False, "fetched_at": 0}
+        if entry.get("checked_at", 0) >= _follow_batch_started_at and bool(entry.get("followed")) == follow_result:
+            return # Already saved by _set_cached_owner during this attempt
+        # fetched_at is kept, so a failed attempt does not make a stale followed state look fresh
+        _owner_cache[owner_key] = dict(entry, followed=follow_result, checked_at=time.time())
+    save_owner_cache()
+
+
+# ------------- Whole-account sweep configuration -------------
+# Resume state for interrupted sweeps, one JSON file per account. Not in USER_DATA_DIR (see above).
+SWEEP_STATE_DIR = os.path.join(SCRIPT_DIR, "sweep_state")
+SWEEP_BATCH_SIZE = 50 # Posts handed to the caller (and saved) per batch
+
+
+# ------------------
+# Per-stage timing
+# ------------------
+
+class ScrapeTimings:
+    """
+    Collects per-stage durations, strategies used, bytes fetched and scroll count for one scrape.
+    Stages are exclusive: time spent in a stage nested inside another (cookie_banner inside
+    likes_post_page, grid_scroll inside views_selenium, ...) counts only for the inner stage,
+    so the stages add up to "total" (the whole scrape) without double counting.
+    """
+
+    def __init__(self):
+        self.stages = {} # stage name -> seconds (accumulated if a stage runs more than once)
+        self.strategies = {} # e.g. {"likes": "primary_xpath", "views": "direct_html"}
+        self.bytes_fetched = 0
+        self.scroll_count = 0
+        self._open_stages = [] # [name, seconds spent in nested stages] per running stage(), innermost last
+
+    @contextmanager
+    def stage(self, name):
+        frame = [name, 0.0]
+        self._open_stages.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._open_stages.pop()
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed - frame[1]
+            if self._open_stages:
+                self._open_stages[-1][1] += elapsed
+
+    def add_duration(self, name, seconds):
+        """
+        Adds a duration measured outside of stage() (e.g. around a loop that breaks early).
+        Inside a running stage it is taken out of that stage, like a nested stage().
+        """
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+        if self._open_stages:
+            self._open_stages[-1][1] += seconds
+
+    def add_bytes(self, content):
+        """Adds the size of fetched content (str or bytes) to the byte counter."""
+        if content is None:
+            return
+        if isinstance(content, str):
+            content = content.encode("utf-8", errors="ignore")
+        self.bytes_fetched += len(content)
+
+    def as_dict(self):
+        return {
+            "stages": {name: round(seconds, 3) for name, seconds in self.stages.items()},
+            "strategies": dict(self.strategies),
+            "bytes_fetched": self.bytes_fetched,
+            "scroll_count": self.scroll_count,
+        }
+
+
+class Deadline:
+    """
+    Time budget shared by every stage of one scrape. Stages clamp their waits, sleeps and
+    timeouts to remaining() and stop early once expired(). Deadline() (no budget) never expires.
+    """
+
+    def __init__(self, seconds=None):
+        self.budget_seconds = seconds
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+
+    def remaining(self):
+        if self.expires_at is None:
+            return float("inf")
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def clamp(self, seconds, minimum=0.0):
+        """Returns seconds capped at the remaining budget (never below minimum)."""
+        return max(minimum, min(seconds, self.remaining()))
+
+    def sleep(self, seconds):
+        time.sleep(self.clamp(seconds))
+
+
+def _bound_instaloader_to(deadline):
+    """
+    Sets Instaloader's request timeout and connection attempts so that its next calls, retries
+    included, fit in what is left of the deadline. Deadline() restores the defaults.
+    """
+    remaining = deadline.clamp(INSTALOADER_REQUEST_TIMEOUT_SECONDS * INSTALOADER_MAX_CONNECTION_ATTEMPTS)
+    attempts = max(1, min(INSTALOADER_MAX_CONNECTION_ATTEMPTS, int(remaining // INSTALOADER_MIN_REQUEST_TIMEOUT_SECONDS)))
+    request_timeout = max(1.0, min(INSTALOADER_REQUEST_TIMEOUT_SECONDS, remaining / attempts))
+    L.context.request_timeout = request_timeout
+    L.context.max_connection_attempts = attempts
+    # Instaloader binds the timeout into its requests session when it creates one, so rebind the current session too
+    L.context._session.request = functools.partial(L.context._session.request, timeout=request_timeout)
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_stage_timings(timing_records):
+    """
+    Summarizes a batch of ScrapeTimings.as_dict() records into
+    {stage: {"count": n, "p50": seconds, "p95": seconds}}.
+    """
+    durations_by_stage = {}
+    for record in timing_records:
+        if not record:
+            continue
+        for stage_name, seconds in record.get("stages", {}).items():
+            durations_by_stage.setdefault(stage_name, []).append(seconds)
+
+    summary = {}
+    for stage_name, durations in durations_by_stage.items():
+        durations.sort()
+        summary[stage_name] = {
+            "count": len(durations),
+            "p50": _percentile(durations, 50),
+            "p95": _percentile(durations, 95),
+        }
+    return summary
+
+
+def format_stage_timing_summary(summary, separator=", "):
+    """Formats summarize_stage_timings() output as one log/status line (or one line per stage with separator="\n"), slowest stage first."""
+    ordered = sorted(summary.items(), key=lambda item: item[1]["p95"] or 0, reverse=True)
+    return separator.join(f"{name} p50={s['p50']:.2f}s p95={s['p95']:.2f}s (n={s['count']})" for name, s in ordered)
+
 
 # ------------------
 # Helper Functions
@@ -278,6 +612,44 @@ def _find_view_count_in_json(data_json, target_shortcode):
                 return result
     return None
 
+# "code" is a common key (error codes, country codes, ...); it only names a shortcode in a media node
+MEDIA_TYPENAMES = {"GraphVideo", "GraphImage", "GraphSidecar", "XDTGraphVideo", "XDTGraphImage", "XDTGraphSidecar", "XDTMediaDict"}
+
+
+def _media_node_shortcode(node):
+    """The shortcode of a GraphQL ('shortcode') or API v1 ('code') media node, or None if node is not one."""
+    shortcode = node.get("shortcode")
+    if shortcode is None:
+        shortcode = node.get("code")
+        is_media = node.get("__typename") in MEDIA_TYPENAMES or isinstance(node.get("play_count"), int) or isinstance(node.get("view_count"), int)
+        if not is_media:
+            return None
+    if isinstance(shortcode, str) and re.fullmatch(r"[A-Za-z0-9_-]{5,64}", shortcode):
+        return shortcode
+    return None
+
+
+def _collect_view_counts_from_json(data_json, views_by_shortcode):
+    """
+    Walks JSON (iteratively) and records every shortcode -> view count pair it contains.
+    Media nodes use 'shortcode' (GraphQL) or 'code' (API v1, only trusted next to a play/view count
+    or a media __typename); video_view_count wins over play_count, matching _find_view_count_in_json.
+    """
+    stack = [data_json]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, dict):
+            node_shortcode = _media_node_shortcode(node)
+            if node_shortcode is not None:
+                for view_key in ("video_view_count", "play_count", "view_count"):
+                    if isinstance(node.get(view_key), int):
+                        views_by_shortcode[node_shortcode] = node[view_key]
+                        break
+            stack.extend(value for value in node.values() if isinstance(value, (dict, list)))
+    return views_by_shortcode
+
 # ------------- Direct HTML (requests) Helper Functions -------------
 
 def _parse_shared_data(html: str) -> dict or None:
@@ -330,11 +702,17 @@ def _extract_reel_data_from_shared(shared: dict, shortcode: str) -> dict:
         result["error"] = f"Extraction failed: {e}"
     return result
 
-async def scrape_views_direct_html(post_url: str, post_shortcode: str) -> int or str:
+async def scrape_views_direct_html(post_url: str, post_shortcode: str, timings: ScrapeTimings = None, deadline: Deadline = None) -> int or str:
     """Attempts to scrape view count via direct HTML fetch and parsing."""
     logging.info(f"[Direct HTML] Attempting to scrape views for {post_shortcode} via direct HTML.")
+    timings = timings or ScrapeTimings()
+    deadline = deadline or Deadline()
+    if deadline.expired():
+        return "N/A (Direct HTML Skipped - Time Budget Exceeded)"
     try:
-        resp = requests.get(post_url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
+        resp = requests.get(post_url, headers=HEADERS, timeout=deadline.clamp(REQUEST_TIMEOUT, minimum=1))
+        timings.add_bytes(resp.content)
+        snapshots.capture(post_shortcode, snapshots.KIND_HTTP_RESPONSE, resp.content, url=post_url, status_code=resp.status_code)
         resp.raise_for_status()
     except requests.exceptions.RequestException as e:
         logging.warning(f"[Direct HTML] HTTP request failed for {post_shortcode}: {e}")
@@ -365,8 +743,14 @@ async def scrape_views_direct_html(post_url: str, post_shortcode: str) -> int or
 # Selenium-based Scrapers
 # ------------------------------
 
-async def _setup_selenium_driver():
-    """Helper to set up and return a Selenium Chrome driver instance."""
+async def _setup_selenium_driver(capture_network=False, deadline: Deadline = None):
+    """
+    Helper to set up and return a Selenium Chrome driver instance.
+    With capture_network=True, Chrome's performance log is enabled so XHR responses
+    can be read back through DevTools (see _NetworkViewHarvester).
+    The page load timeout is capped by the deadline, if one is given.
+    """
+    deadline = deadline or Deadline()
     options = Options()
 
     # Configure headless mode:
@@ -390,6 +774,9 @@ async def _setup_selenium_driver():
     # some sites might require them for layout or content.
     # options.add_argument("--blink-settings=imagesEnabled=false") 
 
+    if capture_network:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
     # Added argument to explicitly set binary location
     if CHROME_BINARY_LOCATION:
         options.binary_location = CHROME_BINARY_LOCATION
@@ -401,7 +788,7 @@ async def _setup_selenium_driver():
     try:
         service = Service(executable_path=CHROMEDRIVER_EXECUTABLE_PATH)
         driver = webdriver.Chrome(service=service, options=options)
-        driver.set_page_load_timeout(60)
+        driver.set_page_load_timeout(deadline.clamp(60, minimum=1))
         return driver
     except WebDriverException as e:
         logging.error(f"Selenium Driver Setup Failed: {e}", exc_info=True)
@@ -415,8 +802,18 @@ async def _setup_selenium_driver():
             )
         raise WebDriverException(f"Failed to setup Selenium driver: {e}")
 
-async def _handle_cookie_banner(driver):
+async def _handle_cookie_banner(driver, timings: ScrapeTimings = None, deadline: Deadline = None):
     """Attempts to click the cookie acceptance button."""
+    timings = timings or ScrapeTimings()
+    with timings.stage("cookie_banner"):
+        return _click_cookie_banner(driver, deadline or Deadline())
+
+
+def _click_cookie_banner(driver, deadline: Deadline):
+    """
+    Waits once (at most 5s) for any known cookie button to become clickable, instead of
+    5s per selector, so pages without a banner cost one wait rather than six.
+    """
     cookie_selectors = [
         (By.XPATH, "//button[contains(., 'Accept All')]"),
         (By.XPATH, "//button[contains(., 'Allow all cookies')]"),
@@ -425,36 +822,94 @@ async def _handle_cookie_banner(driver):
         (By.CSS_SELECTOR, 'button._a9--._a9_0'), # Another common cookie button class
         (By.XPATH, "//button[text()='Allow All Cookies']"), # Specific text match
     ]
-    for sel_type, sel_val in cookie_selectors:
-        try:
-            cookie_btn = WebDriverWait(driver, 5).until(EC.element_to_be_clickable((sel_type, sel_val)))
-            cookie_btn.click()
-            logging.info("Selenium: Cookie banner accepted.")
-            time.sleep(2) # Give a moment for the banner to disappear
-            return True
-        except (TimeoutException, NoSuchElementException, ElementClickInterceptedException):
-            logging.debug(f"Selenium: Cookie banner button not found or not clickable with selector {sel_type} {sel_val}.")
-            continue
-    logging.info("Selenium: No cookie banner found or accepted after trying all selectors.")
-    return False
+    try:
+        cookie_btn = WebDriverWait(driver, deadline.clamp(5)).until(
+            EC.any_of(*(EC.element_to_be_clickable(selector) for selector in cookie_selectors))
+        )
+        cookie_btn.click()
+        logging.info("Selenium: Cookie banner accepted.")
+        deadline.sleep(2) # Give a moment for the banner to disappear
+        return True
+    except (TimeoutException, NoSuchElementException, ElementClickInterceptedException):
+        logging.info("Selenium: No cookie banner found or accepted with any known selector.")
+        return False
+
+def _extract_likes_from_page_source(page_source, post_shortcode):
+    """
+    BeautifulSoup fallback for the likes count on a post page.
+    Returns (likes, strategy_name), or (None, None) when no reliable element is found.
+    Kept free of Selenium so it can run over saved page sources (benchmarks, replay).
+    """
+    soup = BeautifulSoup(page_source, "html.parser")
+
+    # Look for patterns that might indicate likes, e.g., a number followed by "likes"
+    # This regex is more permissive for formats like "1,234 likes" or "12K likes"
+    likes_regex = re.compile(r'(\d[\d.,]*[kmb]?)\s*(likes|like)', re.IGNORECASE)
+
+    # Search within common data-test-id or aria-label structures for likes
+    potential_likes_elements_bs = soup.find_all(lambda tag:
+        (tag.name in ['span', 'div', 'a', 'button'] and 'likes' in tag.get_text().lower() and 'view' not in tag.get_text().lower()) or # Exclude "view" text
+        (tag.get('aria-label') and 'likes' in tag.get('aria-label').lower()) or
+        (tag.get('data-testid') and 'likes' in tag.get('data-testid').lower()) # New: data-testid search
+    )
+
+    for elem in potential_likes_elements_bs:
+        text_content = elem.get_text(strip=True)
+        logging.info(f"Selenium Likes Strategy 3 (BS): Found candidate text '{text_content}'.")
+        match = likes_regex.search(text_content)
+        if match:
+            parsed_likes = parse_view_count_text(match.group(1))
+            if parsed_likes is not None:
+                logging.info(f"Selenium (BS Fallback): Scraped likes: {parsed_likes} from '{text_content}' for {post_shortcode}.")
+                return parsed_likes, "bs_text"
+
+    # As a very last resort, look for any numerical spans/divs that might be likes counts
+    # (Less reliable, might pick up comments or other numbers, but better than nothing)
+    logging.info(f"Selenium Likes Strategy 3 (BS Last Resort): Trying generic numerical span/div search for likes for {post_shortcode}.")
+    all_numeric_elems = soup.find_all(lambda tag: 
+        tag.name in ['span', 'div'] and re.search(r'^\s*\d[\d.,]*[kmb]?\s*$', tag.get_text(strip=True), re.IGNORECASE) # Only pure numbers
+    )
+
+    best_candidate_likes = None
+    for elem in all_numeric_elems:
+        text_content = elem.get_text(strip=True)
+        parsed_val = parse_view_count_text(text_content)
+        if parsed_val is not None:
+            # Simple heuristic: prioritize smaller non-zero numbers that are likely likes
+            if best_candidate_likes is None or (parsed_val < best_candidate_likes and parsed_val > 0):
+                best_candidate_likes = parsed_val
 
-async def scrape_likes_from_post_page(post_url, app_instance, post_shortcode):
+    if best_candidate_likes is not None:
+        logging.info(f"Selenium (BS Last Resort - heuristic): Scraped likes: {best_candidate_likes} (best candidate) for {post_shortcode}.")
+        return best_candidate_likes, "bs_heuristic"
+
+    logging.warning(f"Selenium (BS Last Resort): No reliable likes count found for {post_shortcode}.")
+    return None, None
+
+
+async def scrape_likes_from_post_page(post_url, app_instance, post_shortcode, timings: ScrapeTimings = None, deadline: Deadline = None):
     """
     Uses Selenium to open the specific post page and scrape the likes count.
     Prioritizes specific XPaths based on user's input, then falls back to general strategies.
+    Element waits are capped by the deadline; once it expires only the page source fallback runs.
     """
     logging.info(f"Selenium: Attempting to scrape likes for {post_shortcode} from post page.")
+    timings = timings or ScrapeTimings()
+    deadline = deadline or Deadline()
+    if deadline.expired():
+        return "N/A (Selenium Likes Skipped - Time Budget Exceeded)"
 
     likes_count = "N/A (Selenium Error)"
     driver = None
     try:
-        driver = await _setup_selenium_driver()
+        driver = await _setup_selenium_driver(deadline=deadline)
         app_instance.set_status_from_thread(f"Selenium: Navigating to post {post_shortcode} for likes...")
         driver.get(post_url)
-        time.sleep(3) # Give time for initial page load
+        deadline.sleep(3) # Give time for initial page load
 
         current_url = driver.current_url
         page_source = driver.page_source
+        timings.add_bytes(page_source)
 
         if "login" in current_url.lower() or "challenge" in current_url.lower() or \
            "login_required" in page_source.lower() or \
@@ -464,7 +919,9 @@ async def scrape_likes_from_post_page(post_url, app_instance, post_shortcode):
             likes_count = "N/A (Selenium Blocked - Manual Login Required)"
             return likes_count
         
-        await _handle_cookie_banner(driver)
+        await _handle_cookie_banner(driver, timings, deadline)
+        if snapshots.capture_enabled():
+            snapshots.capture(post_shortcode, snapshots.KIND_POST_PAGE_SOURCE, driver.page_source, url=post_url)
 
         app_instance.set_status_from_thread(f"Selenium: Extracting likes for {post_shortcode} from post page HTML...")
         
@@ -472,10 +929,10 @@ async def scrape_likes_from_post_page(post_url, app_instance, post_shortcode):
         specific_xpath_found = False
         
         # Always try the user-specified XPath for /reel/ first, as it's reported to be more accurate
-        xpath_reel_style = "/html/body/div[1]/div/div/div[2]/div/div/div[1]/div[1]/div[1]/section/main/div/div[1]/div/div[2]/div/div[3]/section[2]/div/div/span/a/span/span"
+        xpath_reel_style = LIKES_XPATH_REEL_STYLE
         logging.info(f"Selenium Likes Strategy (Primary /reel/ XPath): Attempting {xpath_reel_style} for {post_shortcode}.")
         try:
-            likes_element = WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.XPATH, xpath_reel_style)))
+            likes_element = WebDriverWait(driver, deadline.clamp(5)).until(EC.presence_of_element_located((By.XPATH, xpath_reel_style)))
             likes_text = likes_element.text.strip()
             if likes_text:
                 logging.info(f"Selenium Likes (Primary /reel/ XPath): Found text '{likes_text}'.")
@@ -484,16 +941,17 @@ async def scrape_likes_from_post_page(post_url, app_instance, post_shortcode):
                     likes_count = parsed_likes
                     specific_xpath_found = True
                     logging.info(f"Selenium: Successfully scraped likes: {likes_count} for {post_shortcode} (Primary /reel/ XPath).")
+                    timings.strategies["likes"] = "primary_xpath"
                     return likes_count
         except (TimeoutException, NoSuchElementException) as e:
             logging.warning(f"Selenium Likes (Primary /reel/ XPath) failed for {post_shortcode}: {e}")
         
         # If the first specific XPath failed, try the user-specified XPath for /reels/
         if not specific_xpath_found:
-            xpath_reels_style = "/html/body/div[1]/div/div/div[2]/div/div/div[1]/div[1]/div[1]/section/main/div/div[1]/div/div[2]/div[1]/div/div/div/span/span"
+            xpath_reels_style = LIKES_XPATH_REELS_STYLE
             logging.info(f"Selenium Likes Strategy (Secondary /reels/ XPath): Attempting {xpath_reels_style} for {post_shortcode}.")
             try:
-                likes_element = WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.XPATH, xpath_reels_style)))
+                likes_element = WebDriverWait(driver, deadline.clamp(5)).until(EC.presence_of_element_located((By.XPATH, xpath_reels_style)))
                 likes_text = likes_element.text.strip()
                 if likes_text:
                     logging.info(f"Selenium Likes (Secondary /reels/ XPath): Found text '{likes_text}'.")
@@ -502,6 +960,7 @@ async def scrape_likes_from_post_page(post_url, app_instance, post_shortcode):
                         likes_count = parsed_likes
                         specific_xpath_found = True
                         logging.info(f"Selenium: Successfully scraped likes: {likes_count} for {post_shortcode} (Secondary /reels/ XPath).")
+                        timings.strategies["likes"] = "secondary_xpath"
                         return likes_count
             except (TimeoutException, NoSuchElementException) as e:
                 logging.warning(f"Selenium Likes (Secondary /reels/ XPath) failed for {post_shortcode}: {e}")
@@ -512,7 +971,7 @@ async def scrape_likes_from_post_page(post_url, app_instance, post_shortcode):
             try:
                 # Look for a span/div/button/a that directly contains "likes" text (and not "view") or has "likes" in aria-label
                 # This is often the most direct way to get the count.
-                potential_likes_elements_by_text_or_aria = WebDriverWait(driver, 10).until(
+                potential_likes_elements_by_text_or_aria = WebDriverWait(driver, deadline.clamp(10)).until(
                     EC.presence_of_all_elements_located((By.XPATH,
                         "//span[contains(translate(text(), 'LIKES', 'likes'), 'likes') and not(contains(translate(text(), 'VIEW', 'view'), 'view'))] | " # Span with 'likes' text, not 'view' (case-insensitive)
                         "//div[contains(@aria-label, 'likes')]//span | " # Div with aria-label 'likes' containing a span
@@ -533,6 +992,7 @@ async def scrape_likes_from_post_page(post_url, app_instance, post_shortcode):
                             if parsed_likes is not None:
                                 likes_count = parsed_likes
                                 logging.info(f"Selenium: Successfully scraped likes: {likes_count} for {post_shortcode} (Strategy 1).")
+                                timings.strategies["likes"] = "text_aria"
                                 return likes_count
                 logging.warning(f"Selenium Likes Strategy 1: No reliable likes count found via text/aria-label for {post_shortcode}.")
                 likes_count = "N/A (Selenium Likes Element Not Found - Strategy 1)"
@@ -546,7 +1006,7 @@ async def scrape_likes_from_post_page(post_url, app_instance, post_shortcode):
                 logging.info(f"Selenium Likes Strategy 2: Trying to find likes near heart icon for {post_shortcode}.")
                 try:
                     # Find the heart SVG icon which has an Collectively, the combined logic for scraping likes using the provided XPaths and then falling back to general strategies should improve accuracy.
-                    heart_icon_svg = WebDriverWait(driver, 5).until(
+                    heart_icon_svg = WebDriverWait(driver, deadline.clamp(5)).until(
                         EC.presence_of_element_located((By.XPATH, 
                             "//svg[@aria-label='Like' or @aria-label='Likes'] | "
                             "//span/*[name()='svg' and (@aria-label='Like' or @aria-label='Likes')] | "
@@ -572,6 +1032,7 @@ async def scrape_likes_from_post_page(post_url, app_instance, post_shortcode):
                             if parsed_likes is not None:
                                 likes_count = parsed_likes
                                 logging.info(f"Selenium: Successfully scraped likes: {likes_count} for {post_shortcode} (Strategy 2).")
+                                timings.strategies["likes"] = "heart_icon"
                                 return likes_count
                     
                     logging.warning(f"Selenium Likes Strategy 2: Failed to find likes count near heart icon for {post_shortcode}.")
@@ -584,54 +1045,12 @@ async def scrape_likes_from_post_page(post_url, app_instance, post_shortcode):
             # Fallback Strategy 3: BeautifulSoup broad search (if all Selenium attempts fail)
             if likes_count.startswith("N/A"):
                 logging.info(f"Selenium Likes Strategy 3: Falling back to BeautifulSoup broad search for likes for {post_shortcode}.")
-                soup = BeautifulSoup(driver.page_source, "html.parser")
-
-                # Look for patterns that might indicate likes, e.g., a number followed by "likes"
-                # This regex is more permissive for formats like "1,234 likes" or "12K likes"
-                likes_regex = re.compile(r'(\d[\d.,]*[kmb]?)\s*(likes|like)', re.IGNORECASE)
-                
-                # Search within common data-test-id or aria-label structures for likes
-                potential_likes_elements_bs = soup.find_all(lambda tag:
-                    (tag.name in ['span', 'div', 'a', 'button'] and 'likes' in tag.get_text().lower() and 'view' not in tag.get_text().lower()) or # Exclude "view" text
-                    (tag.get('aria-label') and 'likes' in tag.get('aria-label').lower()) or
-                    (tag.get('data-testid') and 'likes' in tag.get('data-testid').lower()) # New: data-testid search
-                )
-                
-                for elem in potential_likes_elements_bs:
-                    text_content = elem.get_text(strip=True)
-                    logging.info(f"Selenium Likes Strategy 3 (BS): Found candidate text '{text_content}'.")
-                    match = likes_regex.search(text_content)
-                    if match:
-                        parsed_likes = parse_view_count_text(match.group(1))
-                        if parsed_likes is not None:
-                            likes_count = parsed_likes
-                            logging.info(f"Selenium (BS Fallback): Scraped likes: {likes_count} from '{text_content}' for {post_shortcode}.")
-                            return likes_count
-                
-                # As a very last resort, look for any numerical spans/divs that might be likes counts
-                # (Less reliable, might pick up comments or other numbers, but better than nothing)
-                if likes_count.startswith("N/A"):
-                    logging.info(f"Selenium Likes Strategy 3 (BS Last Resort): Trying generic numerical span/div search for likes for {post_shortcode}.")
-                    all_numeric_elems = soup.find_all(lambda tag: 
-                        tag.name in ['span', 'div'] and re.search(r'^\s*\d[\d.,]*[kmb]?\s*$', tag.get_text(strip=True), re.IGNORECASE) # Only pure numbers
-                    )
-                    
-                    best_candidate_likes = None
-                    for elem in all_numeric_elems:
-                        text_content = elem.get_text(strip=True)
-                        parsed_val = parse_view_count_text(text_content)
-                        if parsed_val is not None:
-                            # Simple heuristic: prioritize smaller non-zero numbers that are likely likes
-                            if best_candidate_likes is None or (parsed_val < best_candidate_likes and parsed_val > 0):
-                                best_candidate_likes = parsed_val
-                                likes_count = best_candidate_likes # Update tentative likes_count
-
-                    if best_candidate_likes is not None:
-                        logging.info(f"Selenium (BS Last Resort - heuristic): Scraped likes: {likes_count} (best candidate) for {post_shortcode}.")
-                        return likes_count
-                    else:
-                        logging.warning(f"Selenium (BS Last Resort): No reliable likes count found for {post_shortcode}.")
-                        likes_count = "N/A (Selenium Likes Extract Error - No Reliable Element Found)"
+                parsed_likes, strategy_name = _extract_likes_from_page_source(driver.page_source, post_shortcode)
+                if parsed_likes is not None:
+                    likes_count = parsed_likes
+                    timings.strategies["likes"] = strategy_name
+                    return likes_count
+                likes_count = "N/A (Selenium Likes Extract Error - No Reliable Element Found)"
 
 
     except BrowserPathError as e:
@@ -653,12 +1072,185 @@ async def scrape_likes_from_post_page(post_url, app_instance, post_shortcode):
     return likes_count
 
 
-async def scrape_views_selenium(post_url, app_instance, post_shortcode, owner_username):
+class _NetworkViewHarvester:
+    """
+    Reads the JSON responses the Reels grid downloads while scrolling (via Chrome's
+    performance log and DevTools Network.getResponseBody) and keeps an incremental
+    shortcode -> views map, so the target can be found before its tile renders.
+    """
+
+    def __init__(self, driver, timings: ScrapeTimings, post_shortcode):
+        self.driver = driver
+        self.timings = timings
+        self.post_shortcode = post_shortcode
+        self.views_by_shortcode = {}
+        self._pending_responses = {} # requestId -> url, for JSON responses still loading
+        self._log_available = True
+
+    def harvest(self):
+        """Processes new performance log entries; returns True once the target shortcode has views."""
+        if not self._log_available:
+            return False
+        try:
+            entries = self.driver.get_log("performance")
+        except WebDriverException as e:
+            logging.warning(f"Selenium: Performance log unavailable, falling back to DOM parsing only: {e}")
+            self._log_available = False
+            return False
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, json.JSONDecodeError):
+                continue
+            method = message.get("method")
+            params = message.get("params", {})
+            if method == "Network.responseReceived":
+                response = params.get("response", {})
+                url = response.get("url", "")
+                if "json" in response.get("mimeType", "") or "/graphql" in url or "/api/v1/" in url:
+                    self._pending_responses[params.get("requestId")] = url
+            elif method == "Network.loadingFinished" and params.get("requestId") in self._pending_responses:
+                url = self._pending_responses.pop(params["requestId"])
+                self._read_response_body(params["requestId"], url)
+        return self.post_shortcode in self.views_by_shortcode
+
+    def _read_response_body(self, request_id, url):
+        try:
+            response_body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except WebDriverException as e:
+            logging.debug(f"Selenium: Could not read response body for {url}: {e}")
+            return
+        body = response_body.get("body", "")
+        if response_body.get("base64Encoded"):
+            body = base64.b64decode(body).decode("utf-8", errors="replace")
+        self.timings.add_bytes(body)
+        if body.startswith("for (;;);"): # Anti-JSON-hijacking prefix on some endpoints
+            body = body[len("for (;;);"):]
+        try:
+            data_json = json.loads(body)
+        except json.JSONDecodeError:
+            return
+        found_before = len(self.views_by_shortcode)
+        _collect_view_counts_from_json(data_json, self.views_by_shortcode)
+        if len(self.views_by_shortcode) > found_before:
+            snapshots.capture(self.post_shortcode, snapshots.KIND_NETWORK_RESPONSE, body, url=url)
+            logging.debug(f"Selenium: Network response {url} added {len(self.views_by_shortcode) - found_before} view counts.")
+
+    def wait_for_target(self, seconds):
+        """Polls the log for up to `seconds` (never longer); returns True as soon as the target's views are known."""
+        if seconds <= 0:
+            return self.harvest()
+        wait_until = time.monotonic() + seconds
+        while True:
+            # The last poll interval is cut to what is left, so a wait never overruns the deadline it was clamped to
+            time.sleep(min(NETWORK_LOG_POLL_INTERVAL, max(0.0, wait_until - time.monotonic())))
+            if self.harvest():
+                return True
+            if time.monotonic() >= wait_until:
+                return False
+
+
+def _extract_views_from_grid_html(container_html, post_shortcode):
+    """
+    Parses the outerHTML of a Reels grid tile and returns its view count (int),
+    or an "N/A (...)" string when no reliable view element is found.
+    Kept free of Selenium so it can run over saved HTML (benchmarks, replay).
+    """
+    soup = BeautifulSoup(container_html, "html.parser")
+    
+    view_count = "N/A (Selenium Grid Extract Error - No View Count Icon)"
+    found_parsed_views = None
+
+    # CRITICAL STRATEGY FOR PARSING VIEWS: Find the eye icon first, then its *exact* numerical sibling.
+    # This is the most reliable way to distinguish views from likes/comments.
+    eye_icon_svg = soup.find('svg', {'aria-label': re.compile('View Count Icon', re.IGNORECASE)}) 
+    
+    if eye_icon_svg:
+        # Option 1: Direct next sibling span of the SVG
+        potential_number_span = eye_icon_svg.find_next_sibling(
+            lambda tag: tag.name == 'span' and re.match(r'^\d[\d.,]*[kmb]?$', tag.get_text(strip=True), re.IGNORECASE)
+        )
+        if potential_number_span and parse_view_count_text(potential_number_span.get_text(strip=True)) is not None:
+            found_parsed_views = parse_view_count_text(potential_number_span.get_text(strip=True))
+            logging.info(f"Selenium: Extracted views={found_parsed_views} (eye_icon_direct_sibling='{potential_number_span.get_text(strip=True)}') from grid.")
+        
+        # Option 2: Find sibling divs of the SVG's parent, then look for number inside.
+        if found_parsed_views is None and eye_icon_svg.parent:
+            for sibling in eye_icon_svg.parent.find_next_siblings():
+                if sibling.name in ['div', 'span']:
+                    numbers_in_sibling = sibling.find_all(
+                        lambda tag: tag.name in ['span', 'div'] and re.match(r'^\d[\d.,]*[kmb]?$', tag.get_text(strip=True), re.IGNORECASE)
+                    )
+                    for num_elem in numbers_in_sibling:
+                        if num_elem.get('class') and 'x1vvkbs' in num_elem.get('class'): # Target the specific class from your screenshot
+                            parsed_val = parse_view_count_text(num_elem.get_text(strip=True))
+                            if parsed_val is not None:
+                                found_parsed_views = parse_view_count_text(num_elem.get_text(strip=True))
+                                if parsed_val is not None:
+                                    found_parsed_views = parsed_val
+                                    logging.info(f"Selenium: Extracted views={found_parsed_views} (eye_icon_parent_sibling_target_class='{num_elem.get_text(strip=True)}') from grid.")
+                                    break
+                        if found_parsed_views is not None:
+                            break
+                if found_parsed_views is None:
+                    numbers_in_parent_children = eye_icon_svg.parent.find_all(
+                        lambda tag: tag.name in ['span', 'div'] and re.match(r'^\d[\d.,]*[kmb]?$', tag.get_text(strip=True), re.IGNORECASE)
+                    )
+                    for num_elem in numbers_in_parent_children:
+                        if num_elem.get('class') and 'x1vvkbs' in num_elem.get('class'): # Target specific class
+                            parsed_val = parse_view_count_text(num_elem.get_text(strip=True))
+                            if parsed_val is not None:
+                                found_parsed_views = parsed_val
+                                logging.info(f"Selenium: Extracted views={found_parsed_views} (eye_icon_parent_child_target_class='{num_elem.get_text(strip=True)}') from grid.")
+                                break
+                        if found_parsed_views is not None:
+                            break
+        
+        # Fallback if specific eye icon + sibling/child search fails.
+        if found_parsed_views is None:
+            specific_class_numerical_elems = soup.find_all('span', class_=re.compile(r'x1vvkbs', re.IGNORECASE)) 
+            for elem in specific_class_numerical_elems:
+                text_content = elem.get_text(strip=True)
+                parsed_val = parse_view_count_text(text_content)
+                if parsed_val is not None and parsed_val > 10: 
+                    found_parsed_views = parsed_val
+                    logging.info(f"Selenium: Extracted views={found_parsed_views} (fallback_x1vvkbs_class_match='{text_content}') from grid.")
+                    break
+
+        # Last Resort Fallback: Broadest search for any numerical span/div (highest risk of error).
+        if found_parsed_views is None:
+            all_numeric_elems = soup.find_all(lambda tag: tag.name in ['span', 'div'] and re.search(r'^\d[\d.,]*[kmb]?$', tag.get_text(strip=True), re.IGNORECASE))
+            if all_numeric_elems:
+                best_candidate_val = None
+                for elem in all_numeric_elems:
+                    parsed_val = parse_view_count_text(elem.get_text(strip=True))
+                    if parsed_val is not None and parsed_val > best_candidate_val:
+                        best_candidate_val = parsed_val
+                        found_parsed_views = best_candidate_val
+                        logging.info(f"Selenium: Extracted views={found_parsed_views} (generic numeric text fallback='{elem.get_text(strip=True)}') from grid.")
+                        break
+
+
+        if found_parsed_views is not None:
+            view_count = found_parsed_views
+        else:
+            logging.warning(f"Selenium: Failed to extract view count from grid item for {post_shortcode}. No reliable element found based on current heuristics.")
+            view_count = "N/A (Selenium Grid Extract Error - No View Element Found)"
+    return view_count
+
+
+async def scrape_views_selenium(post_url, app_instance, post_shortcode, owner_username, timings: ScrapeTimings = None, deadline: Deadline = None):
     """
     Uses Selenium to navigate to the owner's Reels tab, find the reel by shortcode,
     and scrape the view count from the grid item.
+    The grid scroll stops when the deadline expires.
     """
     logging.info(f"Selenium: Attempting to scrape views for {post_shortcode} from {owner_username}'s Reels tab.")
+    timings = timings or ScrapeTimings()
+    deadline = deadline or Deadline()
+    if deadline.expired():
+        return "N/A (Selenium Views Skipped - Time Budget Exceeded)"
 
     view_count = "N/A (Selenium Error)"
     driver = None
@@ -666,15 +1258,16 @@ async def scrape_views_selenium(post_url, app_instance, post_shortcode, owner_us
     profile_reels_url = f"https://www.instagram.com/{owner_username}/reels/"
     
     try:
-        driver = await _setup_selenium_driver()
-        driver.set_page_load_timeout(60)
+        driver = await _setup_selenium_driver(capture_network=NETWORK_VIEW_HARVEST_ENABLED, deadline=deadline)
+        harvester = _NetworkViewHarvester(driver, timings, post_shortcode) if NETWORK_VIEW_HARVEST_ENABLED else None
 
         app_instance.set_status_from_thread(f"Selenium: Navigating to {owner_username}'s Reels tab...")
         driver.get(profile_reels_url)
-        time.sleep(3)
+        deadline.sleep(3)
 
         current_url = driver.current_url
         page_source = driver.page_source
+        timings.add_bytes(page_source)
 
         if "login" in current_url.lower() or "challenge" in current_url.lower() or \
            "login_required" in page_source.lower() or \
@@ -684,7 +1277,7 @@ async def scrape_views_selenium(post_url, app_instance, post_shortcode, owner_us
             view_count = "N/A (Selenium Blocked - Manual Login Required)"
             return view_count
 
-        await _handle_cookie_banner(driver)
+        await _handle_cookie_banner(driver, timings, deadline)
 
         app_instance.set_status_from_thread(f"Selenium: Searching for reel {post_shortcode} in grid view (scrolling)...")
         
@@ -702,10 +1295,26 @@ async def scrape_views_selenium(post_url, app_instance, post_shortcode, owner_us
         
         total_scrolls = 0
         max_total_scrolls_limit = 700
+        budget_exhausted = False
 
+        grid_scroll_started = time.perf_counter()
         while True:
+            # The first page of reels is usually fetched before any scroll, so check the log first
+            if harvester and harvester.harvest():
+                break
+            if deadline.expired():
+                logging.warning(f"Selenium: Time budget exhausted after {total_scrolls} scrolls while searching for {post_shortcode}.")
+                budget_exhausted = True
+                break
+
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(7)
+            total_scrolls += 1
+            if harvester:
+                if harvester.wait_for_target(deadline.clamp(7)):
+                    logging.info(f"Selenium: Found views for {post_shortcode} in network responses after {total_scrolls} scrolls.")
+                    break
+            else:
+                deadline.sleep(7)
 
             new_height = driver.execute_script("return document.body.scrollHeight")
             
@@ -728,15 +1337,26 @@ async def scrape_views_selenium(post_url, app_instance, post_shortcode, owner_us
 
             last_height = new_height
             previous_elements_count = current_elements_count
-            total_scrolls += 1
 
             if (no_change_scroll_count >= max_no_change_scrolls and no_new_elements_count >= max_no_new_elements_scrolls) or \
                total_scrolls >= max_total_scrolls_limit:
                 logging.info(f"Selenium: Reached end of scrollable content or no new content/elements loaded after static scrolls, or hit total scroll limit.")
                 break
 
+        timings.add_duration("grid_scroll", time.perf_counter() - grid_scroll_started)
+        timings.scroll_count += total_scrolls
+
+        network_views = harvester.views_by_shortcode.get(post_shortcode) if harvester else None
+        if network_views is not None:
+            logging.info(f"Selenium: Views for {post_shortcode} taken from intercepted network response: {network_views}")
+            timings.strategies["views"] = "network_log"
+            view_count = network_views
+            return view_count
 
         if reel_link_element is None:
+            if budget_exhausted:
+                view_count = f"N/A (Selenium Reel Not Found in Grid - Time Budget Exceeded after {total_scrolls} scrolls)"
+                return view_count
             logging.warning(f"Selenium: Reel link element NOT found for {post_shortcode} after scrolling through all content.")
             view_count = "N/A (Selenium Reel Not Found in Grid after full scroll)"
             return view_count
@@ -779,85 +1399,10 @@ async def scrape_views_selenium(post_url, app_instance, post_shortcode, owner_us
 
 
             container_html = containing_block_element.get_attribute('outerHTML')
-            soup = BeautifulSoup(container_html, "html.parser")
-            
-            found_parsed_views = None
-
-            # CRITICAL STRATEGY FOR PARSING VIEWS: Find the eye icon first, then its *exact* numerical sibling.
-            # This is the most reliable way to distinguish views from likes/comments.
-            eye_icon_svg = soup.find('svg', {'aria-label': re.compile('View Count Icon', re.IGNORECASE)}) 
-            
-            if eye_icon_svg:
-                # Option 1: Direct next sibling span of the SVG
-                potential_number_span = eye_icon_svg.find_next_sibling(
-                    lambda tag: tag.name == 'span' and re.match(r'^\d[\d.,]*[kmb]?$', tag.get_text(strip=True), re.IGNORECASE)
-                )
-                if potential_number_span and parse_view_count_text(potential_number_span.get_text(strip=True)) is not None:
-                    found_parsed_views = parse_view_count_text(potential_number_span.get_text(strip=True))
-                    logging.info(f"Selenium: Extracted views={found_parsed_views} (eye_icon_direct_sibling='{potential_number_span.get_text(strip=True)}') from grid.")
-                
-                # Option 2: Find sibling divs of the SVG's parent, then look for number inside.
-                if found_parsed_views is None and eye_icon_svg.parent:
-                    for sibling in eye_icon_svg.parent.find_next_siblings():
-                        if sibling.name in ['div', 'span']:
-                            numbers_in_sibling = sibling.find_all(
-                                lambda tag: tag.name in ['span', 'div'] and re.match(r'^\d[\d.,]*[kmb]?$', tag.get_text(strip=True), re.IGNORECASE)
-                            )
-                            for num_elem in numbers_in_sibling:
-                                if num_elem.get('class') and 'x1vvkbs' in num_elem.get('class'): # Target the specific class from your screenshot
-                                    parsed_val = parse_view_count_text(num_elem.get_text(strip=True))
-                                    if parsed_val is not None:
-                                        found_parsed_views = parse_view_count_text(num_elem.get_text(strip=True))
-                                        if parsed_val is not None:
-                                            found_parsed_views = parsed_val
-                                            logging.info(f"Selenium: Extracted views={found_parsed_views} (eye_icon_parent_sibling_target_class='{num_elem.get_text(strip=True)}') from grid.")
-                                            break
-                                if found_parsed_views is not None:
-                                    break
-                        if found_parsed_views is None:
-                            numbers_in_parent_children = eye_icon_svg.parent.find_all(
-                                lambda tag: tag.name in ['span', 'div'] and re.match(r'^\d[\d.,]*[kmb]?$', tag.get_text(strip=True), re.IGNORECASE)
-                            )
-                            for num_elem in numbers_in_parent_children:
-                                if num_elem.get('class') and 'x1vvkbs' in num_elem.get('class'): # Target specific class
-                                    parsed_val = parse_view_count_text(num_elem.get_text(strip=True))
-                                    if parsed_val is not None:
-                                        found_parsed_views = parsed_val
-                                        logging.info(f"Selenium: Extracted views={found_parsed_views} (eye_icon_parent_child_target_class='{num_elem.get_text(strip=True)}') from grid.")
-                                        break
-                                if found_parsed_views is not None:
-                                    break
-                
-                # Fallback if specific eye icon + sibling/child search fails.
-                if found_parsed_views is None:
-                    specific_class_numerical_elems = soup.find_all('span', class_=re.compile(r'x1vvkbs', re.IGNORECASE)) 
-                    for elem in specific_class_numerical_elems:
-                        text_content = elem.get_text(strip=True)
-                        parsed_val = parse_view_count_text(text_content)
-                        if parsed_val is not None and parsed_val > 10: 
-                            found_parsed_views = parsed_val
-                            logging.info(f"Selenium: Extracted views={found_parsed_views} (fallback_x1vvkbs_class_match='{text_content}') from grid.")
-                            break
-
-                # Last Resort Fallback: Broadest search for any numerical span/div (highest risk of error).
-                if found_parsed_views is None:
-                    all_numeric_elems = soup.find_all(lambda tag: tag.name in ['span', 'div'] and re.search(r'^\d[\d.,]*[kmb]?$', tag.get_text(strip=True), re.IGNORECASE))
-                    if all_numeric_elems:
-                        best_candidate_val = None
-                        for elem in all_numeric_elems:
-                            parsed_val = parse_view_count_text(elem.get_text(strip=True))
-                            if parsed_val is not None and parsed_val > best_candidate_val:
-                                best_candidate_val = parsed_val
-                                found_parsed_views = best_candidate_val
-                                logging.info(f"Selenium: Extracted views={found_parsed_views} (generic numeric text fallback='{elem.get_text(strip=True)}') from grid.")
-                                break
-
-
-                if found_parsed_views is not None:
-                    view_count = found_parsed_views
-                else:
-                    logging.warning(f"Selenium: Failed to extract view count from grid item for {post_shortcode}. No reliable element found based on current heuristics.")
-                    view_count = "N/A (Selenium Grid Extract Error - No View Element Found)"
+            timings.add_bytes(container_html)
+            snapshots.capture(post_shortcode, snapshots.KIND_GRID_CONTAINER_HTML, container_html, url=profile_reels_url)
+            with timings.stage("grid_extract"):
+                view_count = _extract_views_from_grid_html(container_html, post_shortcode)
         except Exception as e:
             logging.error(f"Selenium: Error during view count extraction from grid for {post_shortcode} (BeautifulSoup): {e}", exc_info=True)
             view_count = f"N/A (Selenium Grid Extract Error: {e})"
@@ -884,6 +1429,9 @@ async def scrape_views_selenium(post_url, app_instance, post_shortcode, owner_us
 async def follow_profile(owner_username: str, app_instance, instaloader_instance: instaloader.Instaloader):
     """
     Attempts to follow the specified Instagram profile using Instaloader.
+    Owners already handled in the current batch (see start_follow_batch) and owners
+    cached as followed (within OWNER_CACHE_TTL_SECONDS) cost no requests. Any cached userid,
+    whatever its follow state or age, skips the profile lookup.
     """
     if not instaloader_instance.context.is_logged_in:
         logging.warning(f"Cannot follow {owner_username}: Instaloader is not logged in.")
@@ -897,23 +1445,47 @@ async def follow_profile(owner_username: str, app_instance, instaloader_instance
             app_instance.set_status_from_thread("Cannot follow: Owner username missing.")
         return False
 
-    app_instance.set_status_from_thread(f"Attempting to follow profile: {owner_username}...")
+    batch_result = _get_batch_follow_result(owner_username)
+    if batch_result is not None:
+        logging.debug(f"Follow for {owner_username} already handled in this batch (result: {batch_result}).")
+        return batch_result
+
+    cached_owner = _get_cached_owner(owner_username)
+    if cached_owner and cached_owner.get("followed") and _is_follow_state_fresh(cached_owner):
+        logging.info(f"Already following {owner_username} (cached). No action needed.")
+        with _owner_cache_lock:
+            _follow_results_this_batch[owner_username.lower()] = True
+        return True
+
+    if app_instance:
+        app_instance.set_status_from_thread(f"Attempting to follow profile: {owner_username}...")
     logging.info(f"Attempting to follow profile: {owner_username}")
 
+    follow_result = False
     try:
-        profile = instaloader.Profile.from_username(instaloader_instance.context, owner_username)
-        if profile.followed_by_viewer:
-            logging.info(f"Already following {owner_username}. No action needed.")
-            if app_instance:
-                app_instance.set_status_from_thread(f"Already following {owner_username}.")
-            return True
+        if cached_owner and cached_owner.get("userid"):
+            userid = cached_owner["userid"]
+            logging.debug(f"Using cached userid {userid} for {owner_username}; skipping profile lookup.")
         else:
-            # Use InstaloaderContext.follow_profile
-            instaloader_instance.context.follow(profile.userid)
-            logging.info(f"Successfully followed {owner_username}.")
-            if app_instance:
-                app_instance.set_status_from_thread(f"Successfully followed {owner_username}.")
-            return True
+            profile = instaloader.Profile.from_username(instaloader_instance.context, owner_username)
+            userid = profile.userid
+            # Cached whatever the follow state, so later attempts (even after the TTL) skip this lookup
+            _set_cached_owner(owner_username, userid, profile.followed_by_viewer)
+            if profile.followed_by_viewer:
+                logging.info(f"Already following {owner_username}. No action needed.")
+                if app_instance:
+                    app_instance.set_status_from_thread(f"Already following {owner_username}.")
+                follow_result = True
+                return follow_result
+
+        # Use InstaloaderContext.follow_profile
+        instaloader_instance.context.follow(userid)
+        _set_cached_owner(owner_username, userid, True)
+        logging.info(f"Successfully followed {owner_username}.")
+        if app_instance:
+            app_instance.set_status_from_thread(f"Successfully followed {owner_username}.")
+        follow_result = True
+        return follow_result
     # Corrected exception name
     except instaloader_exceptions.ProfileNotExistsException:
         logging.warning(f"Cannot follow {owner_username}: Profile does not exist or is private and inaccessible.")
@@ -935,9 +1507,13 @@ async def follow_profile(owner_username: str, app_instance, instaloader_instance
         if app_instance:
             app_instance.set_status_from_thread(f"Error following {owner_username}: {e}.")
         return False
+    finally:
+        # Failed follows are recorded too, so a batch does not retry the same owner for every post.
+        _record_follow_attempt(owner_username, follow_result)
 
 
-async def scrape_post_data(post_url: str, app_instance=None, logged_in_username: str = None, do_follow: bool = False) -> dict:
+async def scrape_post_data(post_url: str, app_instance=None, logged_in_username: str = None, do_follow: bool = False,
+                           time_budget: float = SCRAPE_TIME_BUDGET_SECONDS) -> dict:
     """
     Main function to scrape post data.
     1. Transforms input URL from /reels/ to /reel/ format for consistent scraping.
@@ -948,7 +1524,14 @@ async def scrape_post_data(post_url: str, app_instance=None, logged_in_username:
         b. If direct HTML fails, falls back to Selenium (from grid view, using shortcode lookup).
     5. Attempts to follow the post owner's profile if 'do_follow' is True and logged in.
     Accepts logged_in_username to load Instaloader session.
+    The returned dict carries a "timings" record (see ScrapeTimings.as_dict).
+    Every stage shares one Deadline of time_budget seconds (None = unbounded). Stages that start
+    after it expires are skipped; whatever was collected is returned with "timed_out": True.
     """
+    timings = ScrapeTimings()
+    deadline = Deadline(time_budget)
+    scrape_started = time.perf_counter()
+
     # --- NEW: URL Transformation ---
     # Always convert /reels/ to /reel/ for consistent scraping as per user's preference
     if "/reels/" in post_url:
@@ -967,20 +1550,36 @@ async def scrape_post_data(post_url: str, app_instance=None, logged_in_username:
         "last_record": None,
         "engagement_rate": "N/A",
         "error": None,
-        "is_video": False 
+        "is_video": False,
+        "timings": None,
+        "timed_out": False
     }
 
+    def _check_deadline(stage_name):
+        """Returns True if the budget is spent; the first stage to notice records the timeout marker."""
+        if not deadline.expired():
+            return False
+        if not data["timed_out"]:
+            data["timed_out"] = True
+            timeout_note = f"Time budget of {time_budget}s exceeded at {stage_name}; partial results."
+            data["error"] = f"{data['error']} | {timeout_note}" if data["error"] else timeout_note
+            logging.warning(f"[scrape_post_data] {timeout_note} ({post_url})")
+        return True
+
     shortcode = get_shortcode_from_url(post_url)
     if not shortcode:
         data["error"] = "Invalid URL (no shortcode found)."
         logging.error(f"[scrape_post_data] Invalid URL: {post_url}")
+        data["timings"] = timings.as_dict()
         return data
 
     # --- (1) Load Instaloader session if provided ---
+    _bound_instaloader_to(deadline)
     if logged_in_username:
         session_path = os.path.join(USER_DATA_DIR, logged_in_username)
         try:
-            L.load_session_from_file(logged_in_username, filename=session_path)
+            with timings.stage("instaloader_session"):
+                L.load_session_from_file(logged_in_username, filename=session_path)
             logging.info(f"[Instaloader] Loaded session for {logged_in_username}")
             if app_instance:
                 app_instance.set_status_from_thread(f"Instaloader: Using session for {logged_in_username}")
@@ -1011,8 +1610,14 @@ async def scrape_post_data(post_url: str, app_instance=None, logged_in_username:
     # --- (2) Attempt to fetch the Post object via Instaloader (for initial metadata) ---
     post_obj = None
     try:
-        post_obj = Post.from_shortcode(L.context, shortcode)
+        if _check_deadline("instaloader_post"):
+            raise TimeoutError("time budget exceeded before the Instaloader post lookup")
+        _bound_instaloader_to(deadline)
+        with timings.stage("instaloader_post"):
+            post_obj = Post.from_shortcode(L.context, shortcode)
         data["is_video"] = post_obj.is_video # Store is_video status from Instaloader
+    except TimeoutError as te:
+        logging.warning(f"[Instaloader] Skipped post lookup for {shortcode}: {te}")
     except instaloader_exceptions.BadResponseException as bre:
         data["error"] = f"Instaloader BadResponse (403?): {bre}"
         logging.warning(f"[Instaloader] {data['error']}", exc_info=True)
@@ -1031,7 +1636,7 @@ async def scrape_post_data(post_url: str, app_instance=None, logged_in_username:
     
     if post_obj is None: # If Instaloader failed to get post_obj, we can't proceed well for some data
         logging.error(f"[scrape_post_data] Instaloader failed to get post_obj for {shortcode}. Limited data will be available.")
-        if not data["error"]: # If no error yet from above, set a generic one
+        if not data["error"] and not data["timed_out"]: # If no error yet from above, set a generic one
             data["error"] = "Instaloader failed to retrieve post metadata. Some fields may be N/A."
         # We'll still try Selenium for likes and views, but owner/post_date might be missing.
 
@@ -1054,7 +1659,11 @@ async def scrape_post_data(post_url: str, app_instance=None, logged_in_username:
 
     # --- NEW: Scrape Likes using Selenium from post page (PRIMARY source for likes) ---
     app_instance.set_status_from_thread(f"Scraping likes for {shortcode} from post page...")
-    selenium_likes_result = await scrape_likes_from_post_page(post_url, app_instance, shortcode)
+    if _check_deadline("likes_post_page"):
+        selenium_likes_result = "N/A (Selenium Likes Skipped - Time Budget Exceeded)"
+    else:
+        with timings.stage("likes_post_page"):
+            selenium_likes_result = await scrape_likes_from_post_page(post_url, app_instance, shortcode, timings, deadline)
 
     if isinstance(selenium_likes_result, int):
         data["likes"] = selenium_likes_result
@@ -1063,6 +1672,7 @@ async def scrape_post_data(post_url: str, app_instance=None, logged_in_username:
         # If Selenium for likes fails, fall back to Instaloader's original data if available
         instaloader_likes = post_obj.likes if (post_obj and isinstance(post_obj.likes, int)) else "N/A"
         data["likes"] = instaloader_likes
+        timings.strategies["likes"] = "instaloader_fallback" if isinstance(instaloader_likes, int) else "none"
         logging.warning(f"Selenium for {shortcode} likes failed: {selenium_likes_result}. Falling back to Instaloader's likes: {instaloader_likes}.")
         if data["error"]:
             data["error"] += f" | Likes Selenium fallback to Instaloader: {selenium_likes_result}"
@@ -1076,10 +1686,12 @@ async def scrape_post_data(post_url: str, app_instance=None, logged_in_username:
         
         # --- FIRST ATTEMPT: Direct HTML (requests) ---
         app_instance.set_status_from_thread(f"Trying Direct HTML for {shortcode} views...")
-        direct_html_views = await scrape_views_direct_html(post_url, shortcode)
+        with timings.stage("direct_html"):
+            direct_html_views = await scrape_views_direct_html(post_url, shortcode, timings, deadline)
 
         if isinstance(direct_html_views, int):
             data["views"] = direct_html_views
+            timings.strategies["views"] = "direct_html"
             logging.info(f"Views for {shortcode} obtained via Direct HTML: {direct_html_views}")
         else:
             # Direct HTML failed, fall back to Selenium (grid view strategy)
@@ -1087,20 +1699,27 @@ async def scrape_post_data(post_url: str, app_instance=None, logged_in_username:
             app_instance.set_status_from_thread(f"Direct HTML failed; trying Selenium for {shortcode} views from grid...")
             
             # Ensure owner_username is available before calling Selenium
-            if owner_username == "N/A" or not owner_username:
+            if _check_deadline("views_selenium"):
+                data["views"] = "N/A (Selenium Views Skipped - Time Budget Exceeded)"
+                timings.strategies["views"] = "none"
+            elif owner_username == "N/A" or not owner_username:
                 # If owner_username wasn't found by Instaloader, Selenium cannot navigate to reels tab
                 logging.error(f"Cannot use Selenium grid view for views: Owner username not available for {shortcode}.")
                 data["views"] = f"N/A (Selenium views blocked - owner unknown)"
+                timings.strategies["views"] = "none"
                 if data["error"]:
                     data["error"] += " | Selenium views blocked (owner unknown)"
                 else:
                     data["error"] = "Selenium views blocked (owner unknown)"
             else:
-                selenium_views_result = await scrape_views_selenium(post_url, app_instance, shortcode, owner_username)
+                with timings.stage("views_selenium"):
+                    selenium_views_result = await scrape_views_selenium(post_url, app_instance, shortcode, owner_username, timings, deadline)
                 
                 if isinstance(selenium_views_result, int):
                     data["views"] = selenium_views_result
+                    timings.strategies.setdefault("views", "selenium_grid") # scrape_views_selenium may have set "network_log"
                 else:
+                    timings.strategies["views"] = "none"
                     data["views"] = str(selenium_views_result) # e.g. "N/A (Error…)"
                     if data.get("error"):
                         data["error"] += f" | Selenium views: {selenium_views_result}"
@@ -1108,18 +1727,23 @@ async def scrape_post_data(post_url: str, app_instance=None, logged_in_username:
                         data["error"] = f"Selenium views: {selenium_views_result}"
     else:
         data["views"] = "N/A (Not a video)"
+        timings.strategies["views"] = "not_video"
     
     # --- NEW: Attempt to follow the profile conditionally ---
-    if do_follow and L.context.is_logged_in and owner_username != "N/A":
-        await follow_profile(owner_username, app_instance, L)
+    if do_follow and L.context.is_logged_in and owner_username != "N/A" and not _check_deadline("follow"):
+        _bound_instaloader_to(deadline)
+        with timings.stage("follow"):
+            await follow_profile(owner_username, app_instance, L)
     else:
         log_msg = f"Skipping profile follow for {owner_username}: "
         if not do_follow:
             log_msg += "Following is disabled by configuration."
         elif not L.context.is_logged_in:
             log_msg += "Instaloader not logged in."
-        else:
+        elif owner_username == "N/A":
             log_msg += "Owner username unknown."
+        else:
+            log_msg += "Time budget exceeded."
         logging.info(log_msg)
         if app_instance:
             app_instance.set_status_from_thread(f"Skipping follow for {owner_username}.")
@@ -1135,6 +1759,13 @@ async def scrape_post_data(post_url: str, app_instance=None, logged_in_username:
     now_str_local = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     data["last_record"] = now_str_local
 
+    # A stage that ran out of budget mid-way returns an N/A value; flag it unless the data is complete anyway
+    views_complete = isinstance(data["views"], int) or not data["is_video"]
+    if not (isinstance(data["likes"], int) and views_complete):
+        _check_deadline("end of scrape")
+    timings.add_duration("total", time.perf_counter() - scrape_started)
+    data["timings"] = timings.as_dict()
+
     # Update status in your GUI (if provided)
     if app_instance:
         if data.get("error"):
@@ -1146,17 +1777,175 @@ async def scrape_post_data(post_url: str, app_instance=None, logged_in_username:
     return data
 
 
+# --------------------------
+# Whole-account sweep
+# --------------------------
+
+def _sweep_state_path(owner_username):
+    return os.path.join(SWEEP_STATE_DIR, f"{owner_username.lower()}.json")
+
+
+def _save_sweep_state(owner_username, posts_iterator):
+    """Stores the frozen position of the profile's post iterator so the sweep can resume there."""
+    os.makedirs(SWEEP_STATE_DIR, exist_ok=True)
+    state_path = _sweep_state_path(owner_username)
+    tmp_path = state_path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(posts_iterator.freeze()._asdict(), f)
+        os.replace(tmp_path, state_path)
+    except OSError as e:
+        logging.warning(f"[Sweep] Could not save resume state for {owner_username}: {e}")
+
+
+def _resume_sweep_state(owner_username, posts_iterator):
+    """Thaws a saved iterator position into posts_iterator; returns the number of posts already swept (0 if none)."""
+    state_path = _sweep_state_path(owner_username)
+    if not os.path.exists(state_path):
+        return 0
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            posts_iterator.thaw(FrozenNodeIterator(**json.load(f)))
+        logging.info(f"[Sweep] Resuming sweep of {owner_username} after {posts_iterator.total_index} posts.")
+        return posts_iterator.total_index
+    except (OSError, TypeError, json.JSONDecodeError, instaloader_exceptions.InvalidArgumentException) as e:
+        # Stale (expired) or unreadable state: start over from the newest post.
+        logging.warning(f"[Sweep] Ignoring resume state for {owner_username}: {e}")
+        return 0
+
+
+# Key paths of each metric in the iterator's own node data, best first. GraphQL nodes use the
+# first names, the iPhone API structs (Post.from_iphone_struct) the last.
+SWEEP_VIEW_PATHS = (("video_play_count",), ("play_count",), ("video_view_count",), ("view_count",)) # Reels report plays
+SWEEP_LIKE_PATHS = (("edge_media_preview_like", "count"), ("edge_liked_by", "count"), ("like_count",))
+SWEEP_COMMENT_PATHS = (("edge_media_to_comment", "count"), ("edge_media_preview_comment", "count"), ("comment_count",))
+
+
+def _sweep_node_count(post, paths):
+    """
+    Returns the first integer found at one of the key paths in the post's node or iPhone struct,
+    or None. Reads only what the iterator already fetched: Post properties fall back to loading
+    the full metadata, which costs one request per post and raises KeyError if the field is missing there too.
+    """
+    sources = (post._node, getattr(post, "_iphone_struct_", None))
+    for path in paths:
+        for value in sources:
+            for key in path:
+                value = value.get(key) if isinstance(value, dict) else None
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+    return None
+
+
+def _post_to_sweep_data(post, owner_username):
+    """Builds a scrape_post_data-shaped dict from an Instaloader Post yielded by the owner's profile iterator."""
+    post_url = f"https://www.instagram.com/reel/{post.shortcode}/"
+    views = _sweep_node_count(post, SWEEP_VIEW_PATHS)
+    likes = _sweep_node_count(post, SWEEP_LIKE_PATHS)
+    comments = _sweep_node_count(post, SWEEP_COMMENT_PATHS)
+    likes = likes if likes is not None else "N/A"
+    comments = comments if comments is not None else "N/A"
+    views = views if views is not None else "N/A (Sweep - no view count)"
+    return {
+        "url": post_url,
+        "link": post_url,
+        "post_shortcode": post.shortcode,
+        "owner": owner_username, # Every post of the iterator belongs to the swept profile
+        "likes": likes,
+        "comments": comments,
+        "post_date": post.date_utc.strftime("%Y-%m-%d %H:%M:%S") if post.date_utc else "N/A",
+        "views": views,
+        "last_record": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "engagement_rate": calculate_engagement_rate_post(likes, comments, views if isinstance(views, int) else None),
+        "error": None,
+        "is_video": True,
+        "timings": None,
+        "source": "sweep",
+    }
+
+
+def sweep_account_posts(owner_username: str, app_instance=None, logged_in_username: str = None, batch_size: int = SWEEP_BATCH_SIZE):
+    """
+    Walks every post of a profile with Instaloader's lazy, paginated post iterator and yields
+    lists of up to batch_size reel dicts (same keys as scrape_post_data, plus "source": "sweep").
+    Only video posts are yielded. Likes, comments and views are read from the iterator's own
+    GraphQL pages (never through lazy Post properties), so no per-post requests or browser are needed.
+
+    The iterator position is saved to SWEEP_STATE_DIR after each batch has been consumed,
+    so an interrupted sweep picks up where it stopped; the file is removed once the sweep completes.
+    """
+    _bound_instaloader_to(Deadline()) # A sweep has no budget; undo the last scrape's limits
+    if logged_in_username:
+        try:
+            L.load_session_from_file(logged_in_username, filename=os.path.join(USER_DATA_DIR, logged_in_username))
+        except FileNotFoundError:
+            logging.warning(f"[Sweep] No session file found for '{logged_in_username}'. Proceeding anonymously.")
+        except Exception as e:
+            logging.warning(f"[Sweep] Could not load session for '{logged_in_username}': {e}. Proceeding anonymously.")
+
+    try:
+        profile = Profile.from_username(L.context, owner_username)
+        posts = profile.get_posts()
+    except instaloader_exceptions.ProfileNotExistsException:
+        logging.error(f"[Sweep] Profile {owner_username} does not exist.")
+        if app_instance:
+            app_instance.set_status_from_thread(f"Sweep: Profile {owner_username} not found.")
+        return
+    except instaloader_exceptions.InstaloaderException as e:
+        logging.error(f"[Sweep] Could not open profile {owner_username}: {e}")
+        if app_instance:
+            app_instance.set_status_from_thread(f"Sweep: Could not open {owner_username}: {e}")
+        return
+
+    swept_count = _resume_sweep_state(owner_username, posts)
+    logging.info(f"[Sweep] Sweeping {owner_username} ({profile.mediacount} posts, starting at {swept_count}).")
+
+    batch = []
+    try:
+        for post in posts:
+            swept_count += 1
+            try:
+                if not post.is_video:
+                    continue
+                batch.append(_post_to_sweep_data(post, owner_username))
+            except (KeyError, AttributeError) as e:
+                # A node missing a required field; skip that post rather than ending the sweep
+                logging.warning(f"[Sweep] Skipping post {swept_count} of {owner_username}: missing {e}")
+            if len(batch) >= batch_size:
+                if app_instance:
+                    app_instance.set_status_from_thread(f"Sweep: {owner_username} {swept_count}/{profile.mediacount} posts...")
+                yield batch
+                batch = []
+                _save_sweep_state(owner_username, posts) # Only after the caller has stored the batch
+    except instaloader_exceptions.InstaloaderException as e:
+        # Rate limits and expired sessions end the sweep early; the saved state lets the next run resume.
+        logging.error(f"[Sweep] Sweep of {owner_username} stopped after {swept_count} posts: {e}")
+        if app_instance:
+            app_instance.set_status_from_thread(f"Sweep of {owner_username} interrupted: {e}. Run again to resume.")
+        if batch:
+            yield batch
+        return
+
+    if batch:
+        yield batch
+    try:
+        os.remove(_sweep_state_path(owner_username))
+    except FileNotFoundError:
+        pass
+    logging.info(f"[Sweep] Completed sweep of {owner_username} ({swept_count} posts).")
+
+
 # --------------------------
 # Example usage / test run
 # --------------------------
 if __name__ == "__main__":
     """
     Usage (command line):
-      python scraper.py <reel_url_or_shortcode> [<instaloader_username>] [--follow]
+      python scraper.py <reel_url_or_shortcode> [<instaloader_username>] [--follow] [--capture] [--budget=SECONDS]
 
     Example:
       python scraper.py https://www.instagram.com/reel/DCSkPtuThsG/ your_instaloader_username --follow
-      python scraper.py DCSkPtuThsG
+      python scraper.py DCSkPtuThsG --capture   # also store page snapshots for snapshots.py replay
     """
     import sys
     import json
@@ -1169,17 +1958,22 @@ if __name__ == "__main__":
 
 
     if len(sys.argv) < 2:
-        print("Usage: python scraper.py <reel_url_or_shortcode> [<instaloader_username>] [--follow]")
+        print("Usage: python scraper.py <reel_url_or_shortcode> [<instaloader_username>] [--follow] [--capture] [--budget=SECONDS]")
         sys.exit(1)
 
     input_val = sys.argv[1]
     username = None
     follow_flag = True
+    budget_seconds = SCRAPE_TIME_BUDGET_SECONDS
 
     # Parse command line arguments for username and --follow flag
     for arg in sys.argv[2:]:
         if arg == '--follow':
             follow_flag = True
+        elif arg == '--capture':
+            snapshots.enable_capture()
+        elif arg.startswith('--budget='):
+            budget_seconds = float(arg.split('=', 1)[1])
         else:
             username = arg # Assume the first non-flag argument is the username
 
@@ -1190,7 +1984,7 @@ if __name__ == "__main__":
 
     async def main():
         dummy = DummyApp()
-        result = await scrape_post_data(input_val, app_instance=dummy, logged_in_username=username, do_follow=follow_flag)
+        result = await scrape_post_data(input_val, app_instance=dummy, logged_in_username=username, do_follow=follow_flag, time_budget=budget_seconds)
         print(json.dumps(result, indent=4))
 
     asyncio.run(main())
@@ -0,0 +1,199 @@
+# snapshots.py
+"""
+Record-and-replay store for pages the scraper has already loaded.
+
+Capture mode (off by default, enable with IG_SNAPSHOT_CAPTURE=1 or enable_capture()) saves
+post page sources, Reels grid tile outerHTML, HTTP responses and intercepted XHR JSON as gzip-compressed,
+content-addressed blobs. An append-only index maps each blob to its shortcode, kind and capture time.
+
+Replay mode re-runs the scraper's extraction functions over stored snapshots at disk speed,
+with no browser or network:
+  python snapshots.py list [<shortcode>]
+  python snapshots.py replay [<shortcode> ...]
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+
+# --- Configuration ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_DIR = os.path.join(SCRIPT_DIR, "page_snapshots")
+SNAPSHOT_OBJECTS_DIR = os.path.join(SNAPSHOT_DIR, "objects")
+SNAPSHOT_INDEX_FILE = os.path.join(SNAPSHOT_DIR, "index.jsonl")
+
+# Snapshot kinds written by scraper.py
+KIND_POST_PAGE_SOURCE = "post_page_source"
+KIND_GRID_CONTAINER_HTML = "grid_container_html"
+KIND_HTTP_RESPONSE = "http_response"
+KIND_NETWORK_RESPONSE = "network_response" # JSON intercepted from the browser's performance log
+
+SNAPSHOT_CAPTURE_ENABLED = os.environ.get("IG_SNAPSHOT_CAPTURE", "").strip().lower() in ("1", "true", "yes")
+
+_index_lock = threading.Lock()
+
+
+def enable_capture(enabled=True):
+    """Turns capture mode on or off for this process."""
+    global SNAPSHOT_CAPTURE_ENABLED
+    SNAPSHOT_CAPTURE_ENABLED = enabled
+    logging.info(f"Snapshot capture {'enabled' if enabled else 'disabled'} (store: {SNAPSHOT_DIR}).")
+
+
+def capture_enabled():
+    return SNAPSHOT_CAPTURE_ENABLED
+
+
+def _object_path(digest):
+    return os.path.join(SNAPSHOT_OBJECTS_DIR, digest[:2], f"{digest}.gz")
+
+
+def capture(shortcode, kind, content, url=None, status_code=None):
+    """
+    Stores content (str or bytes) for shortcode if capture mode is on.
+    Identical content is stored once; every call still gets its own index entry.
+    Returns the sha256 digest, or None when capture is off or the write failed.
+    """
+    if not SNAPSHOT_CAPTURE_ENABLED or content is None:
+        return None
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+
+    digest = hashlib.sha256(content).hexdigest()
+    object_path = _object_path(digest)
+    try:
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            # Scrape worker processes share the store, and thread idents repeat across processes
+            tmp_path = f"{object_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+                f.write(content)
+            os.replace(tmp_path, object_path)
+
+        entry = {
+            "shortcode": shortcode,
+            "kind": kind,
+            "captured_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "sha256": digest,
+            "size": len(content),
+            "url": url,
+            "status_code": status_code,
+        }
+        with _index_lock:
+            with open(SNAPSHOT_INDEX_FILE, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        logging.debug(f"[Snapshots] Captured {kind} for {shortcode} ({len(content)} bytes, {digest[:12]}).")
+        return digest
+    except OSError as e:
+        logging.warning(f"[Snapshots] Failed to capture {kind} for {shortcode}: {e}")
+        return None
+
+
+def load_object(digest):
+    """Returns the stored content for a digest as text."""
+    with gzip.open(_object_path(digest), "rb") as f:
+        return f.read().decode("utf-8", errors="replace")
+
+
+def iter_index(shortcode=None, kind=None):
+    """Yields index entries in capture order, optionally filtered by shortcode and kind."""
+    if not os.path.exists(SNAPSHOT_INDEX_FILE):
+        return
+    with open(SNAPSHOT_INDEX_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                logging.warning(f"[Snapshots] Skipping corrupt index line: {line[:80]}")
+                continue
+            if shortcode and entry.get("shortcode") != shortcode:
+                continue
+            if kind and entry.get("kind") != kind:
+                continue
+            yield entry
+
+
+def replay_entry(entry):
+    """
+    Re-runs extraction over one stored snapshot and returns
+    {"shortcode", "kind", "captured_at", "likes", "comments", "views", "error"}.
+    """
+    # Imported here because scraper.py imports this module for capture.
+    import scraper
+
+    shortcode = entry["shortcode"]
+    result = {
+        "shortcode": shortcode,
+        "kind": entry["kind"],
+        "captured_at": entry.get("captured_at"),
+        "likes": None,
+        "comments": None,
+        "views": None,
+        "error": None,
+    }
+    try:
+        content = load_object(entry["sha256"])
+    except OSError as e:
+        result["error"] = f"Snapshot object missing: {e}"
+        return result
+
+    try:
+        if entry["kind"] == KIND_POST_PAGE_SOURCE:
+            result["likes"], _ = scraper._extract_likes_from_page_source(content, shortcode)
+        elif entry["kind"] == KIND_GRID_CONTAINER_HTML:
+            views = scraper._extract_views_from_grid_html(content, shortcode)
+            if isinstance(views, int):
+                result["views"] = views
+            else:
+                result["error"] = views
+        elif entry["kind"] == KIND_HTTP_RESPONSE:
+            shared_data = scraper._parse_shared_data(content)
+            if shared_data is None:
+                result["error"] = "No window._sharedData in stored response."
+            else:
+                extracted = scraper._extract_reel_data_from_shared(shared_data, shortcode)
+                result["likes"] = extracted["likes"] if isinstance(extracted["likes"], int) else None
+                result["comments"] = extracted["comments"] if isinstance(extracted["comments"], int) else None
+                result["views"] = scraper._find_view_count_in_json(shared_data, shortcode)
+                result["error"] = extracted.get("error")
+        elif entry["kind"] == KIND_NETWORK_RESPONSE:
+            result["views"] = scraper._collect_view_counts_from_json(json.loads(content), {}).get(shortcode)
+        else:
+            result["error"] = f"No replay extractor for kind '{entry['kind']}'."
+    except Exception as e:
+        logging.error(f"[Snapshots] Replay failed for {shortcode} ({entry['kind']}): {e}", exc_info=True)
+        result["error"] = f"Replay error: {e}"
+    return result
+
+
+def replay(shortcodes=None):
+    """Yields replay results for every stored snapshot (or only those of the given shortcodes)."""
+    wanted = set(shortcodes) if shortcodes else None
+    for entry in iter_index():
+        if wanted is not None and entry.get("shortcode") not in wanted:
+            continue
+        yield replay_entry(entry)
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ("list", "replay"):
+        print("Usage: python snapshots.py list [<shortcode>] | replay [<shortcode> ...]")
+        sys.exit(1)
+
+    if sys.argv[1] == "list":
+        for index_entry in iter_index(shortcode=sys.argv[2] if len(sys.argv) > 2 else None):
+            print(json.dumps(index_entry))
+    else:
+        for replay_result in replay(sys.argv[2:] or None):
+            print(json.dumps(replay_result))
@@ -0,0 +1,22 @@
+# conftest.py
+"""
+Shared pytest fixtures. The modules live at the repository root, which is put on sys.path here.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Points the database module at a fresh, fully migrated database file."""
+    monkeypatch.setattr(database, "DB_FILE", str(tmp_path / "test.db"))
+    database.setup_database()
+    yield database.DB_FILE
+    database.close_connections()
@@ -0,0 +1,45 @@
+# test_analytics.py
+import pytest
+
+import database
+
+pytest.importorskip("duckdb")
+
+import analytics
+
+
+@pytest.fixture
+def mirror(tmp_path, temp_db, monkeypatch):
+    monkeypatch.setattr(analytics, "ANALYTICS_DB_FILE", str(tmp_path / "test.duckdb"))
+    yield
+    analytics.close_analytics()
+
+
+def _post(shortcode, views, last_record):
+    return {"post_shortcode": shortcode, "owner": "creator_x", "likes": 1, "comments": 1, "views": views, "last_record": last_record}
+
+
+def test_sync_replaces_history_of_re_added_post(mirror):
+    database.save_many_to_database([_post("AAA", 100, 1000), _post("BBB", 200, 1000)])
+    assert analytics.sync_analytics()["history"] == 2
+
+    # Deleting the newest history row's post and re-adding it must not leave its old history in the mirror
+    database.delete_posts_from_db(["BBB"])
+    database.save_many_to_database([_post("BBB", 5, 2000)])
+    result = analytics.sync_analytics()
+    assert result["deleted"] == 1
+    assert result["posts"] == 1
+    assert result["history"] == 1
+
+    _, rows = analytics.query("SELECT post_shortcode, recorded_at, views FROM history ORDER BY post_shortcode, recorded_at", sync=False)
+    assert rows == [("AAA", 1000, 100), ("BBB", 2000, 5)]
+    _, rows = analytics.query("SELECT post_shortcode, views FROM posts ORDER BY post_shortcode", sync=False)
+    assert rows == [("AAA", 100), ("BBB", 5)]
+
+
+def test_history_ids_are_not_reused(temp_db):
+    database.save_many_to_database([_post("AAA", 100, 1000)])
+    first_id = list(database.iter_post_history_after(0))[0][0]
+    database.delete_posts_from_db(["AAA"])
+    database.save_many_to_database([_post("AAA", 100, 2000)])
+    assert [row[0] for row in database.iter_post_history_after(0)] == [first_id + 1]
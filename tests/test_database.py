@@ -0,0 +1,160 @@
+# test_database.py
+import sqlite3
+
+import database
+
+
+def _post(shortcode, views, last_record, owner="creator_x"):
+    return {"post_shortcode": shortcode, "owner": owner, "likes": 10, "comments": 2, "views": views, "last_record": last_record}
+
+
+def _query(temp_db, sql, params=()):
+    with sqlite3.connect(temp_db) as conn:
+        return conn.execute(sql, params).fetchall()
+
+
+def test_save_counts_written_and_unchanged(temp_db):
+    stats = {}
+    assert database.save_many_to_database([_post("AAA", 100, 1000), _post("BBB", 200, 1000)], stats=stats) == 2
+    assert stats == {"written": 2, "unchanged": 0}
+
+    stats = {}
+    assert database.save_many_to_database([_post("AAA", 100, 2000), _post("BBB", 250, 2000)], stats=stats) == 2
+    assert stats == {"written": 1, "unchanged": 1}
+
+
+def test_upsert_keeps_row_id(temp_db):
+    database.save_many_to_database([_post("AAA", 100, 1000), _post("BBB", 200, 1000)])
+    ids = dict(_query(temp_db, "SELECT post_shortcode, id FROM scraped_posts"))
+
+    database.save_many_to_database([_post("AAA", 150, 2000), _post("BBB", 200, 2000)])
+    assert dict(_query(temp_db, "SELECT post_shortcode, id FROM scraped_posts")) == ids
+    assert _query(temp_db, "SELECT post_shortcode, last_record, views FROM scraped_posts ORDER BY post_shortcode") == [
+        ("AAA", 2000, 150),
+        ("BBB", 2000, 200),
+    ]
+
+
+def test_unchanged_scrape_still_records_history(temp_db):
+    database.save_many_to_database([_post("AAA", 100, 1000)])
+    version = database.current_change_version()
+
+    database.save_many_to_database([_post("AAA", 100, 2000)])
+    assert database.load_post_history("AAA") == [(1000, 10, 2, 100, "scrape"), (2000, 10, 2, 100, "scrape")]
+    # Only last_record was rewritten
+    changed_rows, _, _ = database.changes_since(version)
+    assert [row[database.LOADED_POST_COLUMNS.index("last_record")] for row in changed_rows] == [2000]
+
+
+def test_sweep_leaves_unchanged_posts_alone(temp_db):
+    database.save_many_to_database([_post("AAA", 100, 1000), _post("BBB", 200, 1000)])
+    written = database.save_changed_posts_to_database([
+        dict(_post("AAA", 100, 2000), source="sweep"),
+        dict(_post("BBB", 300, 2000), source="sweep"),
+    ])
+    assert written == ["BBB"]
+    assert database.load_post_history("AAA") == [(1000, 10, 2, 100, "scrape")]
+    assert database.load_post_history("BBB") == [(1000, 10, 2, 200, "scrape"), (2000, 10, 2, 300, "sweep")]
+
+
+def _row_versions(temp_db):
+    return dict(_query(temp_db, "SELECT post_shortcode, row_version FROM scraped_posts"))
+
+
+def test_update_bumps_row_version(temp_db):
+    database.save_many_to_database([_post("AAA", 100, 1000), _post("BBB", 200, 1000)])
+    before = _row_versions(temp_db)
+
+    database.save_many_to_database([_post("AAA", 150, 2000)])
+    after = _row_versions(temp_db)
+    assert after["AAA"] > max(before.values())
+    assert after["AAA"] == database.current_change_version()
+    assert after["BBB"] == before["BBB"]
+
+
+def test_delete_leaves_tombstone(temp_db):
+    database.save_many_to_database([_post("AAA", 100, 1000), _post("BBB", 200, 1000)])
+    version = database.current_change_version()
+
+    assert database.delete_posts_from_db(["AAA"]) == 1
+    assert _query(temp_db, "SELECT post_shortcode, row_version FROM deleted_posts") == [("AAA", version + 1)]
+    assert database.changes_since(version) == ([], ["AAA"], version + 1)
+
+
+def test_re_insert_supersedes_tombstone(temp_db):
+    database.save_many_to_database([_post("AAA", 100, 1000)])
+    before_delete = database.current_change_version()
+    database.delete_posts_from_db(["AAA"])
+    after_delete = database.current_change_version()
+
+    database.save_many_to_database([_post("AAA", 5, 2000)])
+    # A reader that saw the delete only gets the new post
+    changed_rows, deleted_shortcodes, _ = database.changes_since(after_delete)
+    assert [row[0] for row in changed_rows] == ["AAA"]
+    assert deleted_shortcodes == []
+    # One that did not gets both, to drop the old post before taking the new one
+    changed_rows, deleted_shortcodes, _ = database.changes_since(before_delete)
+    assert [row[0] for row in changed_rows] == ["AAA"]
+    assert deleted_shortcodes == ["AAA"]
+
+
+def test_changes_since_pages_rows_sharing_a_version(temp_db):
+    database.save_many_to_database([_post(shortcode, 100, 1000) for shortcode in ("AAA", "BBB", "CCC", "DDD", "EEE")])
+    # Written by another tool: three rows with the same version
+    with sqlite3.connect(temp_db) as conn:
+        conn.execute("UPDATE scraped_posts SET row_version = 3 WHERE post_shortcode IN ('BBB', 'CCC', 'DDD')")
+
+    version, seen = 0, []
+    while True:
+        changed_rows, _, version = database.changes_since(version, limit=2)
+        seen += [row[0] for row in changed_rows]
+        if len(changed_rows) < 2:
+            break
+    assert sorted(seen) == ["AAA", "BBB", "CCC", "DDD", "EEE"]
+    assert len(seen) == 5
+
+
+def _owner_totals(owner):
+    """(reel_count, total_views, median_views) from owner_stats, or None if the owner has no row."""
+    rows = database.load_owner_stats(owner)
+    return rows[0][1:4] if rows else None
+
+
+def test_owner_stats_follow_inserts_updates_and_deletes(temp_db):
+    database.save_many_to_database([
+        _post("AAA", 100, 1000),
+        _post("BBB", 300, 1000),
+        _post("CCC", 200, 1000),
+        _post("DDD", 50, 1000, owner="creator_y"),
+    ])
+    assert _owner_totals("creator_x") == (3, 600, 200)
+    assert _owner_totals("creator_y") == (1, 50, 50)
+
+    # Update: views change, and an even count takes the mean of the middle two
+    database.save_many_to_database([_post("AAA", 400, 2000), _post("EEE", 500, 2000)])
+    assert _owner_totals("creator_x") == (4, 1400, 350)
+
+    # Owner change: both owners are recomputed
+    database.save_many_to_database([_post("BBB", 300, 3000, owner="creator_y")])
+    assert _owner_totals("creator_x") == (3, 1100, 400)
+    assert _owner_totals("creator_y") == (2, 350, 175)
+
+    # Delete: the last post of an owner removes its row
+    database.delete_posts_from_db(["DDD", "BBB"])
+    assert _owner_totals("creator_y") is None
+    assert [row[0] for row in database.load_owner_stats()] == ["creator_x"]
+
+    # A write from outside this module only marks the owner; loading refreshes it
+    with sqlite3.connect(temp_db) as conn:
+        conn.execute("UPDATE scraped_posts SET views = 1000 WHERE post_shortcode = 'CCC'")
+    assert _owner_totals("creator_x") == (3, 1900, 500)
+
+
+def test_filter_matching_shortcodes_agrees_with_search(temp_db):
+    database.save_many_to_database([
+        _post("AAA", 100, 1000),
+        _post("BBB", 200, 1000, owner="other_creator"),
+        _post("CCC", 300, 1000),
+    ])
+    rows, _ = database.search_posts("creator_x")
+    assert database.filter_matching_shortcodes("creator_x", ["AAA", "BBB", "CCC", "ZZZ"]) == {row[0] for row in rows} == {"AAA", "CCC"}
@@ -0,0 +1,72 @@
+# test_importer.py
+import importer
+
+
+def _write_csv(tmp_path, text):
+    path = tmp_path / "urls.csv"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_canonicalize_post_rejects_words():
+    assert importer.canonicalize_post("hello") is None
+    assert importer.canonicalize_post("creator_x") is None
+    assert importer.canonicalize_post("C3xYz_AbC-1") == ("C3xYz_AbC-1", "https://www.instagram.com/reel/C3xYz_AbC-1/")
+    assert importer.canonicalize_post("C3xYz_AbC-1", allow_shortcode=False) is None
+    assert importer.canonicalize_post("https://m.instagram.com/someone/reel/C3xYz_AbC-1/?igsh=abc") == (
+        "C3xYz_AbC-1", "https://www.instagram.com/reel/C3xYz_AbC-1/"
+    )
+
+
+def test_detect_url_column_without_header_prefers_post_urls():
+    rows = [
+        ["creator_x", "https://www.instagram.com/p/ABCDEFG/"],
+        ["another_creator", "https://www.instagram.com/reel/C3xYz_AbC-1/"],
+    ]
+    assert importer.detect_url_column(rows) == (1, False, False)
+
+
+def test_detect_url_column_with_unrecognized_header():
+    rows = [
+        ["Title", "Video link"],
+        ["My first reel", "https://www.instagram.com/reel/C3xYz_AbC-1/"],
+    ]
+    assert importer.detect_url_column(rows) == (1, True, False)
+
+
+def test_detect_url_column_by_header():
+    assert importer.detect_url_column([["owner", "URL"], ["creator_x", "x"]]) == (1, True, False)
+    assert importer.detect_url_column([["owner", "Post Shortcode"], ["creator_x", "x"]]) == (1, True, True)
+
+
+def test_import_without_header_skips_usernames(tmp_path, temp_db):
+    path = _write_csv(tmp_path, (
+        "creator_x,https://www.instagram.com/p/ABCDEFG/\n"
+        "creator_y,https://www.instagram.com/reel/C3xYz_AbC-1/?igsh=1\n"
+        "creator_z,C3xYz_AbC-2\n" # Bare shortcodes are not accepted without a shortcode header
+    ))
+    stats = {}
+    assert list(importer.iter_import_urls(path, stats=stats)) == [
+        "https://www.instagram.com/p/ABCDEFG/",
+        "https://www.instagram.com/reel/C3xYz_AbC-1/",
+    ]
+    assert stats["invalid"] == 1
+
+
+def test_import_with_unrecognized_header(tmp_path, temp_db):
+    path = _write_csv(tmp_path, (
+        "Title,Video link\n"
+        "Hello,https://www.instagram.com/reel/C3xYz_AbC-1/\n"
+        "World,https://www.instagram.com/reel/C3xYz_AbC-1/\n"
+    ))
+    stats = {}
+    assert list(importer.iter_import_urls(path, stats=stats)) == ["https://www.instagram.com/reel/C3xYz_AbC-1/"]
+    assert stats["rows"] == 2
+    assert stats["duplicates"] == 1
+
+
+def test_import_shortcode_column(tmp_path, temp_db):
+    path = _write_csv(tmp_path, "owner,shortcode\ncreator_x,C3xYz_AbC-1\ncreator_y,hello\n")
+    stats = {}
+    assert list(importer.iter_import_urls(path, stats=stats)) == ["https://www.instagram.com/reel/C3xYz_AbC-1/"]
+    assert stats["invalid"] == 1
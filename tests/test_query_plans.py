@@ -0,0 +1,37 @@
+# test_query_plans.py
+"""
+The automated form of `python -m benchmarks.db_benchmark --check-plans`: every hot query must be
+served by its index, without a full table scan or a temporary sort.
+"""
+
+import pytest
+
+import database
+from benchmarks import db_benchmark
+
+PLAN_CHECK_ROWS = 5000 # Enough for ANALYZE statistics to steer the planner the way a real table does
+
+
+@pytest.fixture(scope="module")
+def synthetic_db(tmp_path_factory):
+    original_db_file = database.DB_FILE
+    db_benchmark.build_synthetic_database(str(tmp_path_factory.mktemp("plans") / "plans.db"), PLAN_CHECK_ROWS)
+    yield database.DB_FILE
+    database.close_connections()
+    database.DB_FILE = original_db_file
+
+
+@pytest.mark.parametrize("name", sorted(database.HOT_QUERIES))
+def test_hot_query_uses_its_index(synthetic_db, name):
+    query, expected_index = database.HOT_QUERIES[name]
+    plan = database.explain_query_plan(query, db_benchmark._hot_query_params(name))
+    # "SCAN ... USING INDEX" is allowed: load_data_from_db reads every row in index order and
+    # load_failed_posts walks a partial index. Which index is used is checked next.
+    full_scans = [detail for detail in plan if detail.startswith("SCAN") and "USING" not in detail]
+    assert not full_scans, f"{name} scans a whole table: {plan}"
+    assert any(expected_index in detail for detail in plan), f"{name} does not use {expected_index}: {plan}"
+    assert not any("USE TEMP B-TREE" in detail for detail in plan), f"{name} needs a temporary sort: {plan}"
+
+
+def test_check_query_plans_reports_no_failures(synthetic_db):
+    assert db_benchmark.check_query_plans() == []
@@ -1,8 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 import threading
+import itertools
+import queue
 import asyncio
-import csv
 import logging
 from datetime import datetime, timezone # Import timezone for UTC conversion
 import os
@@ -27,8 +28,12 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import WebDriverException, TimeoutException, NoSuchElementException, ElementClickInterceptedException
 
 
-from scraper import scrape_post_data, get_shortcode_from_url, L, USER_DATA_DIR, BROWSER_USER_DATA_DIR, CHROMEDRIVER_EXECUTABLE_PATH, CHROME_BINARY_LOCATION
-from database import setup_database, DB_FILE, load_data_from_db, save_to_database, delete_data_from_db
+from scraper import scrape_post_data, sweep_account_posts, get_shortcode_from_url, start_follow_batch, summarize_stage_timings, format_stage_timing_summary, L, USER_DATA_DIR, BROWSER_USER_DATA_DIR, CHROMEDRIVER_EXECUTABLE_PATH, CHROME_BINARY_LOCATION
+from worker_pool import ScrapeWorkerPool, WORKER_PROFILES_DIR
+from db_writer import submit_post_write, flush_writes, writer_stats, close_writer
+from exporter import export_data, format_from_path, parquet_available
+from importer import iter_import_urls
+from database import setup_database, DB_FILE, LOADED_POST_COLUMNS, normalize_post_data, load_posts_page, current_change_version, changes_since, filter_matching_shortcodes, OWNER_STATS_COLUMNS, load_owner_stats, save_changed_posts_to_database, delete_posts_from_db, search_posts
 
 
 # --- CustomTkinter Comprehensive Theme Definition ---
@@ -206,20 +211,63 @@ def resource_path(relative_path):
 
 import sys
 
-theme_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "custom_theme.json")
-try:
-    with open(theme_file_path, "w") as f:
-        json.dump(custom_theme_dict, f, indent=4)
-    logging.info(f"Custom theme saved to: {theme_file_path}")
-except Exception as e:
-    logging.error(f"Error saving custom theme JSON file: {e}. Falling back to default 'blue' theme.", exc_info=True)
-    theme_file_path = "blue"
+THEME_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "custom_theme.json")
+
+
+def save_custom_theme():
+    """
+    Writes the custom theme to THEME_FILE_PATH and returns the theme to load ("blue" if it could
+    not be saved). Called when the app window is created, not at import, so processes that only
+    import this module (e.g. spawned scrape workers) never rewrite the file.
+    """
+    try:
+        with open(THEME_FILE_PATH, "w") as f:
+            json.dump(custom_theme_dict, f, indent=4)
+        logging.info(f"Custom theme saved to: {THEME_FILE_PATH}")
+        return THEME_FILE_PATH
+    except Exception as e:
+        logging.error(f"Error saving custom theme JSON file: {e}. Falling back to default 'blue' theme.", exc_info=True)
+        return "blue"
+
+# Stored records are loaded into the table one keyset page at a time, so the first page shows immediately
+UI_DB_PAGE_SIZE = 500 # rows
+UI_DB_PAGE_INTERVAL_MS = 10 # Pause between pages so the UI stays responsive while the rest loads
+UI_DB_SYNC_INTERVAL_MS = 5000 # How often the table pulls changes made to the database since its last sync
+UI_DB_SYNC_MAX_ROWS = 1000 # Changed rows read and applied per step; a larger backlog is applied over several UI ticks
+# The filter box searches the database's full-text index once typing pauses
+UI_SEARCH_DEBOUNCE_MS = 250
+UI_SEARCH_MIN_CHARS = 2 # Shorter filters would match nearly every record
+UI_SEARCH_PAGE_SIZE = 200 # Matches fetched per page; more load as the table is scrolled to the end
+# Worker threads never touch widgets: they queue row updates, statuses and calls, which the Tk loop applies on this tick
+UI_UPDATE_TICK_MS = 50
+UI_UPDATE_MAX_PER_TICK = 2000 # Queued updates applied per tick, so a burst cannot stall the UI
+
+
+def format_cell_for_display(col_name, value):
+    """
+    Formats a typed row value (see database.normalize_post_data) for the table and owner summary.
+    Rows stay typed in memory; only what is shown is turned into text.
+    """
+    if value is None or value == "":
+        return "N/A"
+    if col_name in ("engagement_rate", "avg_engagement_rate") and isinstance(value, (int, float)):
+        return f"{value:.2f}%"
+    if col_name == "median_views" and isinstance(value, float):
+        return round(value)
+    if col_name in ("post_date", "last_record", "last_refresh") and isinstance(value, (int, float)):
+        if value <= 0:
+            return "N/A"
+        # Post dates are UTC publish times; last_record is when this machine scraped the post
+        if col_name == "post_date":
+            return datetime.fromtimestamp(value, tz=timezone.utc).strftime("%Y-%m-%d")
+        return datetime.fromtimestamp(value).strftime("%Y-%m-%d")
+    return value
 
 
 class InstagramScraperApp:
     def __init__(self, root_window, logged_in_username=None):
         ctk.set_appearance_mode("Light")
-        ctk.set_default_color_theme(theme_file_path)
+        ctk.set_default_color_theme(save_custom_theme())
 
         self.root = root_window
         self.root.title("Instagram Post Analyzer")
@@ -238,11 +286,29 @@ class InstagramScraperApp:
 
 
         self.scraped_data_for_table = [] # Stores data as list of dicts
+        self.rows_by_shortcode = {} # The same row dicts by shortcode, which is also each row's Treeview item id
         self.manual_login_driver = None  # Initialize to None
         
         # Initialize sorting state
         self.sort_column = None
         self.sort_reverse = False
+        self._db_load_generation = 0 # Bumped on every reload so a superseded page loader stops
+        self._db_loading = False
+        self._synced_change_version = 0 # Database change counter the table is up to date with
+        self._db_sync_pending = False # A changes_since read is queued or running on the sync thread
+        self._db_sync_requests = queue.Queue() # (load generation, version, filter text)
+        # Live filter: while _search_text is set the table shows search_results instead of every record
+        self._search_text = ""
+        self.search_results = []
+        self._search_next_after = None # Keyset position of the next page of matches; None when all are shown
+        self._search_generation = 0 # Bumped per search so results of a superseded one are dropped
+        self._search_after_id = None # Pending debounced search
+        self._search_loading_more = False
+        # One long-lived search thread (and so one reader connection) serves every search; see _run_search_worker
+        self._search_requests = queue.Queue() # (generation, search_text, after)
+        self._ui_updates = queue.Queue() # ("status", message) | ("rows", [row dicts]) | ("call", function, args, kwargs)
+        threading.Thread(target=self._run_search_worker, name="SearchWorker", daemon=True).start()
+        threading.Thread(target=self._run_db_sync_worker, name="DbSyncWorker", daemon=True).start()
 
         self._setup_ui()
         
@@ -257,6 +323,8 @@ class InstagramScraperApp:
             self.set_status("Ready. Not logged in to Instaloader (anonymous scraping will be limited).")
             
         self._load_data_from_db_into_ui()
+        self.root.after(UI_DB_SYNC_INTERVAL_MS, self._sync_changes_from_db)
+        self.root.after(UI_UPDATE_TICK_MS, self._drain_ui_updates)
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
         self.is_batch_scraping = False
         
@@ -341,72 +409,38 @@ class InstagramScraperApp:
 
         if messagebox.askyesno("Exit", "Are you sure you want to exit?", parent=self.root):
             logging.info("Application exiting by user confirmation.")
+            close_writer() # Commit results still queued for the database
             self.root.destroy()
 
     def _load_data_from_db_into_ui(self):
         self.set_status("Loading previous records from database...")
+        # Clear in-memory data and treeview before loading from DB
+        self.scraped_data_for_table.clear()
+        self.rows_by_shortcode.clear()
+        self.tree.delete(*self.tree.get_children())
+        # Taken before the first page: anything changed while pages load is pulled by the next sync
+        self._synced_change_version = current_change_version()
+        self._db_loading = True
+        self._db_load_generation += 1
+        self._load_next_db_page(self._db_load_generation, None)
+
+    def _load_next_db_page(self, generation, after):
+        """Appends one keyset page of stored records to the table and schedules the next page."""
+        if generation != self._db_load_generation:
+            return # A newer reload has started
         try:
-            # Clear in-memory data and treeview before loading from DB
-            self.scraped_data_for_table.clear()
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-
-            rows = load_data_from_db()
-            # This db_columns list MUST match the SELECT statement order in database.py's load_data_from_db
-            db_columns_order = [
-                "post_shortcode", "link", "post_date", "last_record",
-                "owner", "likes", "comments", "views", "engagement_rate", "error" 
-            ]
-
+            rows, next_after = load_posts_page(after, UI_DB_PAGE_SIZE)
             for row_tuple in rows:
-                row_dict = {}
-                for j, col_name in enumerate(db_columns_order):
-                    if j < len(row_tuple):
-                        row_dict[col_name] = row_tuple[j]
-                    else:
-                        row_dict[col_name] = None 
-                
-                # Format dates to date-only strings
-                # Use str() around row_dict["post_date"] to handle potential non-string types from DB
-                if row_dict.get("post_date") and row_dict["post_date"] != "N/A":
-                    try:
-                        dt_obj = datetime.strptime(str(row_dict["post_date"]).split(" ")[0], "%Y-%m-%d")
-                        row_dict["post_date"] = dt_obj.strftime("%Y-%m-%d")
-                    except (ValueError, TypeError):
-                        logging.warning(f"Failed to parse post_date from DB: {row_dict.get('post_date')}")
-                        row_dict["post_date"] = "N/A" # Set to N/A if cannot parse
-
-                if row_dict.get("last_record") and row_dict["last_record"] != "N/A":
-                    try:
-                        # Ensure last_record is also parsed as date only for display
-                        dt_obj = datetime.strptime(str(row_dict["last_record"]).split(" ")[0], "%Y-%m-%d")
-                        row_dict["last_record"] = dt_obj.strftime("%Y-%m-%d")
-                    except (ValueError, TypeError):
-                        logging.warning(f"Failed to parse last_record from DB: {row_dict.get('last_record')}")
-                        row_dict["last_record"] = "N/A" # Set to N/A if cannot parse
-
-
-                # Explicitly map data to the display columns expected by self.columns
-                # This ensures the order is correct for the Treeview display
-                post_data_gui = {
-                    "link": row_dict.get("link", "N/A"),
-                    "post_date": row_dict.get("post_date", "N/A"),
-                    "last_record": row_dict.get("last_record", "N/A"),
-                    "owner": row_dict.get("owner", "N/A"),
-                    "likes": row_dict.get("likes", "N/A"),
-                    "comments": row_dict.get("comments", "N/A"),
-                    "views": row_dict.get("views", "N/A"),
-                    "engagement_rate": row_dict.get("engagement_rate", "N/A"),
-                    "error": row_dict.get("error", None), # Load error status
-                    "post_shortcode": row_dict.get("post_shortcode", get_shortcode_from_url(row_dict.get("link", ""))) # Load shortcode
-                }
-                
+                # Values are already typed (ints, floats, epoch seconds, None); display formatting happens in _insert_tree_row
+                post_data_gui = dict(zip(LOADED_POST_COLUMNS, row_tuple))
+                if not post_data_gui.get("post_shortcode"):
+                    post_data_gui["post_shortcode"] = get_shortcode_from_url(post_data_gui.get("link") or "")
+                if post_data_gui["post_shortcode"] in self.rows_by_shortcode:
+                    continue # A scrape added this post while the pages loaded; the table already holds the newer row
                 self.scraped_data_for_table.append(post_data_gui)
-            
-            self._refresh_table_display()
-
-            self.set_status(f"{len(rows)} records loaded. Ready.")
-            logging.info(f"{len(rows)} records loaded from database.")
+                self.rows_by_shortcode[post_data_gui["post_shortcode"]] = post_data_gui
+                if not self._search_text:
+                    self._insert_tree_row(post_data_gui)
         except Exception as e:
             if "no such column" in str(e).lower():
                 msg = (
@@ -418,6 +452,245 @@ class InstagramScraperApp:
             else:
                 self.set_status(f"Error loading data from database: {e}. Ready.")
                 logging.error(f"Error loading data from database: {e}", exc_info=True)
+            self._db_loading = False
+            return
+
+        if next_after is not None:
+            self.set_status(f"Loading previous records from database... {len(self.scraped_data_for_table)} so far")
+            self.root.after(UI_DB_PAGE_INTERVAL_MS, self._load_next_db_page, generation, next_after)
+            return
+        self._db_loading = False
+        if self.sort_column:
+            self._apply_sort() # Pages arrived in database order; restore the sort chosen meanwhile
+        self.set_status(f"{len(self.scraped_data_for_table)} records loaded. Ready.")
+        logging.info(f"{len(self.scraped_data_for_table)} records loaded from database.")
+
+    def _sync_changes_from_db(self):
+        """
+        Periodically asks the sync thread for the rows changed or deleted in the database since the
+        last sync (by any thread or process); _apply_synced_changes merges them into the table.
+        """
+        try:
+            self._request_db_sync()
+        finally:
+            self.root.after(UI_DB_SYNC_INTERVAL_MS, self._sync_changes_from_db)
+
+    def _request_db_sync(self):
+        if not self._db_loading and not self._db_sync_pending:
+            self._db_sync_pending = True
+            self._db_sync_requests.put((self._db_load_generation, self._synced_change_version, self._search_text))
+
+    def _run_db_sync_worker(self):
+        """
+        Sync thread: reads changes off the Tk thread, at most UI_DB_SYNC_MAX_ROWS per request. While a
+        filter is active it also finds which changed rows match it, so the search need not run again.
+        """
+        while True:
+            generation, version, search_text = self._db_sync_requests.get()
+            matching_shortcodes = None
+            try:
+                changes = changes_since(version, limit=UI_DB_SYNC_MAX_ROWS)
+                if changes is not None:
+                    changed_rows, deleted_shortcodes, new_version = changes
+                    # Rows become dicts here, so the Tk thread only merges them
+                    changes = ([dict(zip(LOADED_POST_COLUMNS, row_tuple)) for row_tuple in changed_rows], deleted_shortcodes, new_version)
+                    if search_text and changed_rows:
+                        matching_shortcodes = filter_matching_shortcodes(search_text, [row_tuple[0] for row_tuple in changed_rows])
+            except Exception as e:
+                logging.error(f"Error reading database changes since version {version}: {e}", exc_info=True)
+                changes = None
+            self._post_to_ui(self._apply_synced_changes, generation, version, changes, search_text, matching_shortcodes)
+
+    def _apply_synced_changes(self, generation, version, changes, search_text, matching_shortcodes):
+        self._db_sync_pending = False
+        if changes is None or self._db_loading or (generation, version) != (self._db_load_generation, self._synced_change_version):
+            return # Unreadable, or the table was reloaded meanwhile
+        changed_rows, deleted_shortcodes, self._synced_change_version = changes
+        if search_text != self._search_text:
+            matching_shortcodes = None # Matched against a filter that has changed since
+        if changed_rows or deleted_shortcodes:
+            self._apply_db_changes(changed_rows, deleted_shortcodes, matching_shortcodes)
+        if len(changed_rows) >= UI_DB_SYNC_MAX_ROWS:
+            self._request_db_sync() # More changes are waiting; the next chunk follows on a later tick
+
+    def _apply_db_changes(self, changed_rows, deleted_shortcodes, matching_shortcodes=None):
+        """
+        Merges changed row dicts and removes deleted posts (Tk thread only). While a filter is active,
+        matching_shortcodes (the changed rows that match it) decides which rows join or leave the
+        matches; without it the filter's rows are only redrawn in place.
+        """
+        if deleted_shortcodes:
+            self._remove_rows(deleted_shortcodes)
+
+        changed_shortcodes = []
+        for post_data_gui in changed_rows:
+            shortcode = post_data_gui["post_shortcode"]
+            existing = self.rows_by_shortcode.get(shortcode)
+            if existing is None:
+                self._add_row(post_data_gui)
+                changed_shortcodes.append(shortcode)
+                continue
+            # The app's own writes are usually in the table already; only a real difference needs a redraw
+            if any(existing.get(key) != value for key, value in post_data_gui.items() if key != "row_version"):
+                changed_shortcodes.append(shortcode)
+            existing.update(post_data_gui)
+
+        if self._search_text and matching_shortcodes is not None:
+            # The app's own scrapes are merged before they reach the database, so membership is
+            # checked for every changed row, not just the ones that differ here
+            changed_shortcodes += self._update_search_matches([row["post_shortcode"] for row in changed_rows], matching_shortcodes)
+        if changed_shortcodes:
+            self._show_table_rows(changed_shortcodes)
+            if self.sort_column:
+                self._apply_sort()
+
+    def _update_search_matches(self, shortcodes, matching_shortcodes):
+        """
+        Adds the rows among shortcodes that now match the filter to its matches (newest on top) and drops
+        the ones that no longer do. Returns the shortcodes whose membership changed.
+        """
+        shown = {post_data["post_shortcode"] for post_data in self.search_results}
+        left = {shortcode for shortcode in shortcodes if shortcode in shown and shortcode not in matching_shortcodes}
+        joined = [shortcode for shortcode in dict.fromkeys(shortcodes) if shortcode in matching_shortcodes and shortcode not in shown]
+        if left:
+            self.search_results = [post_data for post_data in self.search_results if post_data["post_shortcode"] not in left]
+            shown_items = [shortcode for shortcode in left if self.tree.exists(shortcode)]
+            if shown_items:
+                self.tree.delete(*shown_items)
+        for shortcode in joined: # Change order, so the most recently changed row ends up first
+            post_data = self.rows_by_shortcode[shortcode]
+            self.search_results.insert(0, post_data)
+            self._insert_tree_row(post_data, index=0)
+        return list(left) + joined
+
+    def _add_row(self, post_data):
+        """Appends a new row to the in-memory table (the Treeview item is added by _show_table_rows)."""
+        self.scraped_data_for_table.append(post_data)
+        self.rows_by_shortcode[post_data["post_shortcode"]] = post_data
+
+    def _remove_rows(self, shortcodes):
+        """Drops rows from the in-memory table and deletes only their Treeview items."""
+        removed = set(shortcodes)
+        self.scraped_data_for_table = [item for item in self.scraped_data_for_table if item.get("post_shortcode") not in removed]
+        self.search_results = [item for item in self.search_results if item.get("post_shortcode") not in removed]
+        for shortcode in removed:
+            self.rows_by_shortcode.pop(shortcode, None)
+        shown_items = [shortcode for shortcode in removed if self.tree.exists(shortcode)]
+        if shown_items:
+            self.tree.delete(*shown_items)
+
+    def _show_table_rows(self, shortcodes):
+        """Redraws the Treeview items of these rows in place; rows not shown yet are appended unless a filter is active."""
+        for shortcode in shortcodes:
+            post_data = self.rows_by_shortcode.get(shortcode)
+            if post_data is None:
+                continue
+            if self.tree.exists(shortcode):
+                values, tags = self._tree_row_values(post_data)
+                self.tree.item(shortcode, values=values, tags=tags)
+            elif not self._search_text:
+                self._insert_tree_row(post_data)
+
+    def _row_from_db(self, row_tuple):
+        # The in-memory row of a post may hold a newer scrape still queued for the database writer
+        return self.rows_by_shortcode.get(row_tuple[0]) or dict(zip(LOADED_POST_COLUMNS, row_tuple))
+
+    def _on_search_key_release(self, event=None):
+        # Debounced: only the text present once typing pauses is searched
+        if self._search_after_id is not None:
+            self.root.after_cancel(self._search_after_id)
+        self._search_after_id = self.root.after(UI_SEARCH_DEBOUNCE_MS, self._on_search_text_settled)
+
+    def _on_search_text_settled(self):
+        self._search_after_id = None
+        search_text = self.search_entry.get().strip()
+        if len(search_text) < UI_SEARCH_MIN_CHARS:
+            search_text = ""
+        if search_text == self._search_text:
+            return
+        if not search_text:
+            self._search_text = ""
+            self._search_generation += 1 # Drops any search still running
+            self.search_results = []
+            self._search_next_after = None
+            self._refresh_table_display()
+            self.set_status(f"Filter cleared. {len(self.scraped_data_for_table)} records.")
+            return
+        self._start_search(search_text)
+
+    def _start_search(self, search_text):
+        """Queues the first page of matches for the search thread."""
+        self._search_text = search_text
+        self._search_generation += 1
+        self._search_loading_more = False
+        self._search_requests.put((self._search_generation, search_text, None))
+
+    def _run_search_worker(self):
+        """
+        Search thread: runs queued search_posts calls one at a time, never on the Tk thread, and
+        hands the rows back through the UI queue. Requests superseded by a newer one are skipped.
+        """
+        while True:
+            request = self._search_requests.get()
+            while not self._search_requests.empty(): # Only the latest filter is worth running
+                request = self._search_requests.get_nowait()
+            generation, search_text, after = request
+            started = time.perf_counter()
+            try:
+                rows, next_after = search_posts(search_text, after, UI_SEARCH_PAGE_SIZE)
+            except Exception as e:
+                logging.error(f"Error searching for '{search_text}': {e}", exc_info=True)
+                rows, next_after = [], None
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if after is None:
+                self._post_to_ui(self._show_search_results, generation, rows, next_after, elapsed_ms)
+            else:
+                self._post_to_ui(self._show_more_search_results, generation, rows, next_after)
+
+    def _show_search_results(self, generation, rows, next_after, elapsed_ms):
+        if generation != self._search_generation:
+            return # The filter changed while this search ran
+        self.search_results = [self._row_from_db(row_tuple) for row_tuple in rows]
+        self._search_next_after = next_after
+        if self.sort_column:
+            self._apply_sort()
+        else:
+            self._refresh_table_display()
+        more = "+" if next_after is not None else ""
+        self.set_status(f"{len(self.search_results)}{more} matches for '{self._search_text}' ({elapsed_ms:.0f} ms).")
+
+    def _on_tree_scrolled(self, first, last):
+        self.vsb.set(first, last)
+        # Scrolled to the end of a filtered table with more matches waiting: fetch the next page
+        if self._search_text and self._search_next_after is not None and not self._search_loading_more and float(last) >= 0.98:
+            self._search_loading_more = True
+            self.root.after_idle(self._load_more_search_results, self._search_generation)
+
+    def _load_more_search_results(self, generation):
+        if generation != self._search_generation:
+            return
+        self._search_requests.put((generation, self._search_text, self._search_next_after))
+
+    def _show_more_search_results(self, generation, rows, next_after):
+        if generation != self._search_generation:
+            return # The filter changed while this page loaded
+        self._search_next_after = next_after
+        shown_shortcodes = {post_data["post_shortcode"] for post_data in self.search_results}
+        # A post updated since the previous page can show up again; it is already in the table
+        page = [self._row_from_db(row_tuple) for row_tuple in rows if row_tuple[0] not in shown_shortcodes]
+        self.search_results.extend(page)
+        if self.sort_column:
+            self._apply_sort()
+        else:
+            for post_data in page:
+                self._insert_tree_row(post_data)
+        more = "+" if self._search_next_after is not None else ""
+        self.set_status(f"{len(self.search_results)}{more} matches for '{self._search_text}'.")
+        self._search_loading_more = False
+
+    def _displayed_rows(self):
+        """The rows the table currently shows: the filter's matches, or every record."""
+        return self.search_results if self._search_text else self.scraped_data_for_table
 
     def _setup_ui(self):
         main_frame = ctk.CTkFrame(self.root, fg_color="transparent") 
@@ -444,6 +717,13 @@ class InstagramScraperApp:
         self.logout_instaloader_button.pack(side=tk.RIGHT)
 
 
+        search_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        search_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+        ctk.CTkLabel(search_frame, text="Filter:").pack(side=tk.LEFT, padx=(0, 5))
+        self.search_entry = ctk.CTkEntry(search_frame, placeholder_text="Owner, link, shortcode or error")
+        self.search_entry.pack(side=tk.LEFT, expand=True, fill=tk.X, padx=5)
+        self.search_entry.bind("<KeyRelease>", self._on_search_key_release)
+
         table_frame = ctk.CTkFrame(main_frame, fg_color="transparent") 
         table_frame.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
         
@@ -499,9 +779,9 @@ class InstagramScraperApp:
 
         self.tree.grid(row=0, column=0, sticky="nsew")
 
-        vsb = ctk.CTkScrollbar(table_frame, command=self.tree.yview, orientation="vertical", width=8)
-        vsb.grid(row=0, column=1, sticky="ns") 
-        self.tree.configure(yscrollcommand=vsb.set)
+        self.vsb = ctk.CTkScrollbar(table_frame, command=self.tree.yview, orientation="vertical", width=8)
+        self.vsb.grid(row=0, column=1, sticky="ns") 
+        self.tree.configure(yscrollcommand=self._on_tree_scrolled)
 
         input_frame = ctk.CTkFrame(main_frame, fg_color="transparent") 
         input_frame.pack(fill=tk.X, side=tk.BOTTOM, padx=5, pady=5) 
@@ -526,6 +806,11 @@ class InstagramScraperApp:
         )
         self.batch_scrape_button.pack(side=tk.LEFT, padx=5)
 
+        self.track_account_button = ctk.CTkButton(
+            other_buttons_frame, text="Track Account", command=self.on_track_account_button_press
+        )
+        self.track_account_button.pack(side=tk.LEFT, padx=5)
+
         self.update_selected_button = ctk.CTkButton(
             other_buttons_frame, text="Update Data", command=self.on_update_selected
         )
@@ -537,10 +822,15 @@ class InstagramScraperApp:
         self.delete_selected_button.pack(side=tk.LEFT, padx=5)
 
         self.export_button = ctk.CTkButton( 
-            other_buttons_frame, text="Export CSV", command=self.export_to_csv
+            other_buttons_frame, text="Export", command=self.on_export_button_press
         )
         self.export_button.pack(side=tk.LEFT, padx=5)
 
+        self.owner_summary_button = ctk.CTkButton(
+            other_buttons_frame, text="Owner Summary", command=self.on_owner_summary_button_press
+        )
+        self.owner_summary_button.pack(side=tk.LEFT, padx=5)
+
         # Logout button moved to top_right_frame, so remove from here
         # self.logout_instaloader_button = ctk.CTkButton(
         #     other_buttons_frame, text="Logout Instaloader", command=self.on_logout_instaloader
@@ -569,9 +859,54 @@ class InstagramScraperApp:
 
     def set_status_from_thread(self, message):
         """
-        Updates the status using a temporary, non-blocking overlay notification from a thread.
+        Updates the status from a worker thread. Queued: only the latest status of each UI tick is shown.
         """
-        self.root.after(0, lambda: self._show_temp_notification(message))
+        self._ui_updates.put(("status", message))
+
+    def _queue_rows(self, rows):
+        """Queues typed row dicts (from a worker thread) to be merged into the table on the next UI tick."""
+        if rows:
+            self._ui_updates.put(("rows", rows))
+
+    def _post_to_ui(self, function, *args, **kwargs):
+        """Runs function(*args, **kwargs) on the Tk thread at the next UI tick, after the updates queued before it."""
+        self._ui_updates.put(("call", function, args, kwargs))
+
+    def _drain_ui_updates(self):
+        """
+        Applies what worker threads queued since the last tick: rows are merged and their Treeview
+        items redrawn once per tick, only the latest status is shown, and calls run in order.
+        """
+        latest_status = None
+        shortcodes_to_show = {} # Ordered, and each row is redrawn once however often it was updated
+        try:
+            for _ in range(UI_UPDATE_MAX_PER_TICK):
+                try:
+                    update = self._ui_updates.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    if update[0] == "status":
+                        latest_status = update[1]
+                    elif update[0] == "rows":
+                        for post_data in update[1]:
+                            self._merge_row(post_data)
+                            shortcodes_to_show[post_data["post_shortcode"]] = None
+                    else:
+                        if shortcodes_to_show:
+                            self._show_table_rows(list(shortcodes_to_show)) # The call may rely on the rows queued before it
+                            shortcodes_to_show.clear()
+                        update[1](*update[2], **update[3])
+                except Exception as e:
+                    logging.error(f"Error applying queued UI update ({update[0]}): {e}", exc_info=True)
+            if shortcodes_to_show:
+                self._show_table_rows(list(shortcodes_to_show))
+            if latest_status is not None:
+                self._show_temp_notification(latest_status)
+        except Exception as e:
+            logging.error(f"Error draining UI updates: {e}", exc_info=True)
+        finally:
+            self.root.after(UI_UPDATE_TICK_MS, self._drain_ui_updates)
 
     def _show_temp_notification(self, message, duration_ms=3000):
         """
@@ -693,6 +1028,30 @@ class InstagramScraperApp:
         thread.daemon = True
         thread.start()
 
+    def on_track_account_button_press(self):
+        if self.is_batch_scraping:
+            self.set_status("Batch scraping already in progress.")
+            return
+
+        owner_username = simpledialog.askstring(
+            "Track Account", "Instagram username to sweep (all reels):", parent=self.root
+        )
+        owner_username = (owner_username or "").strip().lstrip("@")
+        if not owner_username:
+            self.set_status("Account sweep cancelled. No username entered.")
+            return
+
+        self.is_batch_scraping = True
+        self._set_buttons_state(tk.DISABLED)
+        self._show_blocking_overlay(f"Sweeping {owner_username}'s Reels...")
+        logging.info(f"Account sweep initiated for {owner_username}.")
+
+        thread = threading.Thread(
+            target=self._run_account_sweep_in_thread, args=(owner_username,)
+        )
+        thread.daemon = True
+        thread.start()
+
     def on_update_selected(self):
         selections = list(self.tree.selection())
         if not selections:
@@ -732,60 +1091,83 @@ class InstagramScraperApp:
             messagebox.showerror("Selection Error", "Select one or more items to delete.", parent=self.root)
             return
 
-        links_to_delete = []
-        for sel in selections:
-            try:
-                item_data = self._get_item_data_from_tree_selection(sel)
-                if item_data and "link" in item_data:
-                    links_to_delete.append(item_data["link"])
-            except Exception as ex:
-                logging.error(f"Error retrieving tree item for deletion: {ex}", exc_info=True)
-                self.set_status(f"Error preparing deletion: {ex}")
+        shortcodes_to_delete = set(selections) # Treeview item ids are the posts' shortcodes
 
-        if not links_to_delete:
+        if not shortcodes_to_delete:
             messagebox.showwarning("Delete Warning", "No valid items selected for deletion.", parent=self.root)
             return
 
-        self.set_status(f"Deleting {len(links_to_delete)} selected posts...")
-        logging.info(f"Deletion initiated for {len(links_to_delete)} posts.")
+        self.set_status(f"Deleting {len(shortcodes_to_delete)} selected posts...")
+        logging.info(f"Deletion initiated for {len(shortcodes_to_delete)} posts.")
+
+        # Remove from the in-memory table first, in a single pass, and delete only the selected items
+        self._remove_rows(shortcodes_to_delete)
 
         def delete_task():
             try:
-                for link in links_to_delete:
-                    # Remove from in-memory list first
-                    self.scraped_data_for_table = [item for item in self.scraped_data_for_table if item.get("link") != link]
-                    delete_data_from_db(link) # Call the database function to delete
-                self.root.after(0, self._refresh_table_display) # Refresh UI from updated in-memory list
-                self.root.after(0, lambda: self.set_status(f"Deleted {len(links_to_delete)} items. Table refreshed."))
-                logging.info(f"Successfully deleted {len(links_to_delete)} items.")
+                deleted_count = delete_posts_from_db(shortcodes_to_delete) # One transaction for the whole selection
+                self.set_status_from_thread(f"Deleted {deleted_count} items. Table refreshed.")
+                logging.info(f"Successfully deleted {deleted_count} items.")
             except Exception as e:
-                self.root.after(0, lambda: self.set_status(f"Error during deletion: {e}"))
+                self.set_status_from_thread(f"Error during deletion: {e}")
                 logging.error(f"Error during deletion: {e}", exc_info=True)
             finally:
-                self.root.after(0, self._set_buttons_state, tk.NORMAL)
+                self._post_to_ui(self._set_buttons_state, tk.NORMAL)
         
         self._set_buttons_state(tk.DISABLED)
         threading.Thread(target=delete_task, daemon=True).start()
     
+    def on_owner_summary_button_press(self):
+        """Shows per-owner totals from the owner_stats rollup table, loaded off the Tk thread."""
+        def load_task():
+            # Refreshing dirty owners first takes the writer connection, which a running scrape may hold
+            owner_rows = None
+            try:
+                owner_rows = load_owner_stats()
+            except Exception as e:
+                self.set_status_from_thread(f"Error loading owner summary: {e}")
+                logging.error(f"Error loading owner summary: {e}", exc_info=True)
+            finally:
+                self._post_to_ui(self._show_owner_summary, owner_rows)
+
+        self.owner_summary_button.configure(state=tk.DISABLED)
+        self.set_status("Loading owner summary...")
+        threading.Thread(target=load_task, name="OwnerSummaryLoader", daemon=True).start()
+
+    def _show_owner_summary(self, owner_rows):
+        """Builds the Owner Summary window (Tk thread only); owner_rows is None if loading failed."""
+        self.owner_summary_button.configure(state=tk.NORMAL)
+        if owner_rows is None:
+            return
+        if not owner_rows:
+            messagebox.showinfo("No Data", "There are no records with a known owner yet.", parent=self.root)
+            return
+
+        summary_window = ctk.CTkToplevel(self.root)
+        summary_window.title("Owner Summary")
+        summary_window.geometry("800x400")
+        summary_window.transient(self.root)
+
+        summary_tree = ttk.Treeview(summary_window, columns=OWNER_STATS_COLUMNS, show="headings")
+        for col in OWNER_STATS_COLUMNS:
+            summary_tree.heading(col, text=col.replace("_", " ").title())
+            summary_tree.column(col, width=120, anchor=tk.W if col == "owner" else tk.E)
+        for owner_row in owner_rows:
+            summary_tree.insert("", tk.END, values=[format_cell_for_display(col, value) for col, value in zip(OWNER_STATS_COLUMNS, owner_row)])
+
+        summary_scrollbar = ctk.CTkScrollbar(summary_window, command=summary_tree.yview, orientation="vertical", width=8)
+        summary_tree.configure(yscrollcommand=summary_scrollbar.set)
+        summary_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        summary_tree.pack(expand=True, fill=tk.BOTH, padx=5, pady=5)
+        self.set_status(f"Owner summary: {len(owner_rows)} owners.")
+
     def _get_item_data_from_tree_selection(self, item_id):
-        """Helper to get the full dictionary for a selected treeview item."""
-        # Get the values from the treeview row
-        values = self.tree.item(item_id, 'values')
-        if not values:
-            return None
-        
-        # Map the values back to a dictionary based on self.columns order
-        # This mapping is sufficient to find the corresponding full data_entry
-        item_dict_from_display = {self.columns[i]: values[i] for i in range(len(self.columns))}
-        
-        # Now, find the full data entry in self.scraped_data_for_table using the link
-        link_from_tree = item_dict_from_display.get("link")
-        if link_from_tree:
-            for data_entry in self.scraped_data_for_table:
-                # Use get_shortcode_from_url for robust comparison
-                if get_shortcode_from_url(data_entry.get("link", "")) == get_shortcode_from_url(link_from_tree):
-                    return data_entry
-        return None
+        """Helper to get the full dictionary for a selected treeview item (item ids are shortcodes)."""
+        data_entry = self.rows_by_shortcode.get(item_id)
+        if data_entry is None and self._search_text:
+            # A match the in-memory table does not hold (yet)
+            data_entry = next((row for row in self.search_results if row.get("post_shortcode") == item_id), None)
+        return data_entry
 
 
     def on_logout_instaloader(self):
@@ -842,6 +1224,10 @@ class InstagramScraperApp:
                 logging.info(f"Recreated empty browser user data directory: {BROWSER_USER_DATA_DIR}")
             else:
                 logging.warning(f"Browser user data directory not found: {BROWSER_USER_DATA_DIR}")
+            # Scrape workers run on copies of the browser profile, which hold the same cookies
+            if os.path.exists(WORKER_PROFILES_DIR):
+                shutil.rmtree(WORKER_PROFILES_DIR)
+                logging.info(f"Scrape worker browser profiles removed: {WORKER_PROFILES_DIR}")
         except Exception as e:
             self.set_status(f"Error clearing browser user data: {e}")
             logging.error(f"Error removing browser user data directory: {e}", exc_info=True)
@@ -855,74 +1241,131 @@ class InstagramScraperApp:
 
 
     def _run_batch_scrape_in_thread(self, filepath=None, urls_to_scrape_list=None):
-        urls_to_scrape = []
+        import_stats = None
         if urls_to_scrape_list:
-            urls_to_scrape = urls_to_scrape_list
-            source_desc = f"{len(urls_to_scrape)} selected URLs"
+            urls_to_scrape = iter(urls_to_scrape_list)
+            total_desc = str(len(urls_to_scrape_list))
+            source_desc = f"{len(urls_to_scrape_list)} selected URLs"
         elif filepath:
-            try:
-                with open(filepath, 'r', newline='', encoding='utf-8') as csvfile:
-                    reader = csv.reader(csvfile)
-                    for i, row in enumerate(reader):
-                        if i == 0 and len(row) > 0 and row[0].strip().lower() == 'url':
-                            continue
-                        if row:
-                            url = row[0].strip()
-                            if url:
-                                urls_to_scrape.append(url)
-                source_desc = f"CSV file: {filepath}"
-            except FileNotFoundError:
-                self.set_status_from_thread(f"Error: CSV file not found at {filepath}")
-                logging.error(f"CSV file not found: {filepath}", exc_info=True)
-                self.is_batch_scraping = False
-                self._set_buttons_state(tk.NORMAL)
-                self._hide_blocking_overlay()
-                return
-            except Exception as e:
-                self.set_status_from_thread(f"Error reading CSV file: {e}")
-                logging.error(f"Error reading CSV from {filepath}: {e}", exc_info=True)
-                self.is_batch_scraping = False
-                self._set_buttons_state(tk.NORMAL)
-                self._hide_blocking_overlay()
-                return
+            # Streamed: the file is read chunk by chunk as the worker pool asks for jobs,
+            # and only posts that are new, stale or failed are scraped
+            import_stats = {}
+            urls_to_scrape = iter_import_urls(filepath, stats=import_stats)
+            total_desc = "?"
+            source_desc = f"CSV file: {filepath}"
         else:
             self.set_status_from_thread("Error: No URLs provided for batch scrape.")
             self.is_batch_scraping = False
-            self._set_buttons_state(tk.NORMAL)
-            self._hide_blocking_overlay()
+            self._post_to_ui(self._set_buttons_state, tk.NORMAL)
+            self._post_to_ui(self._hide_blocking_overlay)
             return
 
 
-        if not urls_to_scrape:
-            self.set_status_from_thread(f"No URLs found to scrape from {source_desc}.")
+        try:
+            first_url = next(urls_to_scrape, None) # Reads the first chunk of a CSV import
+        except Exception as e:
+            self.set_status_from_thread(f"Error reading CSV file: {e}")
+            logging.error(f"Error reading URLs from {source_desc}: {e}", exc_info=True)
+            first_url = None
+        if first_url is None:
+            if import_stats is not None and import_stats.get("rows"):
+                self.set_status_from_thread(
+                    f"Nothing to scrape from {source_desc}: {import_stats['rows']} rows, "
+                    f"{import_stats['skipped']} already up to date, {import_stats['invalid']} invalid."
+                )
+            else:
+                self.set_status_from_thread(f"No URLs found to scrape from {source_desc}.")
             self.is_batch_scraping = False
-            self._set_buttons_state(tk.NORMAL)
-            self._hide_blocking_overlay()
+            self._post_to_ui(self._set_buttons_state, tk.NORMAL)
+            self._post_to_ui(self._hide_blocking_overlay)
             return
-
-        self.set_status_from_thread(f"Starting batch scrape from {source_desc}. Found {len(urls_to_scrape)} URLs...")
-        logging.info(f"Batch scrape initiated from {source_desc}. Found {len(urls_to_scrape)} URLs.")
-
-        for i, url in enumerate(urls_to_scrape):
-            self.set_status_from_thread(f"Batch: Scraping {i+1}/{len(urls_to_scrape)}: {url}...")
-            logging.info(f"Batch: Processing URL {i+1}/{len(urls_to_scrape)}: {url}")
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            scraped_data_dict = loop.run_until_complete(scrape_post_data(url, self, self.logged_in_username))
-            loop.close()
+        urls_to_scrape = itertools.chain([first_url], urls_to_scrape)
+
+        self.set_status_from_thread(f"Starting batch scrape from {source_desc}...")
+        logging.info(f"Batch scrape initiated from {source_desc}.")
+        batch_timings = []
+        completed_count = 0
+
+        def on_pool_result(url, scraped_data_dict):
+            nonlocal completed_count
+            completed_count += 1
+            batch_timings.append(scraped_data_dict.get("timings"))
+            # Queued for the background writer, which commits results in groups
             self._handle_instaloader_scrape_result(scraped_data_dict, url)
+            self.set_status_from_thread(f"Batch: {completed_count}/{total_desc if import_stats is None else import_stats['queued']} done ({url}).")
 
-        self.set_status_from_thread(f"Batch scrape complete. Processed {len(urls_to_scrape)} URLs.")
-        logging.info("Batch scrape successfully completed.")
+        # Browser scraping runs in worker processes, so a hung or crashed Chrome only costs that one URL
+        pool = ScrapeWorkerPool(logged_in_username=self.logged_in_username)
+        try:
+            pool_stats = pool.run(urls_to_scrape, on_pool_result)
+            self.set_status_from_thread(f"Batch scrape complete. Processed {completed_count} URLs.")
+            if import_stats is not None:
+                logging.info(f"CSV import: {import_stats}")
+            logging.info(f"Batch scrape successfully completed. Worker pool: {pool_stats}")
+        except Exception as e:
+            self.set_status_from_thread(f"Batch scrape stopped: {e}")
+            logging.error(f"Batch scrape worker pool failed: {e}", exc_info=True)
+        finally:
+            flush_writes() # The batch is only reported done once its results are committed
+            logging.info(f"Database writer after batch: {writer_stats()}")
+        timing_summary = summarize_stage_timings(batch_timings)
+        if timing_summary:
+            logging.info(f"Batch stage timings: {format_stage_timing_summary(timing_summary)}")
         self.is_batch_scraping = False
-        self._set_buttons_state(tk.NORMAL)
-        self._hide_blocking_overlay()
-
+        self._post_to_ui(self._set_buttons_state, tk.NORMAL)
+        self._post_to_ui(self._hide_blocking_overlay)
+        if timing_summary:
+            # Per-stage p50/p95 of the batch, slowest first; stages are exclusive (see ScrapeTimings)
+            stage_lines = format_stage_timing_summary(timing_summary, separator="\n")
+            self._post_to_ui(
+                messagebox.showinfo, "Batch Stage Timings",
+                f"Processed {completed_count} URLs.\n\n{stage_lines}", parent=self.root
+            )
+
+
+    def _run_account_sweep_in_thread(self, owner_username):
+        swept_total = 0
+        saved_total = 0
+        try:
+            for batch in sweep_account_posts(owner_username, self, self.logged_in_username):
+                saved_shortcodes = save_changed_posts_to_database(batch)
+                swept_total += len(batch)
+                saved_total += len(saved_shortcodes)
+                self._queue_sweep_batch(batch, set(saved_shortcodes))
+            self.set_status_from_thread(
+                f"Sweep of {owner_username} complete: {swept_total} reels checked, {saved_total} new or changed."
+            )
+            logging.info(f"Account sweep of {owner_username} finished: {swept_total} reels, {saved_total} saved.")
+        except Exception as e:
+            self.set_status_from_thread(f"Error sweeping {owner_username}: {e}")
+            logging.error(f"Error during account sweep of {owner_username}: {e}", exc_info=True)
+        finally:
+            self.is_batch_scraping = False
+            self._post_to_ui(self._set_buttons_state, tk.NORMAL)
+            self._post_to_ui(self._hide_blocking_overlay)
+
+    def _queue_sweep_batch(self, batch, saved_shortcodes):
+        """Queues table updates for the sweep results that were written to the database."""
+        self._queue_rows([
+            normalize_post_data(post_data, post_data["post_shortcode"])
+            for post_data in batch
+            if post_data["post_shortcode"] in saved_shortcodes # The rest are unchanged since the last sweep or scrape
+        ])
+
+    def _merge_row(self, post_data):
+        """Adds a row to the in-memory table or refreshes the stored one. Tk thread only."""
+        existing = self.rows_by_shortcode.get(post_data["post_shortcode"])
+        if existing is not None:
+            # Every typed field is refreshed by a new scrape; the shortcode is the key
+            existing.update(post_data)
+        else:
+            self._add_row(post_data)
 
     def _run_instaloader_scrape_in_thread(self, post_url, logged_in_username, is_batch=True):
         scraped_data_dict = {"error": "Scraping failed unexpectedly.", "url": post_url}
         loop = None 
         try:
+            start_follow_batch()
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
             scraped_data_dict = loop.run_until_complete(scrape_post_data(post_url, self, logged_in_username))
@@ -931,15 +1374,17 @@ class InstagramScraperApp:
             scraped_data_dict = {"error": str(e), "url": post_url}
         finally:
             if not is_batch: 
-                self.root.after(
-                    0, lambda data=scraped_data_dict: self._handle_instaloader_scrape_result(data, post_url)
-                )
-                self.root.after(0, self._set_buttons_state, tk.NORMAL)
-                self.root.after(0, self._hide_blocking_overlay)
+                self._handle_instaloader_scrape_result(scraped_data_dict, post_url)
+                self._post_to_ui(self._set_buttons_state, tk.NORMAL)
+                self._post_to_ui(self._hide_blocking_overlay)
             if loop and not loop.is_closed():
                 loop.close()
 
     def _handle_instaloader_scrape_result(self, scraped_data_dict, post_url):
+        """
+        Converts a scrape result into a typed row, queues it for the database writer and for the
+        table (merged on the next UI tick) and returns the row dict. Runs on worker threads.
+        """
         shortcode = get_shortcode_from_url(post_url) or "unknown_post"
         # Changed to datetime.now() for local system time (Medan, UTC+7)
         current_timestamp_str = datetime.now().strftime("%Y-%m-%d") 
@@ -948,67 +1393,38 @@ class InstagramScraperApp:
 
         if has_error:
             error_message = scraped_data_dict.get("error", "Unknown error")
-            self.set_status(f"Scrape: Failed for {shortcode} - {error_message}")
+            self.set_status_from_thread(f"Scrape: Failed for {shortcode} - {error_message}")
             logging.error(f"Handling scrape failure for {shortcode}: {error_message}")
         else:
-            self.set_status(f"Scrape: Data for {shortcode} recorded successfully.")
+            self.set_status_from_thread(f"Scrape: Data for {shortcode} recorded successfully.")
             logging.info(f"Scrape: Data for {shortcode} successfully handled and recorded.")
-            self.url_entry.delete(0, tk.END) # Clear input on successful scrape
+            self._post_to_ui(self.url_entry.delete, 0, tk.END) # Clear input on successful scrape
 
 
-        formatted_post_date = "N/A"
-        if scraped_data_dict.get("post_date") and scraped_data_dict["post_date"] != "N/A":
-            try:
-                dt_obj = datetime.strptime(str(scraped_data_dict["post_date"]).split(" ")[0], "%Y-%m-%d")
-                formatted_post_date = dt_obj.strftime("%Y-%m-%d")
-            except (ValueError, TypeError):
-                formatted_post_date = scraped_data_dict["post_date"]
-
-        # Prepare GUI data dictionary with all expected fields, including error status
-        gui_data = {
+        # Prepare GUI data dictionary with all expected fields, in the typed form the database stores
+        gui_data = normalize_post_data({
             "link": scraped_data_dict.get("link", post_url),
-            "post_date": formatted_post_date,
-            "last_record": current_timestamp_str, # This will always be today's date based on system time
-            "owner": scraped_data_dict.get("owner", "N/A"),
-            "likes": scraped_data_dict.get("likes", "N/A"),
-            "comments": scraped_data_dict.get("comments", "N/A"),
-            "views": scraped_data_dict.get("views", "N/A"),
-            "engagement_rate": scraped_data_dict.get("engagement_rate", "N/A"),
+            "post_date": scraped_data_dict.get("post_date"),
+            "last_record": scraped_data_dict.get("last_record") or datetime.now(),
+            "owner": scraped_data_dict.get("owner"),
+            "likes": scraped_data_dict.get("likes"),
+            "comments": scraped_data_dict.get("comments"),
+            "views": scraped_data_dict.get("views"),
+            "engagement_rate": scraped_data_dict.get("engagement_rate"),
             "error": scraped_data_dict.get("error", None), # Keep error status
-            "post_shortcode": shortcode # Add shortcode for internal tracking
-        }
+            "timed_out": scraped_data_dict.get("timed_out", False),
+            "timings": scraped_data_dict.get("timings"), # Per-stage timing record, saved with the row
+        }, shortcode)
 
-        existing_index = -1
-        for i, item in enumerate(self.scraped_data_for_table):
-            if item.get("post_shortcode") == shortcode:
-                existing_index = i
-                break
-
-        if existing_index != -1:
-            # Update only the fields that are expected to change with new scrapes
-            self.scraped_data_for_table[existing_index].update({
-                "link": gui_data["link"], # Link might change slightly in canonical form, but shortcode is key
-                "post_date": gui_data["post_date"], # Update post_date in case it was N/A before
-                "last_record": gui_data["last_record"],
-                "owner": gui_data["owner"],
-                "likes": gui_data["likes"],
-                "comments": gui_data["comments"],
-                "views": gui_data["views"],
-                "engagement_rate": gui_data["engagement_rate"],
-                "error": gui_data["error"]
-            })
-            logging.info(f"Updated existing record for {shortcode} in in-memory table.")
-        else:
-            self.scraped_data_for_table.append(gui_data)
-            logging.info(f"Added new record for {shortcode} to in-memory table.")
-
-        save_to_database(gui_data, shortcode)
-        
-        self.root.after(0, self._refresh_table_display)
+        submit_post_write(gui_data) # Committed by the background writer; never blocks on the disk here
+        # A copy for the table: its row dicts are only ever touched on the Tk thread
+        self._queue_rows([dict(gui_data)])
+        return gui_data
 
     def _set_buttons_state(self, state):
         self.scrape_button.configure(state=state)
         self.batch_scrape_button.configure(state=state)
+        self.track_account_button.configure(state=state)
         self.update_selected_button.configure(state=state)
         self.delete_selected_button.configure(state=state)
         self.export_button.configure(state=state)
@@ -1016,64 +1432,115 @@ class InstagramScraperApp:
         # So we don't change its state here with other buttons.
         # self.logout_instaloader_button.configure(state=state) 
 
+    def _tree_row_values(self, post_data):
+        # Ensure the order of values matches self.columns for display
+        values = [format_cell_for_display(col, post_data.get(col)) for col in self.columns]
+
+        tag = "failed" if (post_data.get("error") is not None and post_data.get("error") != "") else ""
+        return values, (tag,) if tag else ()
+
+    def _insert_tree_row(self, post_data, index=tk.END):
+        values, tags = self._tree_row_values(post_data)
+        # The shortcode is the item id, so a later update or delete finds its row directly
+        self.tree.insert("", index, iid=post_data["post_shortcode"], values=values, tags=tags)
+
     def _refresh_table_display(self):
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """Redraws every row; used when the set of displayed rows changes (filter on/off). Single rows go through _show_table_rows."""
+        self.tree.delete(*self.tree.get_children())
         
-        for post_data in self.scraped_data_for_table:
-            # Ensure the order of values matches self.columns for display
-            values = []
-            for col in self.columns:
-                value = post_data.get(col, "N/A")
-                if col == "engagement_rate":
-                    # Display as percentage string, handle both float and already-formatted string
-                    if isinstance(value, (int, float)) and value != "N/A":
-                        values.append(f"{value:.2f}%") # Format as percentage with 2 decimal places
-                    elif isinstance(value, str) and value.endswith('%'):
-                        values.append(value) # Already formatted from DB
-                    else:
-                        values.append("N/A") # Default for unparseable engagement rate
-                else:
-                    values.append(value)
-
-            tag = "failed" if (post_data.get("error") is not None and post_data.get("error") != "") else ""
-            self.tree.insert("", tk.END, values=values, tags=(tag,) if tag else ())
+        for post_data in self._displayed_rows():
+            self._insert_tree_row(post_data)
         
         self.set_status("Table display refreshed.")
 
 
-    def export_to_csv(self):
+    def on_export_button_press(self):
+        """Asks for export filters, then a file name, and streams the export in a background thread."""
         if not self.scraped_data_for_table:
             messagebox.showinfo("No Data", "There is no data to export.", parent=self.root)
             return
-        filepath = filedialog.asksaveasfilename(
-            defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
-            title="Save Scraped Data As"
+
+        dialog = ctk.CTkToplevel(self.root)
+        dialog.title("Export Data")
+        dialog.transient(self.root)
+        dialog.grab_set()
+
+        fields = {}
+        for row_index, (key, label) in enumerate((
+            ("owner", "Owner (optional):"),
+            ("since", "Posted from (YYYY-MM-DD, optional):"),
+            ("until", "Posted until (YYYY-MM-DD, optional):"),
+        )):
+            ctk.CTkLabel(dialog, text=label).grid(row=row_index, column=0, sticky=tk.W, padx=10, pady=5)
+            fields[key] = ctk.CTkEntry(dialog, width=200)
+            fields[key].grid(row=row_index, column=1, padx=10, pady=5)
+        include_history_var = tk.BooleanVar(value=False)
+        ctk.CTkCheckBox(dialog, text="Also export the per-scrape history", variable=include_history_var).grid(
+            row=3, column=0, columnspan=2, sticky=tk.W, padx=10, pady=5
         )
-        if not filepath:
-            return
+
+        def parse_date(key, days_after=0):
+            text = fields[key].get().strip()
+            if not text:
+                return None
+            # Dates are UTC days, matching how post dates are stored
+            day_start = datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+            return int(day_start) + days_after * 86400
+
+        def on_confirm():
+            try:
+                since = parse_date("since")
+                until = parse_date("until", days_after=1) # Inclusive end day
+            except ValueError:
+                messagebox.showerror("Invalid Date", "Dates must be in YYYY-MM-DD format.", parent=dialog)
+                return
+            owner = fields["owner"].get().strip() or None
+            include_history = include_history_var.get()
+            dialog.destroy()
+
+            filetypes = [
+                ("CSV files", "*.csv"), ("Compressed CSV", "*.csv.gz"),
+                ("JSON Lines", "*.jsonl"), ("Compressed JSON Lines", "*.jsonl.gz"),
+            ]
+            if parquet_available():
+                filetypes.append(("Parquet", "*.parquet"))
+            filepath = filedialog.asksaveasfilename(
+                defaultextension=".csv",
+                filetypes=filetypes + [("All files", "*.*")],
+                title="Save Scraped Data As"
+            )
+            if not filepath:
+                return
+            if format_from_path(filepath) is None:
+                messagebox.showerror("Export Error", "Use a .csv, .csv.gz, .jsonl, .jsonl.gz or .parquet file name.", parent=self.root)
+                return
+            self.export_button.configure(state=tk.DISABLED)
+            self.set_status(f"Exporting to {filepath}...")
+            threading.Thread(
+                target=self._run_export_in_thread, args=(filepath, owner, since, until, include_history), daemon=True
+            ).start()
+
+        buttons_frame = ctk.CTkFrame(dialog, fg_color="transparent")
+        buttons_frame.grid(row=4, column=0, columnspan=2, pady=10)
+        ctk.CTkButton(buttons_frame, text="Export", command=on_confirm).pack(side=tk.LEFT, padx=5)
+        ctk.CTkButton(buttons_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+
+    def _run_export_in_thread(self, filepath, owner, since, until, include_history):
+        def on_progress(label, rows_written, total_rows):
+            self.set_status_from_thread(f"Exporting {label}: {rows_written}/{total_rows if total_rows is not None else '?'} rows...")
+
         try:
-            with open(filepath, "w", newline="", encoding="utf-8") as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=self.columns)
-                writer.writeheader()
-                for row_data_dict in self.scraped_data_for_table:
-                    export_data = {}
-                    for k, v in row_data_dict.items():
-                        if k in self.columns: # Only export columns defined in self.columns
-                            # For CSV export, ensure engagement_rate is a string with % if it's a number
-                            if k == "engagement_rate" and isinstance(v, (int, float)) and v != "N/A":
-                                export_data[k] = f"{v:.2f}%"
-                            else:
-                                export_data[k] = v
-                    writer.writerow(export_data)
-            self.set_status(f"Data exported to CSV: {filepath}")
-            messagebox.showinfo("Export Successful", f"Data successfully exported to\n{filepath}", parent=self.root)
-            logging.info(f"Data exported to CSV: {filepath}")
+            result = export_data(filepath, owner=owner, since=since, until=until, include_history=include_history, progress=on_progress)
+            summary = f"Exported {result['posts']} posts" + (f" and {result['history']} history rows" if result["history"] is not None else "")
+            self.set_status_from_thread(f"{summary} to {filepath}")
+            files_text = "\n".join(result["files"])
+            self._post_to_ui(messagebox.showinfo, "Export Successful", f"{summary} to\n{files_text}", parent=self.root)
         except Exception as e:
-            self.set_status(f"Error exporting data: {e}")
-            messagebox.showerror("Export Error", f"Could not export data: {e}", parent=self.root)
-            logging.error(f"Error exporting data to CSV: {e}", exc_info=True)
+            self.set_status_from_thread(f"Error exporting data: {e}")
+            logging.error(f"Error exporting data to {filepath}: {e}", exc_info=True)
+            self._post_to_ui(messagebox.showerror, "Export Error", f"Could not export data: {e}", parent=self.root)
+        finally:
+            self._post_to_ui(self.export_button.configure, state=tk.NORMAL)
 
     def _show_context_menu(self, event):
         """Displays the right-click context menu for the Treeview."""
@@ -1086,8 +1553,7 @@ class InstagramScraperApp:
 
     def _select_all_items(self):
         """Selects all items currently visible in the Treeview."""
-        for item in self.tree.get_children():
-            self.tree.selection_add(item)
+        self.tree.selection_set(self.tree.get_children())
 
     def _sort_treeview(self, col):
         if self.sort_column == col:
@@ -1096,39 +1562,7 @@ class InstagramScraperApp:
             self.sort_column = col
             self.sort_reverse = False
 
-        def _get_sort_value(item, col_name):
-            value = item.get(col_name)
-            if value is None or value == "N/A": # Handle None and "N/A"
-                if col_name in ["likes", "comments", "views", "engagement_rate"]:
-                    return float('-inf') if not self.sort_reverse else float('inf') 
-                elif col_name in ["post_date", "last_record"]:
-                    # For dates, use a very early/late date for N/A or None
-                    return datetime.min.replace(tzinfo=timezone.utc) if not self.sort_reverse else datetime.max.replace(tzinfo=timezone.utc)
-                return "" # For other string columns
-            
-            if col_name in ["likes", "comments", "views"]:
-                try:
-                    return int(value)
-                except (ValueError, TypeError):
-                    return float('-inf') if not self.sort_reverse else float('inf') # Fallback if conversion fails
-            if col_name == "engagement_rate":
-                try:
-                    # Parse numerical value correctly for sorting, ignoring '%'
-                    if isinstance(value, str) and value.endswith('%'):
-                        return float(value.strip('%'))
-                    return float(value)
-                except (ValueError, TypeError):
-                    return float('-inf') if not self.sort_reverse else float('inf') # Fallback if conversion fails
-            if col_name in ["post_date", "last_record"]:
-                try:
-                    return datetime.strptime(str(value), "%Y-%m-%d").replace(tzinfo=timezone.utc) # Parse and make timezone-aware
-                except (ValueError, TypeError):
-                    return datetime.min.replace(tzinfo=timezone.utc) if not self.sort_reverse else datetime.max.replace(tzinfo=timezone.utc) # Fallback
-            return value
-
-        self.scraped_data_for_table.sort(key=lambda item: _get_sort_value(item, col), reverse=self.sort_reverse)
-        
-        self._refresh_table_display()
+        self._apply_sort()
 
         for c in self.columns:
             if c == col:
@@ -1137,6 +1571,30 @@ class InstagramScraperApp:
             else:
                 self.tree.heading(c, text=c.replace("_", " ").title())
 
+    def _apply_sort(self):
+        self.scraped_data_for_table = self._sorted_rows(self.scraped_data_for_table)
+        if self._search_text:
+            self.search_results = self._sorted_rows(self.search_results) # Sorts the matches loaded so far
+
+        displayed_shortcodes = [post_data["post_shortcode"] for post_data in self._displayed_rows()]
+        if set(self.tree.get_children()) != set(displayed_shortcodes):
+            self._refresh_table_display() # The table shows other rows (e.g. a filter just changed)
+            return
+        # Reorders the existing items in one call; nothing is deleted, reinserted or reformatted
+        self.tree.set_children("", *displayed_shortcodes)
+
+    def _sorted_rows(self, rows):
+        col = self.sort_column
+        # Rows hold typed values (ints, floats, epoch seconds), so they sort directly without parsing.
+        # Rows without a value keep their place at the top in both directions, as before.
+        missing_rows = [item for item in rows if item.get(col) is None]
+        present_rows = [item for item in rows if item.get(col) is not None]
+        if col in ("link", "owner"):
+            present_rows.sort(key=lambda item: str(item[col]).lower(), reverse=self.sort_reverse)
+        else:
+            present_rows.sort(key=lambda item: item[col], reverse=self.sort_reverse)
+        return missing_rows + present_rows
+
 
 def login_sequence(root, app_instance_ref, show_overlay_cb, hide_overlay_cb): # Added overlay callbacks
     logged_in_instaloader_username = None
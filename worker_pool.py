@@ -0,0 +1,334 @@
+# worker_pool.py
+"""
+Runs scrape_post_data in separate worker processes so a hung driver.get, a Chrome crash or a
+CPU-heavy parse never blocks the Tk process.
+
+Each worker owns a job queue, a result pipe and a private copy of the browser profile (Chrome
+refuses to share one user-data-dir between instances). The parent hands out one job at a time,
+so it always knows which URL a worker is on:
+  - a job running longer than job_timeout gets its worker (and its Chrome children) killed and respawned,
+  - a worker that dies mid-job is respawned and the job reported as failed,
+  - a worker is recycled after max_jobs_per_worker jobs to cap Chrome/driver memory growth: its
+    replacement starts at once on a fresh profile copy while the old one finishes exiting on its own.
+Every job produces exactly one scrape_post_data-shaped result.
+"""
+
+import os
+import sys
+import signal
+import shutil
+import asyncio
+import logging
+import subprocess
+import multiprocessing
+from multiprocessing.connection import wait as wait_for_connections
+import time
+
+import scraper
+
+# --- Configuration ---
+WORKER_PROFILES_DIR = os.path.join(scraper.SCRIPT_DIR, "browser_worker_profiles")
+SCRAPE_WORKER_COUNT = max(1, min(4, (os.cpu_count() or 2) // 2)) # Each worker drives its own Chrome
+# Hard backstop above the scrape's own time budget, for hangs the Deadline cannot interrupt (e.g. driver.get)
+SCRAPE_JOB_TIMEOUT_SECONDS = scraper.SCRAPE_TIME_BUDGET_SECONDS + 2 * 60
+MAX_JOBS_PER_WORKER = 25
+RESULT_POLL_SECONDS = 1.0
+WORKER_SHUTDOWN_GRACE_SECONDS = 30
+
+# Chrome lock files that must not be copied into (or left behind in) a worker profile
+PROFILE_LOCK_PATTERNS = ("SingletonLock", "SingletonCookie", "SingletonSocket", "lockfile")
+PROFILE_COPY_IGNORE = shutil.ignore_patterns(*PROFILE_LOCK_PATTERNS, "Cache", "Code Cache", "GPUCache")
+
+# spawn everywhere: forking a process that runs Tk and scraper threads is unsafe
+_mp_context = multiprocessing.get_context("spawn")
+
+
+def failed_scrape_result(post_url, error, timed_out=False):
+    """A scrape_post_data-shaped result for a job that produced no data."""
+    return {
+        "url": post_url,
+        "link": post_url,
+        "owner": "N/A",
+        "likes": "N/A",
+        "comments": "N/A",
+        "post_date": "N/A",
+        "views": "N/A",
+        "last_record": None,
+        "engagement_rate": "N/A",
+        "error": error,
+        "is_video": False,
+        "timings": None,
+        "timed_out": timed_out
+    }
+
+
+# ------------- Worker process side -------------
+
+class _WorkerStatusApp:
+    """Stands in for the GUI app inside a worker; status messages are forwarded to the parent."""
+
+    def __init__(self, result_conn):
+        self.result_conn = result_conn
+
+    def set_status_from_thread(self, message):
+        try:
+            self.result_conn.send(("status", None, message))
+        except (OSError, EOFError):
+            pass
+
+
+def _worker_main(job_queue, result_conn, browser_profile_dir, logged_in_username, do_follow, follow_batch_started_at):
+    """Worker loop: takes (job_id, url) jobs until it receives None."""
+    if hasattr(os, "setpgrp"):
+        os.setpgrp() # Own process group, so the pool can kill ChromeDriver/Chrome together with a hung worker
+
+    scraper.BROWSER_USER_DATA_DIR = browser_profile_dir
+    # The pool's batch start, so owners followed by any worker in this batch are not followed again here
+    scraper.start_follow_batch(follow_batch_started_at)
+    app = _WorkerStatusApp(result_conn)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        while True:
+            job = job_queue.get()
+            if job is None:
+                break
+            job_id, post_url = job
+            try:
+                data = loop.run_until_complete(scraper.scrape_post_data(post_url, app, logged_in_username, do_follow))
+            except Exception as e:
+                logging.error(f"[Worker {os.getpid()}] scrape_post_data raised for {post_url}: {e}", exc_info=True)
+                data = failed_scrape_result(post_url, f"Worker error: {e}")
+            result_conn.send(("result", job_id, data))
+    finally:
+        loop.close()
+        result_conn.close()
+
+
+# ------------- Parent side -------------
+
+class _WorkerHandle:
+    """One worker slot: the live process, its queue/pipe and the job it is running."""
+
+    def __init__(self, slot, process, job_queue, result_conn, profile_dir):
+        self.slot = slot
+        self.process = process
+        self.job_queue = job_queue
+        self.result_conn = result_conn
+        self.profile_dir = profile_dir
+        self.current_job = None # (job_id, post_url, started_at)
+        self.jobs_done = 0
+        self.retire_by = None # While retiring: when it is killed if it has not exited yet
+
+
+def _kill_process_tree(process):
+    """Kills a worker together with the ChromeDriver/Chrome processes it started."""
+    if process.pid is None:
+        return
+    try:
+        if sys.platform.startswith('win'):
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True, timeout=30)
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except (OSError, subprocess.SubprocessError) as e:
+        logging.debug(f"Could not kill process tree of worker {process.pid}: {e}")
+    if process.is_alive():
+        process.kill()
+    process.join(5)
+
+
+def _remove_profile_locks(profile_dir):
+    for pattern in PROFILE_LOCK_PATTERNS:
+        lock_path = os.path.join(profile_dir, pattern)
+        if os.path.lexists(lock_path):
+            try:
+                os.remove(lock_path)
+            except OSError as e:
+                logging.debug(f"Could not remove stale profile lock {lock_path}: {e}")
+
+
+class ScrapeWorkerPool:
+    """
+    Process pool for scrape_post_data. Usage:
+        pool = ScrapeWorkerPool(logged_in_username=username)
+        pool.run(urls, on_result=lambda url, data: ..., on_status=print)
+    run() blocks until every URL has a result; callbacks run in the calling thread.
+    """
+
+    def __init__(self, num_workers=None, job_timeout=SCRAPE_JOB_TIMEOUT_SECONDS, max_jobs_per_worker=MAX_JOBS_PER_WORKER,
+                 logged_in_username=None, do_follow=False):
+        self.num_workers = num_workers or SCRAPE_WORKER_COUNT
+        self.job_timeout = job_timeout
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.logged_in_username = logged_in_username
+        self.do_follow = do_follow
+        self.workers = []
+        self.retiring = [] # Recycled workers told to stop; reaped by _reap_retiring without waiting on them
+        self.profiles_prepared = 0
+        self.follow_batch_started_at = None # Set per run(); respawned workers join the same follow batch
+        self.stats = {"completed": 0, "timed_out": 0, "crashed": 0, "recycled": 0}
+
+    def _prepare_profile(self, slot):
+        """Gives a worker slot a fresh copy of the logged-in browser profile."""
+        # A recycled worker's replacement gets its own directory: the old Chrome may still be using the slot's
+        profile_name = f"worker_{slot}" if self.profiles_prepared < self.num_workers else f"worker_{slot}_{self.profiles_prepared}"
+        self.profiles_prepared += 1
+        profile_dir = os.path.join(WORKER_PROFILES_DIR, profile_name)
+        if os.path.exists(profile_dir):
+            shutil.rmtree(profile_dir, ignore_errors=True)
+        try:
+            shutil.copytree(scraper.BROWSER_USER_DATA_DIR, profile_dir, ignore=PROFILE_COPY_IGNORE)
+        except (OSError, shutil.Error) as e:
+            # A partial copy still works; missing cookies only mean an anonymous browser session.
+            logging.warning(f"Could not fully copy browser profile for worker {slot}: {e}")
+            os.makedirs(profile_dir, exist_ok=True)
+        return profile_dir
+
+    def _spawn(self, slot, profile_dir):
+        job_queue = _mp_context.Queue()
+        result_conn, child_conn = _mp_context.Pipe(duplex=False)
+        process = _mp_context.Process(
+            target=_worker_main,
+            args=(job_queue, child_conn, profile_dir, self.logged_in_username, self.do_follow, self.follow_batch_started_at),
+            name=f"ScrapeWorker-{slot}",
+            daemon=True
+        )
+        process.start()
+        child_conn.close() # The child holds its own end; closing ours lets recv() see EOF if it dies
+        logging.info(f"Started scrape worker {slot} (pid {process.pid}).")
+        return _WorkerHandle(slot, process, job_queue, result_conn, profile_dir)
+
+    def _replace(self, handle):
+        """Kills a hung or crashed worker (and its Chrome) and starts a fresh one in the same slot and profile."""
+        _kill_process_tree(handle.process)
+        handle.result_conn.close()
+        handle.job_queue.close()
+        _remove_profile_locks(handle.profile_dir)
+        new_handle = self._spawn(handle.slot, handle.profile_dir)
+        self.workers[handle.slot] = new_handle
+        return new_handle
+
+    def _recycle(self, handle):
+        """
+        Tells an idle worker to stop and starts its replacement right away, on a new profile copy.
+        The old process gets WORKER_SHUTDOWN_GRACE_SECONDS to exit before _reap_retiring kills it.
+        """
+        handle.job_queue.put(None)
+        handle.retire_by = time.monotonic() + WORKER_SHUTDOWN_GRACE_SECONDS
+        self.retiring.append(handle)
+        new_handle = self._spawn(handle.slot, self._prepare_profile(handle.slot))
+        self.workers[handle.slot] = new_handle
+        return new_handle
+
+    def _reap_retiring(self, wait=False):
+        """Cleans up recycled workers that have exited, killing those past their grace period. Never blocks unless wait."""
+        for handle in list(self.retiring):
+            if wait and handle.process.is_alive():
+                handle.process.join(max(0.0, handle.retire_by - time.monotonic()))
+            if handle.process.is_alive():
+                if time.monotonic() < handle.retire_by:
+                    continue
+                logging.warning(f"Recycled scrape worker {handle.slot} (pid {handle.process.pid}) did not exit; killing it.")
+                _kill_process_tree(handle.process)
+            handle.process.join(0) # Already exited; collects its exit status
+            handle.result_conn.close()
+            handle.job_queue.close()
+            shutil.rmtree(handle.profile_dir, ignore_errors=True)
+            self.retiring.remove(handle)
+
+    def _finish_job(self, handle, data, on_result):
+        job_id, post_url, _ = handle.current_job
+        handle.current_job = None
+        handle.jobs_done += 1
+        try:
+            on_result(post_url, data)
+        except Exception as e:
+            logging.error(f"Result callback failed for {post_url}: {e}", exc_info=True)
+
+    def _drain(self, handle, on_result, on_status):
+        """Reads every message a worker has sent so far."""
+        while handle.current_job is not None:
+            try:
+                if not handle.result_conn.poll():
+                    return
+                kind, job_id, payload = handle.result_conn.recv()
+            except (EOFError, OSError):
+                return # Worker died; handled by the liveness check in run()
+            if kind == "status":
+                if on_status:
+                    on_status(payload)
+            elif kind == "result" and handle.current_job[0] == job_id:
+                self.stats["completed"] += 1
+                self._finish_job(handle, payload, on_result)
+                if handle.jobs_done >= self.max_jobs_per_worker:
+                    logging.info(f"Recycling scrape worker {handle.slot} after {handle.jobs_done} jobs.")
+                    self.stats["recycled"] += 1
+                    self._recycle(handle)
+
+    def run(self, urls, on_result, on_status=None):
+        """Scrapes every URL in `urls` (any iterable, consumed lazily) and reports each result via on_result(url, data)."""
+        jobs = enumerate(urls)
+        jobs_exhausted = False
+        self.follow_batch_started_at = time.time()
+        self.profiles_prepared = 0
+        self.workers = [self._spawn(slot, self._prepare_profile(slot)) for slot in range(self.num_workers)]
+        try:
+            while True:
+                # Hand one job to every idle worker
+                for handle in self.workers:
+                    if handle.current_job is None and not jobs_exhausted:
+                        job = next(jobs, None)
+                        if job is None:
+                            jobs_exhausted = True
+                            break
+                        handle.current_job = (job[0], job[1], time.monotonic())
+                        handle.job_queue.put(job)
+
+                busy_workers = [handle for handle in self.workers if handle.current_job is not None]
+                if jobs_exhausted and not busy_workers:
+                    break
+
+                ready = wait_for_connections([handle.result_conn for handle in busy_workers], timeout=RESULT_POLL_SECONDS)
+                for handle in busy_workers:
+                    if handle.result_conn in ready:
+                        self._drain(handle, on_result, on_status)
+
+                now = time.monotonic()
+                for handle in list(self.workers):
+                    if handle.current_job is None:
+                        continue
+                    _, post_url, started_at = handle.current_job
+                    if not handle.process.is_alive():
+                        self._drain(handle, on_result, on_status) # It may have sent its result just before exiting
+                        if handle.current_job is None:
+                            continue
+                        logging.error(f"Scrape worker {handle.slot} crashed (exit code {handle.process.exitcode}) while scraping {post_url}.")
+                        self.stats["crashed"] += 1
+                        self._finish_job(handle, failed_scrape_result(post_url, f"Scrape worker crashed (exit code {handle.process.exitcode})."), on_result)
+                        self._replace(handle)
+                    elif now - started_at > self.job_timeout:
+                        logging.error(f"Scrape of {post_url} exceeded {self.job_timeout}s; killing worker {handle.slot}.")
+                        self.stats["timed_out"] += 1
+                        self._finish_job(handle, failed_scrape_result(post_url, f"Scrape timed out after {self.job_timeout}s.", timed_out=True), on_result)
+                        self._replace(handle)
+
+                self._reap_retiring()
+        finally:
+            self.shutdown()
+        logging.info(f"Scrape worker pool finished: {self.stats}")
+        return self.stats
+
+    def shutdown(self):
+        """Stops all workers; workers still busy, and recycled ones past their grace period, are killed."""
+        for handle in self.workers:
+            if handle.process.is_alive():
+                if handle.current_job is None:
+                    handle.job_queue.put(None)
+                    handle.process.join(WORKER_SHUTDOWN_GRACE_SECONDS)
+                if handle.process.is_alive():
+                    _kill_process_tree(handle.process)
+            handle.result_conn.close()
+            handle.job_queue.close()
+            shutil.rmtree(handle.profile_dir, ignore_errors=True) # The next run copies the profile afresh
+        self.workers = []
+        self._reap_retiring(wait=True)